@@ -0,0 +1,124 @@
+"""
+Deterministic synthetic inputs for the benchmarks, shaped like real LLM extraction output
+"""
+import random
+from typing import Dict, List, Tuple
+from src.models import Entity, Relation, ExtractionResult, PersonalityResult, TRAITS
+
+FIRST = ["Emily", "James", "Aisha", "Wei", "Lucas", "Maria", "Kenji", "Fatima", "Oliver", "Sofia",
+         "Daniel", "Priya", "Mateo", "Hana", "Samuel", "Elena", "Omar", "Chloe", "Ivan", "Nadia"]
+LAST = ["Carter", "Nguyen", "Okafor", "Schmidt", "Rossi", "Tanaka", "Haddad", "Silva", "Kowalski", "Moreau",
+        "Patel", "Larsen", "Kim", "Novak", "Mendez", "Osei", "Fischer", "Ahmed", "Dubois", "Costa"]
+TITLES = ["", "", "Dr. ", "Prof. "]
+ORG_WORDS = ["Institute", "Labs", "University", "Foundation", "Systems", "Group"]
+LOCATIONS = ["Berlin", "Nairobi", "Osaka", "Lima", "Toronto", "Lyon", "Pune", "Oslo", "Accra", "Busan"]
+RELATION_LABELS = ["works at", "employed by", "attended", "spoke at", "friend of", "located in", "based in",
+                   "studies", "works on", "AFFILIATED_WITH", "collaborates with", "MENTORS"]
+
+
+def person_name(i: int) -> str:
+    """Unique name for index i; every fourth-ish one carries a Dr./Prof. title."""
+    first, last = FIRST[i % len(FIRST)], LAST[(i // len(FIRST)) % len(LAST)]
+    gen = i // (len(FIRST) * len(LAST))
+    return f"{TITLES[(i * 7) % len(TITLES)]}{first} {last}{'-' + str(gen) if gen else ''}"
+
+
+def org_name(i: int) -> str:
+    return f"{LAST[i % len(LAST)]} {ORG_WORDS[(i // len(LAST)) % len(ORG_WORDS)]} {i}"
+
+
+def entity_names(n: int) -> List[Tuple[str, str]]:
+    """n (name, type) pairs: ~70% people, the rest organizations and locations."""
+    out = []
+    for i in range(n):
+        if i % 10 < 7:
+            out.append((person_name(i), "Person"))
+        elif i % 10 < 9:
+            out.append((org_name(i), "Organization"))
+        else:
+            out.append((f"{LOCATIONS[i % len(LOCATIONS)]} {i}", "Location"))
+    return out
+
+
+def extraction_json(n: int, seed: int = 0) -> Dict:
+    """Raw LLM-style payload with n entities and n relations, mixing every shape the parser accepts."""
+    rng = random.Random(seed)
+    names = entity_names(n)
+    entities = []
+    for i, (name, etype) in enumerate(names):
+        shape = i % 4
+        if shape == 0:
+            entities.append(f"{name} ({etype})")
+        elif shape == 1:
+            entities.append({"entity": name, "category": etype})
+        else:
+            entities.append({"name": name, "type": etype})
+    relations = []
+    for i in range(n):
+        s, t = names[rng.randrange(n)][0], names[rng.randrange(n)][0]
+        label = rng.choice(RELATION_LABELS)
+        if i % 5 == 0:
+            relations.append({"source": s, "type": label, "target": t})
+        else:
+            relations.append({"source_name": s, "relation_type": label, "target_name": t,
+                              "confidence": round(rng.random(), 2), "evidence": f"{s} {label} {t}."})
+    return {"entities": entities, "relations": relations}
+
+
+def extraction_result(n: int, seed: int = 0, duplicate_rate: float = 0.1) -> ExtractionResult:
+    """n entities and n relations (a share of them repeated with a short-form / lower-case name)."""
+    rng = random.Random(seed)
+    names = entity_names(n)
+    entities = [Entity(id=name.lower(), name=name, type=etype, canonical_name=name) for name, etype in names]
+    relations = []
+    for _ in range(n):
+        s, t = names[rng.randrange(n)][0], names[rng.randrange(n)][0]
+        if rng.random() < duplicate_rate and relations:
+            prev = relations[rng.randrange(len(relations))]
+            s, t = short_form(prev.meta["source_name"]), prev.meta["target_name"].lower()
+        relations.append(Relation(source_id=s.lower(), target_id=t.lower(), type=rng.choice(RELATION_LABELS),
+                                  confidence=round(rng.random(), 2), evidence=f"{s} and {t}.",
+                                  meta={"source_name": s, "target_name": t}))
+    return ExtractionResult(entities=entities, relations=relations)
+
+
+def short_form(name: str) -> str:
+    """'Dr. Emily Carter' -> 'Dr. Carter'; other names unchanged."""
+    parts = name.split()
+    return f"{parts[0]} {parts[-1]}" if parts[0] in ("Dr.", "Prof.") and len(parts) >= 3 else name
+
+
+def noisy_prediction(gold: ExtractionResult, seed: int = 1, drop_rate: float = 0.15,
+                     short_rate: float = 0.2) -> ExtractionResult:
+    """A prediction against `gold`: drops some items, abbreviates titled names, adds spurious relations."""
+    rng = random.Random(seed)
+    entities = [e.model_copy(update={"name": short_form(e.name)}) if rng.random() < short_rate else e
+                for e in gold.entities if rng.random() >= drop_rate]
+    relations = []
+    for r in gold.relations:
+        if rng.random() < drop_rate:
+            continue
+        meta = dict(r.meta)
+        if rng.random() < short_rate:
+            meta["source_name"] = short_form(meta["source_name"])
+        relations.append(r.model_copy(update={"meta": meta}))
+    n = max(1, len(gold.entities))
+    for _ in range(int(len(gold.relations) * drop_rate)):
+        s, t = person_name(rng.randrange(n)), person_name(rng.randrange(n))
+        relations.append(Relation(source_id=s.lower(), target_id=t.lower(), type="FRIEND_OF",
+                                  meta={"source_name": s, "target_name": t}))
+    return ExtractionResult(entities=entities, relations=relations)
+
+
+def personality_result(n: int, seed: int = 0) -> PersonalityResult:
+    """Big Five scores for n people (missing a trait now and then)."""
+    rng = random.Random(seed)
+    traits = {}
+    for i in range(n):
+        traits[person_name(i)] = {t: round(rng.random(), 3) for t in TRAITS if rng.random() > 0.02}
+    return PersonalityResult(traits=traits)
+
+
+def relation_labels(n: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return [rng.choice(RELATION_LABELS) for _ in range(n)]
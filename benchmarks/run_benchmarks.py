@@ -0,0 +1,133 @@
+"""
+Benchmark runner for the CPU-bound pipeline stages: wall time and peak memory per size,
+compared against benchmarks/baseline.json
+
+    python -m benchmarks.run_benchmarks                       # sizes 10^2..10^4
+    python -m benchmarks.run_benchmarks --max-size 1000000    # full 10^2..10^6 sweep
+    python -m benchmarks.run_benchmarks --only kg_builder --save-baseline
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Dict, Optional
+from .suite import BENCHMARKS
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def measure(make, n: int, repeat: int, min_time: float) -> Dict:
+    """Best-of-`repeat` wall time (stopping early once min_time has been spent) plus the peak
+    memory allocated by one extra, tracemalloc-traced call. Setup is redone for every call
+    and never measured."""
+    times = []
+    for _ in range(repeat):
+        fn = make(n)
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+        del fn
+        if sum(times) >= min_time:
+            break
+    fn = make(n)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"time_s": min(times), "peak_kb": round(peak / 1024, 1), "runs": len(times)}
+
+
+def compare(result: Dict, base: Optional[Dict], time_tol: float, mem_tol: float, noise_floor: float) -> str:
+    """'' if within tolerance (or no baseline), else a short description of the regression."""
+    if not base:
+        return ""
+    issues = []
+    # very short timings are mostly noise, so they are never flagged
+    if result["time_s"] >= noise_floor and result["time_s"] > base["time_s"] * (1 + time_tol):
+        issues.append(f"time x{result['time_s'] / base['time_s']:.2f}")
+    if result["peak_kb"] > 64 and result["peak_kb"] > base["peak_kb"] * (1 + mem_tol):
+        issues.append(f"mem x{result['peak_kb'] / max(base['peak_kb'], 1e-9):.2f}")
+    return ", ".join(issues)
+
+
+def fmt_ratio(new: float, old: Optional[float]) -> str:
+    return f"{new / old:.2f}x" if old else "-"
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark the CPU-bound pipeline stages")
+    p.add_argument("--min-size", type=int, default=100)
+    p.add_argument("--max-size", type=int, default=10_000, help="largest n (powers of ten from --min-size)")
+    p.add_argument("--only", action="append", help="run benchmarks whose name contains this (repeatable)")
+    p.add_argument("--repeat", type=int, default=5, help="timed calls per size (best one is reported)")
+    p.add_argument("--min-time", type=float, default=1.0, help="stop repeating once this many seconds were timed")
+    p.add_argument("--baseline", default=BASELINE_PATH)
+    p.add_argument("--save-baseline", action="store_true", help="merge these results into the baseline file")
+    p.add_argument("--time-tolerance", type=float, default=0.30, help="allowed slowdown vs baseline (0.30 = +30%%)")
+    p.add_argument("--mem-tolerance", type=float, default=0.10, help="allowed peak-memory growth vs baseline")
+    p.add_argument("--noise-floor", type=float, default=0.05, help="timings below this (s) are never flagged")
+    p.add_argument("--json", default=None, help="also write results to this file")
+    args = p.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    base_results = baseline.get("results", {})
+    env = {"python": platform.python_version(), "machine": platform.machine(), "platform": platform.system()}
+    if base_results and baseline.get("env") != env:
+        print(f"⚠️ Baseline was recorded on {baseline.get('env')}, this is {env}; timings may not be comparable")
+
+    sizes = []
+    n = args.min_size
+    while n <= args.max_size:
+        sizes.append(n)
+        n *= 10
+
+    results, regressions, compared = {}, [], 0
+    print(f"{'benchmark':<30} {'n':>9} {'time':>11} {'vs base':>8} {'peak MB':>9} {'vs base':>8}")
+    for name, (make, max_size) in BENCHMARKS.items():
+        if args.only and not any(s in name for s in args.only):
+            continue
+        for n in sizes:
+            if n > max_size:
+                continue
+            key = f"{name}[{n}]"
+            r = measure(make, n, args.repeat, args.min_time)
+            base = base_results.get(key)
+            issue = compare(r, base, args.time_tolerance, args.mem_tolerance, args.noise_floor)
+            results[key] = r
+            compared += base is not None
+            print(f"{name:<30} {n:>9} {r['time_s'] * 1000:>9.2f}ms "
+                  f"{fmt_ratio(r['time_s'], base and base['time_s']):>8} {r['peak_kb'] / 1024:>9.2f} "
+                  f"{fmt_ratio(r['peak_kb'], base and base['peak_kb']):>8}" + (f"  ❌ {issue}" if issue else ""))
+            if issue:
+                regressions.append(f"{key}: {issue}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"env": env, "results": results}, f, indent=2)
+    if args.save_baseline:
+        merged = {**base_results, **results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"env": env, "results": dict(sorted(merged.items()))}, f, indent=2)
+        print(f"💾 Saved {len(results)} result(s) to {args.baseline}")
+
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) vs baseline:")
+        for r in regressions:
+            print(f"   {r}")
+        sys.exit(1)
+    print(f"✅ No regressions in {compared} result(s) compared to baseline" if compared
+          else "ℹ️ No baseline results to compare against")
+
+if __name__ == "__main__":
+    main()
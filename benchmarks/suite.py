@@ -0,0 +1,109 @@
+"""
+Benchmark definitions: each one takes a size n, does its setup untimed and returns the
+zero-argument callable that is timed / memory-profiled
+"""
+import shutil
+import tempfile
+from typing import Callable, Dict, Tuple
+from main import parse_extraction_json, post_process_relations
+from src.evaluator import evaluate_extraction, evaluate_personality
+from src.kg_builder import KGBuilder
+from src.normalization import canon_name, canon_relation
+from . import generators as gen
+
+BENCHMARKS: Dict[str, Tuple[Callable[[int], Callable[[], object]], int]] = {}
+
+
+def benchmark(name: str, max_size: int = 10**6):
+    """Register fn(n) -> callable under `name`, for sizes up to max_size."""
+    def deco(fn):
+        BENCHMARKS[name] = (fn, max_size)
+        return fn
+    return deco
+
+
+@benchmark("parse_extraction_json")
+def bench_parse_extraction_json(n):
+    payload = gen.extraction_json(n)
+    return lambda: parse_extraction_json(payload)
+
+
+@benchmark("post_process_relations")
+def bench_post_process_relations(n):
+    result = gen.extraction_result(n)
+    return lambda: post_process_relations(result.relations, result.entities)
+
+
+@benchmark("canon_name")
+def bench_canon_name(n):
+    names = [name for name, _ in gen.entity_names(n)]
+    return lambda: [canon_name(x) for x in names]
+
+
+@benchmark("canon_relation")
+def bench_canon_relation(n):
+    labels = gen.relation_labels(n)
+    return lambda: [canon_relation(x) for x in labels]
+
+
+@benchmark("kg_builder.add_entities")
+def bench_add_entities(n):
+    entities, kg = gen.extraction_result(n, duplicate_rate=0).entities, KGBuilder()
+    return lambda: kg.add_entities(entities)
+
+
+@benchmark("kg_builder.add_relations")
+def bench_add_relations(n):
+    result, kg = gen.extraction_result(n), KGBuilder()
+    kg.add_entities(result.entities)
+    return lambda: kg.add_relations(result.relations)
+
+
+@benchmark("kg_builder.add_personality")
+def bench_add_personality(n):
+    result, kg = gen.extraction_result(n, duplicate_rate=0), KGBuilder()
+    kg.add_entities(result.entities)
+    personality = gen.personality_result(n)
+    return lambda: kg.add_personality(personality)
+
+
+def _built_graph(n) -> KGBuilder:
+    result, kg = gen.extraction_result(n), KGBuilder()
+    kg.add_entities(result.entities)
+    kg.add_relations(result.relations)
+    kg.add_personality(gen.personality_result(n))
+    return kg
+
+
+def _export(kg: KGBuilder, fmt: str):
+    out_dir = tempfile.mkdtemp(prefix="kg_bench_")
+    try:
+        return kg.export(out_dir, "bench", fmt=fmt, html=False)  # the graph format only, not the HTML layout
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+# GraphML writing holds the whole XML tree in memory, so it stops at 10^5 nodes
+@benchmark("kg_builder.export[graphml]", max_size=10**5)
+def bench_export_graphml(n):
+    kg = _built_graph(n)
+    return lambda: _export(kg, "graphml")
+
+
+@benchmark("kg_builder.export[npz]")
+def bench_export_npz(n):
+    kg = _built_graph(n)
+    return lambda: _export(kg, "npz")
+
+
+@benchmark("evaluate_extraction")
+def bench_evaluate_extraction(n):
+    gold = gen.extraction_result(n)
+    pred = gen.noisy_prediction(gold)
+    return lambda: evaluate_extraction(pred, gold)
+
+
+@benchmark("evaluate_personality")
+def bench_evaluate_personality(n):
+    gold, pred = gen.personality_result(n, seed=0), gen.personality_result(n, seed=1)
+    return lambda: evaluate_personality(pred, gold)
@@ -0,0 +1,131 @@
+"""
+Local OpenAI-compatible chat completions server that injects 429s and timeouts, for exercising
+LLMClient's rate limiter and retries without a real API:
+
+    python fake_llm_server.py --port 8099 --max-concurrency 4 --rpm 600 --throttle-rate 0.1
+    set OPENAI_BASE_URL=http://127.0.0.1:8099/v1
+"""
+import argparse, json, random, threading, time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED = {
+    "entities": [{"name": "Dr. Emily Carter", "type": "Person"}, {"name": "Stanford", "type": "Organization"}],
+    "relations": [{"source_name": "Dr. Emily Carter", "relation_type": "affiliated with",
+                   "target_name": "Stanford", "confidence": 0.9, "evidence": "Dr. Emily Carter works at Stanford."}],
+}
+
+
+class FakeLLMState:
+    def __init__(self, max_concurrency: int, rpm: int, throttle_rate: float, timeout_rate: float,
+                 latency_s: float, retry_after_s: float):
+        self.max_concurrency, self.rpm = max_concurrency, rpm
+        self.throttle_rate, self.timeout_rate = throttle_rate, timeout_rate
+        self.latency_s, self.retry_after_s = latency_s, retry_after_s
+        self.in_flight = 0
+        self.recent = deque()
+        self.lock = threading.Lock()
+        self.counts = {"ok": 0, "throttled": 0, "timeouts": 0, "peak_in_flight": 0}
+
+    def admit(self) -> bool:
+        """False if this request breaks the concurrency / per-minute limit or is randomly throttled."""
+        with self.lock:
+            now = time.monotonic()
+            while self.recent and now - self.recent[0] > 60:
+                self.recent.popleft()
+            over = (self.max_concurrency and self.in_flight >= self.max_concurrency) or \
+                   (self.rpm and len(self.recent) >= self.rpm) or random.random() < self.throttle_rate
+            if over:
+                self.counts["throttled"] += 1
+                return False
+            self.in_flight += 1
+            self.recent.append(now)
+            self.counts["peak_in_flight"] = max(self.counts["peak_in_flight"], self.in_flight)
+            return True
+
+    def done(self, key: str):
+        with self.lock:
+            self.in_flight -= 1
+            self.counts[key] += 1
+
+
+def make_handler(state: FakeLLMState):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _json(self, code: int, body: dict, headers: dict = None):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/stats"):
+                with state.lock:
+                    self._json(200, dict(state.counts))
+            else:
+                self._json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                return self._json(404, {"error": {"message": "not found"}})
+            if not state.admit():
+                return self._json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                                  {"Retry-After": str(state.retry_after_s)} if state.retry_after_s else None)
+            try:
+                if random.random() < state.timeout_rate:
+                    state.done("timeouts")
+                    return self._json(504, {"error": {"message": "upstream timeout"}})
+                time.sleep(random.expovariate(1 / state.latency_s) if state.latency_s else 0)
+                content = json.dumps(CANNED)
+                self._json(200, {
+                    "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()),
+                    "model": body.get("model", "fake"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                                 "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                })
+                state.done("ok")
+            except Exception:
+                state.done("timeouts")
+                raise
+
+    return Handler
+
+
+def serve(port: int = 8099, **kwargs) -> ThreadingHTTPServer:
+    """Start the server in a daemon thread and return it (call .shutdown() to stop)."""
+    state = FakeLLMState(**kwargs)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--port", type=int, default=8099)
+    p.add_argument("--max-concurrency", type=int, default=4, help="429 above this many requests in flight (0 = off)")
+    p.add_argument("--rpm", type=int, default=0, help="429 above this many requests per minute (0 = off)")
+    p.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests randomly rejected with 429")
+    p.add_argument("--timeout-rate", type=float, default=0.0, help="fraction of requests answered with 504")
+    p.add_argument("--latency", type=float, default=0.2, help="mean response latency in seconds")
+    p.add_argument("--retry-after", type=float, default=0.0, help="Retry-After seconds sent with 429s (0 = none)")
+    args = p.parse_args()
+    server = serve(args.port, max_concurrency=args.max_concurrency, rpm=args.rpm, throttle_rate=args.throttle_rate,
+                   timeout_rate=args.timeout_rate, latency_s=args.latency, retry_after_s=args.retry_after)
+    print(f"Fake LLM server on http://127.0.0.1:{args.port}/v1 (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import argparse, json, re, sys
+import numpy as np
+from src.kg_query import KGIndex
+from src.trait_index import TraitIndex
+from src.models import TRAITS
+
+TRAIT_RE = re.compile(r"^(\w+)\s*(>=|<=|>|<|=)\s*([-+0-9.eE]+)$")
+
+
+def parse_traits(specs):
+    """['openness>0.7', 'neuroticism<=0.3'] -> {'openness': (lo, None), 'neuroticism': (None, 0.3)}.
+
+    '>=' / '<=' are inclusive and '=' pins both ends. Traits are stored as float32, so '>' / '<'
+    become inclusive bounds one float32 step past the value (0.7 itself is excluded).
+    """
+    ranges = {}
+    for spec in specs or []:
+        m = TRAIT_RE.match(spec.strip())
+        if not m or m.group(1) not in TRAITS:
+            raise SystemExit(f"Bad --trait '{spec}', expected e.g. openness>0.7 (traits: {', '.join(TRAITS)})")
+        trait, op, value = m.group(1), m.group(2), np.float32(m.group(3))
+        lo, hi = ranges.get(trait, (None, None))
+        if op in (">", ">=", "="):
+            bound = float(np.nextafter(value, np.float32(np.inf)) if op == ">" else value)
+            lo = bound if lo is None else max(lo, bound)
+        if op in ("<", "<=", "="):
+            bound = float(np.nextafter(value, np.float32(-np.inf)) if op == "<" else value)
+            hi = bound if hi is None else min(hi, bound)
+        ranges[trait] = (lo, hi)
+    return ranges
+
+
+def cmd_query(args):
+    index = KGIndex.load(args.graph)
+    rows = index.query(type=args.type, rel=args.rel, target=args.target, source=args.source,
+                       name_prefix=args.prefix, traits=parse_traits(args.trait), limit=args.limit)
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return
+    for r in rows:
+        traits = ", ".join(f"{t[:3]}={r[t]:.2f}" for t in TRAITS if t in r)
+        print(f"{r['id']}\t{r['name']} ({r['type']})" + (f"\t[{traits}]" if traits else ""))
+    print(f"{len(rows)} result(s)", file=sys.stderr)
+
+
+def cmd_similar(args):
+    index = TraitIndex(KGIndex.load(args.graph))
+    if index.vector(args.node) is None:
+        raise SystemExit(f"No complete trait vector for '{args.node}'")
+    rows = index.similar(args.node, k=args.k, rel=args.rel, hops=args.hops)
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return
+    for r in rows:
+        print(f"{r['distance']:.4f}\t{r['id']}\t{r['name']}")
+    print(f"{len(rows)} result(s) from {len(index)} indexed people", file=sys.stderr)
+
+
+def main():
+    p = argparse.ArgumentParser(prog="kg")
+    sub = p.add_subparsers(dest="command", required=True)
+    q = sub.add_parser("query", help="find nodes by type, relation, name prefix and trait ranges")
+    q.add_argument("--graph", required=True, help=".graphml or .npz graph file")
+    q.add_argument("--type", default=None, help="entity type, e.g. Person")
+    q.add_argument("--rel", default=None, help="relation type, e.g. AFFILIATED_WITH")
+    q.add_argument("--target", default=None, help="nodes with a --rel edge into this node")
+    q.add_argument("--source", default=None, help="nodes this node points to with --rel")
+    q.add_argument("--prefix", default=None, help="name prefix (case-insensitive)")
+    q.add_argument("--trait", action="append", help="trait bound, e.g. openness>0.7 (repeatable)")
+    q.add_argument("--limit", type=int, default=50)
+    q.add_argument("--json", action="store_true")
+    q.set_defaults(func=cmd_query)
+    s = sub.add_parser("similar", help="people with the closest Big Five trait vectors")
+    s.add_argument("--graph", required=True, help=".graphml or .npz graph file")
+    s.add_argument("--node", required=True, help="node id or name of the person")
+    s.add_argument("--k", type=int, default=10)
+    s.add_argument("--rel", default=None, help="only people sharing a target of this relation, e.g. WORKS_AT")
+    s.add_argument("--hops", type=int, default=None, help="only people within this many hops")
+    s.add_argument("--json", action="store_true")
+    s.set_defaults(func=cmd_similar)
+    args = p.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -1,77 +1,86 @@
 # Top-level imports (perbaikan pada impor 'src')
 import argparse
+import glob
+import json
 import os
+import re
 import time
-from typing import List, Dict
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Optional, Tuple
 from tqdm import tqdm
 from src.config import load_config
 from src.llm_client import LLMClient
 from src.prompts import KG_EXTRACT_SYSTEM, PERSONALITY_SYSTEM, SYNTHETIC_DATA_SYSTEM
-from src.models import Entity, Relation, ExtractionResult, PersonalityResult, SyntheticDoc
+from src.models import Entity, Relation, ExtractionResult, PersonalityResult, SyntheticDoc, TRAITS
 from src.kg_builder import KGBuilder
-from src.evaluator import evaluate_extraction, evaluate_personality
+from src.compact_graph import CompactGraph
+from src.kg_store import KGStore
+from src.evaluator import evaluate_extraction, evaluate_personality, evaluate_personality_corpus
 from src.dagshub_tracker import DagsHubTracker
 from src.normalization import canon_relation
+from src.entity_resolution import resolve_entities
+from src.segmentation import pack_segments, estimate_tokens, DEFAULT_MAX_TOKENS
+from src.tracing import configure_tracing, get_tracer
 
-def parse_extraction_json(j: Dict) -> ExtractionResult:
-    ents, rels = [], []
+def parse_entity_item(e) -> Optional[Entity]:
+    """One element of the "entities" list (a dict or a 'Name (Type)' string) -> Entity, or None."""
+    if isinstance(e, dict):
+        name = e.get("name") or e.get("entity") or ""
+        etype = e.get("type") or e.get("category") or "Concept"
+    elif isinstance(e, str):
+        s = e.strip()
+        name, etype = s, "Concept"
+        m = re.match(r"^(.*)\s*\((Person|Organization|Event|Location|Concept)\)\s*$", s)
+        if m:
+            name = m.group(1).strip()
+            etype = m.group(2)
+    else:
+        return None
+    if not name:
+        return None
+    return Entity(
+        id=name.lower(),
+        name=name,
+        type=etype,
+        canonical_name=name,
+    )
+
+def parse_relation_item(r) -> Optional[Relation]:
+    """One element of the "relations" list -> Relation, or None."""
+    if isinstance(r, dict):
+        source_name = r.get("source_name") or r.get("source") or ""
+        target_name = r.get("target_name") or r.get("target") or ""
+        rel_type = r.get("relation_type") or r.get("type") or "MENTIONS"
+        conf = r.get("confidence", 1.0)
+        evidence = r.get("evidence")
+    elif isinstance(r, str):
+        # fallback: treat as evidence-only string
+        source_name, target_name, rel_type = "", "", "MENTIONS"
+        conf, evidence = 1.0, r
+    else:
+        return None
+
+    return Relation(
+        source_id=(source_name or "").lower(),
+        target_id=(target_name or "").lower(),
+        type=rel_type,
+        confidence=float(conf) if isinstance(conf, (int, float, str)) else 1.0,
+        evidence=evidence,
+        meta={"source_name": source_name, "target_name": target_name},
+    )
 
-    # normalize entities to a list
+def parse_extraction_json(j: Dict) -> ExtractionResult:
+    # normalize entities / relations to lists
     raw_entities = j.get("entities", [])
     if isinstance(raw_entities, dict):
         raw_entities = list(raw_entities.values())
-
-    for e in raw_entities:
-        if isinstance(e, dict):
-            name = e.get("name") or e.get("entity") or ""
-            etype = e.get("type") or e.get("category") or "Concept"
-        elif isinstance(e, str):
-            s = e.strip()
-            name, etype = s, "Concept"
-            import re
-            m = re.match(r"^(.*)\s*\((Person|Organization|Event|Location|Concept)\)\s*$", s)
-            if m:
-                name = m.group(1).strip()
-                etype = m.group(2)
-        else:
-            continue
-        if not name:
-            continue
-        ents.append(Entity(
-            id=name.lower(),
-            name=name,
-            type=etype,
-            canonical_name=name,
-        ))
-
-    # normalize relations to a list
     raw_relations = j.get("relations", [])
     if isinstance(raw_relations, dict):
         raw_relations = list(raw_relations.values())
 
-    for r in raw_relations:
-        if isinstance(r, dict):
-            source_name = r.get("source_name") or r.get("source") or ""
-            target_name = r.get("target_name") or r.get("target") or ""
-            rel_type = r.get("relation_type") or r.get("type") or "MENTIONS"
-            conf = r.get("confidence", 1.0)
-            evidence = r.get("evidence")
-        elif isinstance(r, str):
-            # fallback: treat as evidence-only string
-            source_name, target_name, rel_type = "", "", "MENTIONS"
-            conf, evidence = 1.0, r
-        else:
-            continue
-
-        rels.append(Relation(
-            source_id=(source_name or "").lower(),
-            target_id=(target_name or "").lower(),
-            type=rel_type,
-            confidence=float(conf) if isinstance(conf, (int, float, str)) else 1.0,
-            evidence=evidence,
-            meta={"source_name": source_name, "target_name": target_name},
-        ))
-
+    ents = [e for e in map(parse_entity_item, raw_entities) if e is not None]
+    rels = [r for r in map(parse_relation_item, raw_relations) if r is not None]
     return ExtractionResult(entities=ents, relations=rels)
 
 def parse_personality_json(j: Dict) -> PersonalityResult:
@@ -85,7 +94,6 @@ def parse_personality_json(j: Dict) -> PersonalityResult:
         }
     elif isinstance(raw_traits, list):
         # try to coerce list-shaped outputs into the expected dict, when possible
-        big5 = ["openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism"]
         for item in raw_traits:
             # expect either direct big5 keys with a 'person' field, or ('trait','value','person')
             person = item.get("person") or item.get("name") or item.get("subject")
@@ -93,7 +101,7 @@ def parse_personality_json(j: Dict) -> PersonalityResult:
                 continue
             traits_dict.setdefault(person, {})
             # case: item carries big5 keys directly
-            for k in big5:
+            for k in TRAITS:
                 if k in item:
                     try:
                         traits_dict[person][k] = float(item[k])
@@ -102,7 +110,7 @@ def parse_personality_json(j: Dict) -> PersonalityResult:
             # case: item has 'trait' and 'value' we can map when trait is big5
             tlabel = (item.get("trait") or "").strip().lower()
             val = item.get("value")
-            if tlabel in big5 and val is not None:
+            if tlabel in TRAITS and val is not None:
                 try:
                     v = float(val)
                     if v > 1:
@@ -113,11 +121,24 @@ def parse_personality_json(j: Dict) -> PersonalityResult:
     evidence_dict = j.get("evidence", {}) if isinstance(j.get("evidence", {}), dict) else {}
     return PersonalityResult(traits=traits_dict, evidence=evidence_dict)
 
-def post_process_relations(relations: List[Relation], entities: List[Entity]) -> List[Relation]:
-    """Post-process relations to improve quality and consistency"""
-    
-    # Create entity name mapping for normalization
+def build_entity_name_map(entities: List[Entity]) -> Tuple[Dict[str, str], Dict[str, List[str]]]:
+    """Map lowercased entity names (and Dr./Prof. short forms) to their full names.
+
+    Returns the mapping plus the short forms that fit several distinct full names.
+    """
+    # Index full names (3+ tokens) by every suffix of their last token, so a short form
+    # "Dr. Carter" finds the same candidates as name.endswith("Carter") without a full scan.
+    # Candidate lists keep entity order, so the first match is the same as before.
+    suffix_index: Dict[str, List[Entity]] = {}
+    for other_e in entities:
+        tokens = other_e.name.split()
+        if len(tokens) > 2 and not other_e.name[-1].isspace():
+            last = tokens[-1]
+            for k in range(len(last)):
+                suffix_index.setdefault(last[k:], []).append(other_e)
+
     entity_names = {}
+    short_forms: Dict[str, set] = {}
     for e in entities:
         # Map both full and short names
         entity_names[e.name.lower()] = e.name
@@ -129,14 +150,24 @@ def post_process_relations(relations: List[Relation], entities: List[Entity]) ->
                 # Full name like "Dr. Emily Carter" -> also map "Dr. Carter"
                 short_form = f"{parts[0]} {parts[-1]}"
                 entity_names[short_form.lower()] = e.name
+                short_forms.setdefault(short_form.lower(), set()).add(e.name)
             elif len(parts) == 2:
                 # Short form like "Dr. Carter" -> try to find full name
-                for other_e in entities:
-                    if (other_e.name.startswith(parts[0]) and 
-                        other_e.name.endswith(parts[1]) and 
-                        len(other_e.name.split()) > 2):
-                        entity_names[e.name.lower()] = other_e.name
-                        break
+                matches = [o.name for o in suffix_index.get(parts[1], []) if o.name.startswith(parts[0])]
+                if matches:
+                    entity_names[e.name.lower()] = matches[0]
+                    short_forms.setdefault(e.name.lower(), set()).update(matches)
+
+    ambiguous = {k: sorted(v) for k, v in short_forms.items() if len(v) > 1}
+    return entity_names, ambiguous
+
+def post_process_relations(relations: List[Relation], entities: List[Entity],
+                           entity_names: Optional[Dict[str, str]] = None) -> List[Relation]:
+    """Post-process relations to improve quality and consistency"""
+    
+    # Create entity name mapping for normalization
+    if entity_names is None:
+        entity_names, _ = build_entity_name_map(entities)
     
     processed_relations = []
     seen_relations = set()
@@ -183,54 +214,219 @@ def post_process_relations(relations: List[Relation], entities: List[Entity]) ->
 
 def generate_synthetic(llm: LLMClient, n: int) -> List[SyntheticDoc]:
     docs = []
-    for _ in tqdm(range(n), desc="Generating synthetic"):
-        j = llm.complete_json(SYNTHETIC_DATA_SYSTEM, "Create a realistic 3-paragraph narrative.")
+    for i in tqdm(range(n), desc="Generating synthetic"):
+        # each call must produce a new document: bypass the response cache, and number the
+        # prompts so the deterministic mock provider varies too
+        j = llm.complete_json(SYNTHETIC_DATA_SYSTEM, f"Create a realistic 3-paragraph narrative. (Document {i + 1} of {n})",
+                              cache=False)
         gt = parse_extraction_json(j.get("ground_truth", {}))
         gp = parse_personality_json(j.get("ground_personality", {}))
         docs.append(SyntheticDoc(text=j.get("text",""), ground_truth=gt, ground_personality=gp))
     return docs
 
-def run_on_text(llm: LLMClient, text: str) -> Dict:
-    # naive segmentation by paragraphs
-    segments = [p.strip() for p in text.split("\n") if p.strip()]
+def run_on_text(llm: LLMClient, text: str, max_segment_tokens: int = DEFAULT_MAX_TOKENS,
+                overlap_sentences: int = 0, verbose: bool = True, stream: bool = False) -> Dict:
+    tracer = get_tracer()
+    # pack consecutive paragraphs into token-budgeted segments
+    with tracer.span("stage.segmentation"):
+        segments, seg_stats = pack_segments(
+            text, max_segment_tokens, overlap_sentences, system_prompt_tokens=estimate_tokens(KG_EXTRACT_SYSTEM)
+        )
+    if verbose:
+        print(f"Segmentation: {seg_stats['paragraphs']} paragraphs -> {seg_stats['segments']} segments "
+              f"({seg_stats['calls_saved']} calls saved)")
     all_ents, all_rels = [], []
-    for seg in tqdm(segments, desc="Extracting KG"):
-        ej = llm.complete_json(KG_EXTRACT_SYSTEM, seg)
-        res = parse_extraction_json(ej)
-        all_ents.extend(res.entities)
-        all_rels.extend(res.relations)
+    with tracer.span("stage.extraction", segments=len(segments)) as extraction_span:
+        if stream:
+            # items are parsed while the responses are still being generated, then joined in segment order
+            per_segment = [([], []) for _ in segments]
+            t0, first_item_s = time.time(), None
+            with tqdm(total=len(segments), desc="Extracting KG (stream)", disable=not verbose) as pbar:
+                for i, key, item in llm.stream_json_many(KG_EXTRACT_SYSTEM, segments, on_done=pbar.update):
+                    if key == "entities":
+                        parsed, bucket = parse_entity_item(item), per_segment[i][0]
+                    elif key == "relations":
+                        parsed, bucket = parse_relation_item(item), per_segment[i][1]
+                    else:
+                        continue
+                    if parsed is not None:
+                        bucket.append(parsed)
+                        if first_item_s is None:
+                            first_item_s = time.time() - t0
+            for ents, rels in per_segment:
+                all_ents.extend(ents)
+                all_rels.extend(rels)
+            seg_stats = dict(seg_stats, first_item_s=round(first_item_s, 3) if first_item_s is not None else None)
+            if first_item_s is not None:
+                extraction_span.set(first_item_s=first_item_s)
+                if verbose:
+                    print(f"First extracted item after {first_item_s:.2f}s")
+        else:
+            with tqdm(total=len(segments), desc="Extracting KG", disable=not verbose) as pbar:
+                # concurrent calls; results come back in segment order
+                ejs = llm.complete_json_many(KG_EXTRACT_SYSTEM, segments, on_done=pbar.update)
+            for ej in ejs:
+                res = parse_extraction_json(ej)
+                all_ents.extend(res.entities)
+                all_rels.extend(res.relations)
 
     # Post-process relations to improve quality
-    print(f"Before post-processing: {len(all_rels)} relations")
-    all_rels = post_process_relations(all_rels, all_ents)
-    print(f"After post-processing: {len(all_rels)} relations")
+    n_raw = len(all_rels)
+    with tracer.span("stage.post_processing"):
+        entity_names, ambiguous_names = build_entity_name_map(all_ents)
+        all_rels = post_process_relations(all_rels, all_ents, entity_names)
+    if verbose:
+        print(f"Before post-processing: {n_raw} relations")
+        print(f"After post-processing: {len(all_rels)} relations")
+        if ambiguous_names:
+            print(f"Ambiguous short names: {len(ambiguous_names)}")
+
+    # Resolve mentions across segments into one entity per real-world referent
+    n_mentions = len(all_ents)
+    with tracer.span("stage.entity_resolution"):
+        all_ents, aliases = resolve_entities(all_ents)
+    if verbose:
+        print(f"Entity resolution: {n_mentions} mentions -> {len(all_ents)} entities")
 
     # personality inference across whole document (names appear in all_ents)
     names = sorted(set([e.name for e in all_ents if e.type == "Person"]))
-    pj = llm.complete_json(PERSONALITY_SYSTEM, "Infer traits for persons: " + ", ".join(names))
-    pr = parse_personality_json(pj)
+    with tracer.span("stage.personality"):
+        pj = llm.complete_json(PERSONALITY_SYSTEM, "Infer traits for persons: " + ", ".join(names))
+        pr = parse_personality_json(pj)
 
     # build graph
-    builder = KGBuilder()
-    builder.add_entities(all_ents)
-    builder.add_relations(all_rels)
-    builder.add_personality(pr)
+    with tracer.span("stage.graph_build"):
+        builder = KGBuilder()
+        builder.add_entities(all_ents, aliases)
+        builder.add_relations(all_rels, aliases)
+        builder.add_personality(pr, aliases)
     return {
         "extraction": ExtractionResult(entities=all_ents, relations=all_rels),
         "personality": pr,
         "graph": builder,
+        "segmentation": seg_stats,
+        "ambiguous_names": ambiguous_names,
+        "aliases": aliases,
     }
 
+def iter_corpus(path: str) -> Iterator[Tuple[str, str]]:
+    """Stream (doc_id, text) pairs from a directory of .txt files or a JSONL file.
+
+    JSONL lines are objects with a "text" field and an optional "id".
+    """
+    if os.path.isdir(path):
+        for p in sorted(glob.glob(os.path.join(path, "**", "*.txt"), recursive=True)):
+            doc_id = os.path.splitext(os.path.relpath(p, path))[0]
+            with open(p, "r", encoding="utf-8") as f:
+                yield doc_id, f.read()
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            for i, line in enumerate(f):
+                line = line.strip()
+                if not line:
+                    continue
+                obj = json.loads(line)
+                yield str(obj.get("id", i)), obj.get("text", "")
+
+def run_corpus(llm: LLMClient, path: str, out_dir: str, workers: int,
+               max_segment_tokens: int = DEFAULT_MAX_TOKENS, overlap_sentences: int = 0,
+               graph_backend: str = "networkx", store: Optional[KGStore] = None, stream: bool = False) -> Dict:
+    """Process a corpus with a pool of document workers, merging every result into one global graph.
+
+    At most 2*workers documents are in flight, and results are merged in input order so the
+    global graph does not depend on completion order. graph_backend="compact" keeps the
+    global graph in a CompactGraph instead of a networkx-backed KGBuilder. If a KGStore is
+    given, each document is also appended to it in its own transaction.
+    """
+    docs_dir = os.path.join(out_dir, "docs")
+    os.makedirs(docs_dir, exist_ok=True)
+    global_kg = CompactGraph() if graph_backend == "compact" else KGBuilder()
+    tracer = get_tracer()
+    stats = {"documents": 0, "entities": 0, "relations": 0, "calls_saved": 0}
+
+    used_names = set()
+
+    def doc_file(doc_id: str) -> str:
+        # ids that sanitize to the same name ("a b" / "a_b") or repeat in a JSONL corpus get a -2, -3, ... suffix
+        base = re.sub(r"[^\w.-]+", "_", doc_id)
+        name, k = base, 1
+        while name.lower() in used_names:  # lower(): case-insensitive filesystems
+            k += 1
+            name = f"{base}-{k}"
+        used_names.add(name.lower())
+        return os.path.join(docs_dir, f"{name}.json")
+
+    def process(doc_id: str, text: str, out_path: str):
+        r = run_on_text(llm, text, max_segment_tokens, overlap_sentences, verbose=False, stream=stream)
+        import orjson
+        with open(out_path, "wb") as f:
+            f.write(orjson.dumps({
+                "id": doc_id, "extraction": r["extraction"].model_dump(), "personality": r["personality"].model_dump(),
+                "segmentation": r["segmentation"]
+            }))
+        return r
+
+    def merge(r: Dict):
+        with tracer.span("stage.graph_merge"):
+            global_kg.add_entities(r["extraction"].entities, r["aliases"])
+            global_kg.add_relations(r["extraction"].relations, r["aliases"])
+            global_kg.add_personality(r["personality"], r["aliases"])
+        if store is not None:
+            with tracer.span("stage.store_ingest"):
+                store.ingest(r["extraction"], r["personality"], r["aliases"])
+        stats["documents"] += 1
+        stats["entities"] += len(r["extraction"].entities)
+        stats["relations"] += len(r["extraction"].relations)
+        stats["calls_saved"] += r["segmentation"]["calls_saved"]
+        pbar.update()
+
+    start = time.time()
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool, tqdm(desc="Corpus documents") as pbar:
+        for doc_id, text in iter_corpus(path):
+            pending.append(pool.submit(process, doc_id, text, doc_file(doc_id)))
+            if len(pending) >= 2 * max(1, workers):
+                merge(pending.popleft().result())
+        while pending:
+            merge(pending.popleft().result())
+    elapsed = time.time() - start
+
+    stats["elapsed_s"] = elapsed
+    stats["docs_per_sec"] = stats["documents"] / elapsed if elapsed > 0 else 0.0
+    if isinstance(global_kg, CompactGraph):
+        stats["graph_nodes"], stats["graph_edges"] = global_kg.num_nodes, global_kg.num_edges
+    else:
+        stats["graph_nodes"] = global_kg.graph.number_of_nodes()
+        stats["graph_edges"] = global_kg.graph.number_of_edges()
+    return {"graph": global_kg, "stats": stats}
+
 def main():
     cfg = load_config()
     parser = argparse.ArgumentParser()
-    parser.add_argument("--mode", choices=["synthetic","file"], default="synthetic")
+    parser.add_argument("--mode", choices=["synthetic","file","corpus"], default="synthetic")
     parser.add_argument("--n", type=int, default=3, help="num synthetic docs")
-    parser.add_argument("--input", type=str, help="path to input text file")
+    parser.add_argument("--input", type=str, help="path to input text file (corpus mode: directory or .jsonl)")
+    parser.add_argument("--graph-format", choices=["graphml", "npz"], default=cfg["graph_format"],
+                        help="graph file format (npz = compressed NumPy columns, much faster for large graphs)")
+    parser.add_argument("--no-html", dest="html", action="store_false", default=cfg["graph_html"],
+                        help="write only the graph file, without the HTML preview")
+    parser.add_argument("--graph-backend", choices=["networkx", "compact"], default=cfg["graph_backend"],
+                        help="storage for the merged corpus graph")
+    parser.add_argument("--workers", type=int, default=cfg["corpus_workers"], help="documents processed in parallel (corpus mode)")
+    parser.add_argument("--max-segment-tokens", type=int, default=cfg["segment_max_tokens"],
+                        help="token budget per extraction segment (0 = one segment per line)")
+    parser.add_argument("--overlap-sentences", type=int, default=cfg["segment_overlap_sentences"],
+                        help="sentences carried over between consecutive segments")
+    parser.add_argument("--kg-store", type=str, default=cfg["kg_store_path"],
+                        help="SQLite file of the persistent global graph to append results to")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the on-disk LLM response cache")
+    parser.add_argument("--stream", action="store_true", default=cfg["llm_streaming"],
+                        help="stream extraction responses and parse entities/relations as they arrive")
     args = parser.parse_args()
 
     out_base = os.path.join(cfg["out_dir"], "runs", time.strftime("%Y%m%d-%H%M%S"))
     os.makedirs(out_base, exist_ok=True)
+    tracer = configure_tracing(cfg["tracing_enabled"])
 
     # Initialize DagsHub tracking
     tracker = DagsHubTracker()
@@ -239,20 +435,26 @@ def main():
     tracker.start_experiment(experiment_name, run_name)
 
     # Log pipeline parameters
+    # corpus runs log n_docs once the documents have been counted (MLflow params are immutable)
     tracker.log_params({
         "mode": args.mode,
-        "n_docs": args.n if args.mode == "synthetic" else 1,
+        **({"n_docs": args.n if args.mode == "synthetic" else 1} if args.mode != "corpus" else {}),
         "llm_provider": cfg["llm_provider"],
         "model": cfg.get(f"{cfg['llm_provider']}_model", "unknown"),
         "temperature": cfg["temperature"],
-        "input_file": args.input if args.mode == "file" else None
+        "max_segment_tokens": args.max_segment_tokens,
+        "overlap_sentences": args.overlap_sentences,
+        "input_file": args.input if args.mode in ("file", "corpus") else None
     })
 
-    llm = LLMClient()
+    llm = LLMClient(use_cache=False if args.no_cache else None)
+    llm.start_session_log(os.path.join(out_base, "sessions"))
+    store = KGStore(args.kg_store) if args.kg_store else None
 
     if args.mode == "synthetic":
         tracker.log_stage("synthetic_generation", "Generating synthetic documents")
-        docs = generate_synthetic(llm, args.n)
+        with tracer.span("stage.synthetic_generation"):
+            docs = generate_synthetic(llm, args.n)
         
         tracker.log_stage("processing", "Processing documents and extracting knowledge")
         metrics = []
@@ -260,20 +462,31 @@ def main():
         total_relations = 0
         avg_extraction_precision = 0
         avg_personality_accuracy = 0
+        total_calls_saved = 0
+        personality_pairs = []
         
         for i, d in enumerate(docs):
-            r = run_on_text(llm, d.text)
-            gml, html = r["graph"].export(os.path.join(out_base, "graphs"), f"doc{i}")
-            m1 = evaluate_extraction(r["extraction"], d.ground_truth)
-            m2 = evaluate_personality(r["personality"], d.ground_personality)
+            r = run_on_text(llm, d.text, args.max_segment_tokens, args.overlap_sentences, stream=args.stream)
+            if store is not None:
+                with tracer.span("stage.store_ingest"):
+                    store.ingest(r["extraction"], r["personality"], r["aliases"])
+            with tracer.span("stage.export"):
+                gml, html = r["graph"].export(os.path.join(out_base, "graphs"), f"doc{i}", args.graph_format,
+                                              html=args.html)
+            with tracer.span("stage.evaluation"):
+                m1 = evaluate_extraction(r["extraction"], d.ground_truth)
+                m2 = evaluate_personality(r["personality"], d.ground_personality)
             
             # Track individual document metrics
             total_entities += len(r["extraction"].entities)
             total_relations += len(r["extraction"].relations)
             avg_extraction_precision += m1.get("precision", 0)
             avg_personality_accuracy += m2.get("accuracy", 0)
+            total_calls_saved += r["segmentation"]["calls_saved"]
+            personality_pairs.append((r["personality"], d.ground_personality))
             
-            metrics.append({"doc": i, "extraction": m1, "personality": m2, "graphml": gml, "html": html})
+            metrics.append({"doc": i, "extraction": m1, "personality": m2, "segmentation": r["segmentation"],
+                            "graphml": gml, "html": html})
         
         # Calculate and log aggregate metrics
         avg_extraction_precision /= len(docs)
@@ -286,32 +499,75 @@ def main():
             "avg_entities_per_doc": total_entities / len(docs),
             "avg_relations_per_doc": total_relations / len(docs),
             "avg_extraction_precision": avg_extraction_precision,
-            "avg_personality_accuracy": avg_personality_accuracy
+            "avg_personality_accuracy": avg_personality_accuracy,
+            "segmentation_calls_saved": total_calls_saved
         })
+
+        # corpus-level personality metrics with bootstrap confidence intervals
+        personality_eval = evaluate_personality_corpus(personality_pairs)
+        if personality_eval["n_persons"]:
+            tracker.log_metrics({
+                "personality_mae": personality_eval["mae"],
+                "personality_mae_ci_low": personality_eval["mae_ci"][0],
+                "personality_mae_ci_high": personality_eval["mae_ci"][1],
+                "personality_mse": personality_eval["mse"],
+                **{f"personality_{t}_mae": v["mae"] for t, v in personality_eval["traits"].items()},
+            })
         
         # save metrics
         import orjson
         metrics_file = os.path.join(out_base, "metrics.json")
         with open(metrics_file, "wb") as f:
             f.write(orjson.dumps(metrics, option=orjson.OPT_INDENT_2))
+        personality_file = os.path.join(out_base, "personality_eval.json")
+        with open(personality_file, "wb") as f:
+            f.write(orjson.dumps(personality_eval, option=orjson.OPT_INDENT_2))
         
-        # Log artifacts to DagsHub
+        # Log metric files to DagsHub (graphs go up with the experiment sync below)
         tracker.log_artifact(metrics_file, "metrics")
-        tracker.log_artifact(os.path.join(out_base, "graphs"), "graphs")
+        tracker.log_artifact(personality_file, "metrics")
+    elif args.mode == "corpus":
+        if not args.input or not os.path.exists(args.input):
+            raise FileNotFoundError("Provide --input path to a directory of .txt files or a .jsonl file.")
+        tracker.log_stage("corpus_processing", "Processing corpus documents")
+        r = run_corpus(llm, args.input, out_base, args.workers, args.max_segment_tokens, args.overlap_sentences,
+                       args.graph_backend, store, stream=args.stream)
+        with tracer.span("stage.export"):
+            gml, html = r["graph"].export(os.path.join(out_base, "graphs"), "corpus", args.graph_format, html=args.html)
+        stats = r["stats"]
+        print(f"Processed {stats['documents']} documents in {stats['elapsed_s']:.1f}s "
+              f"({stats['docs_per_sec']:.2f} docs/sec); global graph: "
+              f"{stats['graph_nodes']} nodes, {stats['graph_edges']} edges")
+        tracker.log_params({"n_docs": stats["documents"]})
+        tracker.log_metrics(stats)
+        import orjson
+        with open(os.path.join(out_base, "corpus.json"), "wb") as f:
+            f.write(orjson.dumps({"graphml": gml, "html": html, "stats": stats}, option=orjson.OPT_INDENT_2))
     else:
         if not args.input or not os.path.exists(args.input):
             raise FileNotFoundError("Provide --input path to an existing text file.")
         with open(args.input, "r", encoding="utf-8") as f:
             text = f.read()
-        r = run_on_text(llm, text)
-        gml, html = r["graph"].export(os.path.join(out_base, "graphs"), "input")
+        r = run_on_text(llm, text, args.max_segment_tokens, args.overlap_sentences, stream=args.stream)
+        if store is not None:
+            with tracer.span("stage.store_ingest"):
+                store.ingest(r["extraction"], r["personality"], r["aliases"])
+        with tracer.span("stage.export"):
+            gml, html = r["graph"].export(os.path.join(out_base, "graphs"), "input", args.graph_format, html=args.html)
         import orjson
         with open(os.path.join(out_base, "result.json"), "wb") as f:
             f.write(orjson.dumps({
-                "graphml": gml, "html": html, "extraction": r["extraction"].model_dump(), "personality": r["personality"].model_dump()
+                "graphml": gml, "html": html, "extraction": r["extraction"].model_dump(), "personality": r["personality"].model_dump(),
+                "segmentation": r["segmentation"]
             }, option=orjson.OPT_INDENT_2))
 
-    # save session logs for sharing
+    if store is not None:
+        counts = store.counts()
+        print(f"Global KG store {store.path}: {counts['entities']} entities, {counts['relations']} relations")
+        tracker.log_metrics({f"kg_store_{k}": v for k, v in counts.items()})
+        store.close()
+
+    # close the streamed session log
     sess_path = llm.save_session(os.path.join(out_base, "sessions"))
     
     # Log model and session info to DagsHub
@@ -319,21 +575,30 @@ def main():
         "provider": cfg["llm_provider"],
         "model": cfg.get(f"{cfg['llm_provider']}_model", "unknown"),
         "temperature": cfg["temperature"],
-        "total_api_calls": len(llm.session_logs)
+        "total_api_calls": llm.session_count,
+        **llm.cache_stats(),
+        **llm.rate_stats(),
     })
     
-    # Log session artifacts
-    tracker.log_artifact(sess_path, "session_logs")
-    tracker.log_artifact(out_base, "pipeline_outputs")
-    
-    # Upload to DagsHub storage bucket
-    experiment_name = f"{args.mode}_{time.strftime('%Y%m%d_%H%M%S')}"
-    storage_success = tracker.upload_experiment_to_storage(out_base, experiment_name)
+    # Sync the run directory (graphs, sessions, metrics) to storage once, skipping unchanged files
+    with tracer.span("stage.upload"):
+        experiment_name = f"{args.mode}_{time.strftime('%Y%m%d_%H%M%S')}"
+        storage_success = tracker.upload_experiment_to_storage(out_base, experiment_name)
     
     if storage_success:
         print("✅ Experiment artifacts uploaded to DagsHub storage bucket")
     else:
         print("⚠️  Storage upload skipped (not configured or failed)")
+
+    # latency percentiles per stage / LLM call: one JSON file and one batched MLflow call
+    if tracer.enabled:
+        trace_summary = tracer.summary()
+        trace_path = tracer.write_json(os.path.join(out_base, "trace.json"), trace_summary)
+        for name, st in trace_summary["spans"].items():
+            print(f"⏱️ {name}: n={st['count']} p50={st['p50_ms']:.0f}ms p95={st['p95_ms']:.0f}ms "
+                  f"p99={st['p99_ms']:.0f}ms" + (f" errors={st['errors']}" if st["errors"] else ""))
+        tracker.log_metrics(tracer.metrics(trace_summary))
+        tracker.log_artifact(trace_path, "metrics")
     
     # End experiment
     tracker.end_experiment()
@@ -1,6 +1,8 @@
-import argparse, os, glob, json, time
+import argparse, os, json, time
+from itertools import islice
 from src.llm_client import LLMClient
 from src.config import load_config
+from src.session_log import iter_sessions, reservoir_sample
 
 REPORT_SYSTEM_PROMPT = (
     "You are a technical writing assistant. Write a clear, structured report that explains: "
@@ -10,30 +12,29 @@ REPORT_SYSTEM_PROMPT = (
     "Focus on clarity, evaluation, and reasoning rather than UI/UX. Use concise sections and bullet points where helpful."
 )
 
-def load_run(run_dir: str):
+def load_run(run_dir: str, limit: int = 5, sample: bool = False, seed=None):
+    """Metrics plus at most `limit` session entries: the first ones, or a uniform reservoir
+    sample over the whole run with sample=True. Session files are streamed, never loaded whole."""
     metrics_path = os.path.join(run_dir, "metrics.json")
-    sessions_dir = os.path.join(run_dir, "sessions")
     metrics = {}
-    sessions = []
     if os.path.exists(metrics_path):
         with open(metrics_path, "r", encoding="utf-8") as f:
             metrics = json.load(f)
-    if os.path.isdir(sessions_dir):
-        for p in sorted(glob.glob(os.path.join(sessions_dir, "session-*.json"))):
-            with open(p, "r", encoding="utf-8") as f:
-                try:
-                    sessions.extend(json.load(f))
-                except Exception:
-                    pass
+    # legacy session-<ts>.json lists and streamed session-<ts>-NNN.jsonl[.gz|.zst] parts
+    entries = iter_sessions(os.path.join(run_dir, "sessions"))
+    sessions = reservoir_sample(entries, limit, seed) if sample else list(islice(entries, limit))
     return metrics, sessions
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--run", required=True, help="path to a run folder in outputs/runs/<timestamp>")
     ap.add_argument("--lang", choices=["en","id"], default="id")
+    ap.add_argument("--sessions", type=int, default=5, help="session log entries to include in the prompt")
+    ap.add_argument("--sample", action="store_true", help="pick entries uniformly from the whole run instead of the first ones")
+    ap.add_argument("--seed", type=int, default=None, help="random seed for --sample")
     args = ap.parse_args()
 
-    metrics, sessions = load_run(args.run)
+    metrics, sessions = load_run(args.run, limit=args.sessions, sample=args.sample, seed=args.seed)
     cfg = load_config()
     llm = LLMClient()
 
@@ -41,7 +42,7 @@ def main():
         f"Language: {'Indonesian' if args.lang=='id' else 'English'}.\n"
         f"Context:\n- Run folder: {args.run}\n"
         f"- Metrics (JSON excerpt):\n{json.dumps(metrics, ensure_ascii=False, indent=2)[:4000]}\n"
-        f"- Session logs (first few entries):\n{json.dumps(sessions[:5], ensure_ascii=False, indent=2)}\n\n"
+        f"- Session logs ({'sampled' if args.sample else 'first few'} entries):\n{json.dumps(sessions, ensure_ascii=False, indent=2)}\n\n"
         "Write the final report meeting the assignment requirements. Include:\n"
         "1) Overview & goals.\n"
         "2) Dataset & synthetic generation rationale (domain scientists if used).\n"
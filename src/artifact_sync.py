@@ -0,0 +1,243 @@
+"""
+Incremental, resumable artifact sync: upload a directory tree to a local directory, an MLflow
+run or an S3-compatible bucket, skipping files whose content is already there
+"""
+import hashlib
+import json
+import os
+import posixpath
+import shutil
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+MANIFEST_NAME = ".sync-manifest.json"
+JOURNAL_DIR = ".sync"
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class LocalBackend:
+    """A directory on the local filesystem (or a mounted share) as the destination."""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def put_file(self, local_path: str, key: str):
+        dst = self._path(key)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        tmp = dst + ".part"
+        shutil.copyfile(local_path, tmp)
+        os.replace(tmp, dst)  # readers never see a half-written file
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put_bytes(self, key: str, data: bytes):
+        dst = self._path(key)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        with open(dst + ".part", "wb") as f:
+            f.write(data)
+        os.replace(dst + ".part", dst)
+
+    def describe(self) -> str:
+        return f"file://{self.root}"
+
+
+class MlflowBackend:
+    """Artifacts of one MLflow run. Keys keep the local file name, as log_artifact requires."""
+
+    def __init__(self, run_id: str, client=None):
+        from mlflow.tracking import MlflowClient
+        self.run_id = run_id
+        self.client = client or MlflowClient()
+
+    def put_file(self, local_path: str, key: str):
+        self.client.log_artifact(self.run_id, local_path, posixpath.dirname(key) or None)
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        import mlflow
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                path = mlflow.artifacts.download_artifacts(run_id=self.run_id, artifact_path=key, dst_path=tmp)
+            except Exception:
+                return None
+            with open(path, "rb") as f:
+                return f.read()
+
+    def put_bytes(self, key: str, data: bytes):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, posixpath.basename(key))
+            with open(path, "wb") as f:
+                f.write(data)
+            self.put_file(path, key)
+
+    def describe(self) -> str:
+        return f"mlflow://{self.run_id}"
+
+
+class S3Backend:
+    """An S3-compatible bucket (DagsHub storage, MinIO, ...) through boto3."""
+
+    def __init__(self, bucket: str, root: str = "", endpoint_url: Optional[str] = None, client=None,
+                 transfer_config=None, **client_kwargs):
+        if client is None:
+            import boto3  # optional dependency, only needed for S3 destinations
+            client = boto3.client("s3", endpoint_url=endpoint_url or None, **client_kwargs)
+        self.bucket, self.root, self.client, self.endpoint_url = bucket, root.strip("/"), client, endpoint_url
+        self.transfer_config = transfer_config
+
+    def _key(self, key: str) -> str:
+        return posixpath.join(self.root, key) if self.root else key
+
+    def put_file(self, local_path: str, key: str):
+        self.client.upload_file(local_path, self.bucket, self._key(key), Config=self.transfer_config)
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self._key(key))["Body"].read()
+        except Exception as e:
+            code = getattr(e, "response", {}).get("Error", {}).get("Code")
+            if code in ("NoSuchKey", "404", "NotFound"):
+                return None
+            raise
+
+    def put_bytes(self, key: str, data: bytes):
+        self.client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data)
+
+    def describe(self) -> str:
+        return f"s3://{self.bucket}/{self.root}@{self.endpoint_url or 'aws'}"
+
+
+def iter_files(local_dir: str) -> Iterator[Tuple[str, str]]:
+    """(relative posix path, absolute path) for every file, skipping sync bookkeeping."""
+    for root, dirs, files in os.walk(local_dir):
+        dirs[:] = sorted(d for d in dirs if d != JOURNAL_DIR)
+        for name in sorted(files):
+            if name == MANIFEST_NAME or name.endswith(".part"):
+                continue
+            path = os.path.join(root, name)
+            yield os.path.relpath(path, local_dir).replace(os.sep, "/"), path
+
+
+class ArtifactSync:
+    """Uploads a directory under `prefix`, keeping a manifest of {path: sha256, size, mtime} there.
+
+    A file is uploaded only if its hash differs from the manifest entry for its path; files
+    whose size and mtime match the entry are not even re-hashed (unless verify=True). Every
+    finished upload is appended to a journal in <local_dir>/.sync/, so a sync that is
+    interrupted resumes where it stopped. The merged manifest is written to the destination
+    at the end and the journal removed.
+    """
+
+    def __init__(self, backend: Any, workers: int = 8, verify: bool = False):
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.verify = verify
+
+    def _journal_path(self, local_dir: str, prefix: str) -> str:
+        target = hashlib.sha1(f"{self.backend.describe()}|{prefix}".encode("utf-8")).hexdigest()[:16]
+        return os.path.join(local_dir, JOURNAL_DIR, f"{target}.jsonl")
+
+    def _load_known(self, prefix: str, journal: str) -> Dict[str, Dict]:
+        known = {}
+        raw = self.backend.get_bytes(posixpath.join(prefix, MANIFEST_NAME) if prefix else MANIFEST_NAME)
+        if raw:
+            try:
+                known.update(json.loads(raw).get("files", {}))
+            except ValueError:
+                print("⚠️ Ignoring unreadable sync manifest")
+        if os.path.exists(journal):
+            with open(journal, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line of an interrupted run
+                    known[entry.pop("path")] = entry
+        return known
+
+    def sync(self, local_dir: str, prefix: str = "") -> Dict[str, Any]:
+        prefix = prefix.strip("/")
+        journal = self._journal_path(local_dir, prefix)
+        known = self._load_known(prefix, journal)
+        resumed = os.path.exists(journal)
+        os.makedirs(os.path.dirname(journal), exist_ok=True)
+        stats = {"files": 0, "uploaded": 0, "skipped": 0, "failed": 0, "bytes_uploaded": 0, "bytes_skipped": 0,
+                 "resumed": resumed}
+        lock = threading.Lock()
+        start = time.time()
+
+        def process(rel: str, path: str) -> Tuple[str, Dict, bool]:
+            st = os.stat(path)
+            prev = known.get(rel)
+            if prev and not self.verify and prev.get("size") == st.st_size and prev.get("mtime_ns") == st.st_mtime_ns:
+                digest = prev["sha256"]
+            else:
+                digest = file_sha256(path)
+            entry = {"sha256": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+            if prev and prev.get("sha256") == digest:
+                return rel, entry, False
+            self.backend.put_file(path, posixpath.join(prefix, rel) if prefix else rel)
+            with lock, open(journal, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"path": rel, **entry}) + "\n")
+            return rel, entry, True
+
+        def collect(rel: str, fut):
+            try:
+                rel, entry, uploaded = fut.result()
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"⚠️ Failed to sync {rel}: {e}")
+                return
+            known[rel] = entry
+            stats["uploaded" if uploaded else "skipped"] += 1
+            stats["bytes_uploaded" if uploaded else "bytes_skipped"] += entry["size"]
+
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for rel, path in iter_files(local_dir):
+                stats["files"] += 1
+                pending.append((rel, pool.submit(process, rel, path)))
+                if len(pending) >= 2 * self.workers:
+                    collect(*pending.popleft())
+            while pending:
+                collect(*pending.popleft())
+
+        manifest = {"updated": time.time(), "files": dict(sorted(known.items()))}
+        self.backend.put_bytes(posixpath.join(prefix, MANIFEST_NAME) if prefix else MANIFEST_NAME,
+                               json.dumps(manifest, indent=1).encode("utf-8"))
+        if not stats["failed"] and os.path.exists(journal):
+            os.remove(journal)
+        try:
+            os.rmdir(os.path.dirname(journal))
+        except OSError:
+            pass  # journals of other destinations (or of this one, after failures) remain
+        stats["elapsed_s"] = round(time.time() - start, 3)
+        return stats
+
+
+def backend_from_uri(uri: str, **kwargs) -> Any:
+    """'s3://bucket/root' -> S3Backend, 'mlflow://<run_id>' -> MlflowBackend, anything else -> LocalBackend."""
+    if uri.startswith("s3://"):
+        bucket, _, root = uri[len("s3://"):].partition("/")
+        return S3Backend(bucket, root, **kwargs)
+    if uri.startswith("mlflow://"):
+        return MlflowBackend(uri[len("mlflow://"):])
+    return LocalBackend(uri[len("file://"):] if uri.startswith("file://") else uri)
@@ -0,0 +1,340 @@
+"""
+Compact array-backed knowledge graph store (alternative to the networkx-backed KGBuilder)
+"""
+import os
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import networkx as nx
+import orjson
+from .models import Entity, Relation, PersonalityResult, TRAITS
+from .normalization import canon_relation
+from .kg_builder import KGBuilder
+from .visualization import pagerank, render_html, DEFAULT_MAX_NODES
+
+
+class CompactGraph:
+    """Interned node ids and relation types, CSR adjacency in NumPy arrays, float32 trait matrix.
+
+    Accepts the same add_entities/add_relations/add_personality calls as KGBuilder. Edges are
+    appended to typed buffers and compacted by finalize(), which keeps the last edge per
+    (source, target, relation type) like MultiDiGraph keyed edges do. Missing traits are NaN.
+    """
+
+    def __init__(self):
+        self.node_keys: List[str] = []
+        self.node_index: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.type_names: List[str] = []
+        self._type_index: Dict[str, int] = {}
+        self.rel_names: List[str] = []
+        self._rel_index: Dict[str, int] = {}
+        self._node_type = array("h")
+        self._traits = np.full((64, len(TRAITS)), np.nan, dtype=np.float32)
+        self._src, self._dst, self._rel = array("i"), array("i"), array("h")
+        self._conf = array("f")
+        self._evidence: List[Optional[str]] = []
+        self._dirty = False
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.src = self.dst = np.zeros(0, dtype=np.int32)
+        self.rel = np.zeros(0, dtype=np.int16)
+        self.confidence = np.zeros(0, dtype=np.float32)
+        self.evidence: List[Optional[str]] = []
+
+    # -- interning ---------------------------------------------------------
+
+    def _intern_type(self, typ: str) -> int:
+        i = self._type_index.get(typ)
+        if i is None:
+            i = self._type_index[typ] = len(self.type_names)
+            self.type_names.append(typ)
+        return i
+
+    def _intern_rel(self, rel: str) -> int:
+        i = self._rel_index.get(rel)
+        if i is None:
+            i = self._rel_index[rel] = len(self.rel_names)
+            self.rel_names.append(rel)
+        return i
+
+    def _node(self, key: str, name: Optional[str] = None, typ: str = "") -> int:
+        i = self.node_index.get(key)
+        if i is None:
+            i = self.node_index[key] = len(self.node_keys)
+            self.node_keys.append(key)
+            self.names.append(name or key)
+            self._node_type.append(self._intern_type(typ))
+            if i >= self._traits.shape[0]:
+                grown = np.full((self._traits.shape[0] * 2, len(TRAITS)), np.nan, dtype=np.float32)
+                grown[:i] = self._traits[:i]
+                self._traits = grown
+        elif name is not None:
+            self.names[i] = name
+            self._node_type[i] = self._intern_type(typ)
+        return i
+
+    # -- KGBuilder-compatible construction -----------------------------------
+
+    def add_entities(self, entities: List[Entity], aliases: Optional[Dict[str, str]] = None):
+        for e in entities:
+            i = self._node(KGBuilder.node_id(e.name, aliases), e.name, e.type)
+            for k, t in enumerate(TRAITS):
+                if t in (e.attributes or {}):
+                    self._traits[i, k] = float(e.attributes[t])
+
+    def add_relations(self, relations: List[Relation], aliases: Optional[Dict[str, str]] = None):
+        for r in relations:
+            meta = getattr(r, "meta", {}) or {}
+            s = self._node(KGBuilder.node_id(meta.get("source_name", r.source_id), aliases))
+            t = self._node(KGBuilder.node_id(meta.get("target_name", r.target_id), aliases))
+            self._src.append(s)
+            self._dst.append(t)
+            self._rel.append(self._intern_rel(canon_relation(r.type)))
+            self._conf.append(r.confidence)
+            self._evidence.append(r.evidence)
+        self._dirty = True
+
+    def add_personality(self, personality: PersonalityResult, aliases: Optional[Dict[str, str]] = None):
+        for person_name, scores in personality.traits.items():
+            i = self.node_index.get(KGBuilder.node_id(person_name, aliases))
+            if i is None:
+                continue
+            for k, t in enumerate(TRAITS):
+                if t in scores:
+                    self._traits[i, k] = float(scores[t])
+
+    def finalize(self) -> "CompactGraph":
+        """Deduplicate edges (last one wins) and rebuild the CSR index, sorted by (src, dst, rel)."""
+        if not self._dirty and len(self.indptr) == self.num_nodes + 1:
+            return self
+        src = np.concatenate([self.src, np.frombuffer(self._src, dtype=np.int32)])
+        dst = np.concatenate([self.dst, np.frombuffer(self._dst, dtype=np.int32)])
+        rel = np.concatenate([self.rel, np.frombuffer(self._rel, dtype=np.int16)])
+        conf = np.concatenate([self.confidence, np.frombuffer(self._conf, dtype=np.float32)])
+        evidence = self.evidence + self._evidence
+        order = np.lexsort((np.arange(len(src)), rel, dst, src))
+        s, d, r = src[order], dst[order], rel[order]
+        last = np.ones(len(order), dtype=bool)
+        last[:-1] = (s[1:] != s[:-1]) | (d[1:] != d[:-1]) | (r[1:] != r[:-1])
+        keep = order[last]
+        self.src, self.dst, self.rel, self.confidence = src[keep], dst[keep], rel[keep], conf[keep]
+        self.evidence = [evidence[k] for k in keep]
+        self.indptr = np.zeros(self.num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.src, minlength=self.num_nodes), out=self.indptr[1:])
+        self._src, self._dst, self._rel, self._conf, self._evidence = array("i"), array("i"), array("h"), array("f"), []
+        self._dirty = False
+        return self
+
+    # -- queries -------------------------------------------------------------
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_keys)
+
+    @property
+    def num_edges(self) -> int:
+        self.finalize()
+        return len(self.src)
+
+    @property
+    def node_types(self) -> np.ndarray:
+        # copy: a live view would pin the buffer and block further appends
+        return np.frombuffer(self._node_type, dtype=np.int16).copy()
+
+    @property
+    def traits(self) -> np.ndarray:
+        """(num_nodes, 5) float32 view of the trait matrix, NaN where unknown."""
+        return self._traits[:self.num_nodes]
+
+    def out_edges(self, key: str) -> slice:
+        """Slice into src/dst/rel/confidence for the out-edges of a node."""
+        self.finalize()
+        i = self.node_index[key]
+        return slice(int(self.indptr[i]), int(self.indptr[i + 1]))
+
+    def neighbors(self, key: str) -> np.ndarray:
+        """Successor node indices (may repeat when several relation types link the same pair)."""
+        return self.dst[self.out_edges(key)]
+
+    def out_degree(self) -> np.ndarray:
+        self.finalize()
+        return np.diff(self.indptr)
+
+    def in_degree(self) -> np.ndarray:
+        self.finalize()
+        return np.bincount(self.dst, minlength=self.num_nodes)
+
+    def iter_edges(self) -> Iterator[Tuple[str, str, str, float, Optional[str]]]:
+        self.finalize()
+        keys, rels = self.node_keys, self.rel_names
+        for s, d, r, c, ev in zip(self.src.tolist(), self.dst.tolist(), self.rel.tolist(),
+                                  self.confidence.tolist(), self.evidence):
+            yield keys[s], keys[d], rels[r], c, ev
+
+    # -- conversion ----------------------------------------------------------
+
+    @classmethod
+    def from_networkx(cls, G: nx.MultiDiGraph) -> "CompactGraph":
+        cg = cls()
+        for n, data in G.nodes(data=True):
+            i = cg._node(str(n), data.get("name", str(n)), data.get("type", ""))
+            for k, t in enumerate(TRAITS):
+                if data.get(t) is not None:
+                    cg._traits[i, k] = float(data[t])
+        for s, t, data in G.edges(data=True):
+            cg._src.append(cg.node_index[str(s)])
+            cg._dst.append(cg.node_index[str(t)])
+            cg._rel.append(cg._intern_rel(data.get("type", "")))
+            cg._conf.append(float(data.get("confidence", 1.0)))
+            cg._evidence.append(data.get("evidence"))
+        cg._dirty = True
+        return cg.finalize()
+
+    def to_networkx(self, nodes: Optional[np.ndarray] = None) -> nx.MultiDiGraph:
+        """Materialize a MultiDiGraph with the same node/edge attributes KGBuilder produces.
+
+        networkx keeps per-node and per-edge dicts, so this necessarily copies; attribute
+        values are read straight from the arrays without intermediate objects. Pass node
+        indices to materialize only the induced subgraph.
+        """
+        self.finalize()
+        G = nx.MultiDiGraph()
+        types = self.node_types.tolist()
+        traits = self.traits.tolist()
+        selected = range(self.num_nodes) if nodes is None else np.asarray(nodes).tolist()
+        for i in selected:
+            attrs = {"name": self.names[i], "type": self.type_names[types[i]]}
+            for k, t in enumerate(TRAITS):
+                v = traits[i][k]
+                if v == v:  # not NaN
+                    attrs[t] = v
+            G.add_node(self.node_keys[i], **attrs)
+        if nodes is None:
+            for s, t, rel, conf, ev in self.iter_edges():
+                G.add_edge(s, t, key=rel, type=rel, confidence=conf, evidence=ev)
+            return G
+        mask = np.zeros(self.num_nodes, dtype=bool)
+        mask[np.asarray(nodes, dtype=np.int64)] = True
+        keys, rels = self.node_keys, self.rel_names
+        for e in np.flatnonzero(mask[self.src] & mask[self.dst]).tolist():
+            rel = rels[self.rel[e]]
+            G.add_edge(keys[self.src[e]], keys[self.dst[e]], key=rel, type=rel,
+                       confidence=float(self.confidence[e]), evidence=self.evidence[e])
+        return G
+
+    def top_nodes(self, k: int) -> np.ndarray:
+        """Indices of the k highest-degree nodes (in + out)."""
+        degree = self.out_degree() + self.in_degree()
+        return np.argsort(-degree, kind="stable")[:k]
+
+    def select_nodes(self, max_nodes: Optional[int] = DEFAULT_MAX_NODES, rank_by: str = "degree",
+                     ego: Optional[str] = None, radius: int = 1) -> np.ndarray:
+        """Array counterpart of visualization.select_subgraph: indices of the nodes to display,
+        so only those need to be materialized with to_networkx."""
+        self.finalize()
+        n, src, dst = self.num_nodes, self.src, self.dst
+        candidates = np.arange(n)
+        if ego is not None:
+            if ego not in self.node_index:
+                raise KeyError(f"Node not found: {ego}")
+            e = self.node_index[ego]
+            seen = np.zeros(n, dtype=bool)
+            seen[e] = True
+            frontier = seen.copy()
+            for _ in range(radius):
+                nxt = np.zeros(n, dtype=bool)
+                nxt[dst[frontier[src]]] = True
+                nxt[src[frontier[dst]]] = True
+                nxt &= ~seen
+                seen |= nxt
+                frontier = nxt
+            candidates = np.flatnonzero(seen)
+        if not max_nodes or len(candidates) <= max_nodes:
+            return candidates
+        # rank within the induced subgraph, as select_subgraph does
+        pos = np.full(n, -1, dtype=np.int64)
+        pos[candidates] = np.arange(len(candidates))
+        inside = (pos[src] >= 0) & (pos[dst] >= 0)
+        edges = np.stack([pos[src[inside]], pos[dst[inside]]], axis=1)
+        if rank_by == "pagerank":
+            score = pagerank(len(candidates), edges)
+        else:
+            score = np.bincount(edges.ravel(), minlength=len(candidates))
+        keep = candidates[np.argsort(-score, kind="stable")[:max_nodes]]
+        if ego is not None and e not in keep:
+            keep[-1] = e
+        return keep
+
+    def to_builder(self) -> KGBuilder:
+        builder = KGBuilder()
+        builder.graph = self.to_networkx()
+        return builder
+
+    # -- columnar persistence --------------------------------------------------
+
+    def save_npz(self, path: str, compress: bool = True) -> str:
+        """Write node/edge columns as NumPy arrays plus one orjson string table in a single .npz."""
+        self.finalize()
+        strings = orjson.dumps({
+            "node_keys": self.node_keys,
+            "names": self.names,
+            "type_names": self.type_names,
+            "rel_names": self.rel_names,
+            "evidence": self.evidence,
+        })
+        save = np.savez_compressed if compress else np.savez
+        with open(path, "wb") as f:
+            save(
+                f,
+                src=self.src, dst=self.dst, rel=self.rel, confidence=self.confidence,
+                indptr=self.indptr, node_type=self.node_types, traits=self.traits,
+                strings=np.frombuffer(strings, dtype=np.uint8),
+            )
+        return path
+
+    @classmethod
+    def load_npz(cls, path: str) -> "CompactGraph":
+        cg = cls()
+        with np.load(path) as z:
+            table = orjson.loads(z["strings"].tobytes())
+            cg.node_keys, cg.names = table["node_keys"], table["names"]
+            cg.type_names, cg.rel_names, cg.evidence = table["type_names"], table["rel_names"], table["evidence"]
+            cg.node_index = {k: i for i, k in enumerate(cg.node_keys)}
+            cg._type_index = {t: i for i, t in enumerate(cg.type_names)}
+            cg._rel_index = {r: i for i, r in enumerate(cg.rel_names)}
+            cg._node_type = array("h", z["node_type"].astype(np.int16).tobytes())
+            cg._traits = np.array(z["traits"], dtype=np.float32)
+            if cg._traits.shape[0] == 0:
+                cg._traits = np.full((64, len(TRAITS)), np.nan, dtype=np.float32)
+            cg.src, cg.dst, cg.rel = z["src"], z["dst"], z["rel"]
+            cg.confidence, cg.indptr = z["confidence"], z["indptr"]
+        return cg
+
+    def export(self, out_dir: str, base_name: str, fmt: Optional[str] = "npz",
+               max_nodes: Optional[int] = DEFAULT_MAX_NODES, html: bool = True) -> Tuple[Optional[str], Optional[str]]:
+        """Like KGBuilder.export, but writes the .npz straight from the arrays and only
+        materializes the top max_nodes nodes by degree for the HTML view (html=False skips it)."""
+        os.makedirs(out_dir, exist_ok=True)
+        if fmt == "npz":
+            path = self.save_npz(os.path.join(out_dir, f"{base_name}.npz"))
+        elif fmt == "graphml":
+            path = os.path.join(out_dir, f"{base_name}.graphml")
+            nx.write_graphml(self.to_networkx(), path)
+        else:
+            path = None
+        if not html:
+            return path, None
+        nodes = self.top_nodes(max_nodes) if max_nodes else None
+        html = render_html(self.to_networkx(nodes), os.path.join(out_dir, f"{base_name}.html"), max_nodes=max_nodes,
+                           totals=(self.num_nodes, self.num_edges))
+        return path, html
+
+
+def load_graph(path: str) -> nx.MultiDiGraph:
+    """Load a graph exported as .npz or GraphML into a full MultiDiGraph.
+
+    For large .npz graphs prefer CompactGraph.load_npz and materialize only what is needed.
+    """
+    if path.endswith(".npz"):
+        return CompactGraph.load_npz(path).to_networkx()
+    return nx.read_graphml(path)
@@ -4,22 +4,71 @@ from dotenv import load_dotenv
 def load_config():
     load_dotenv()
     return {
-        "llm_provider": os.getenv("LLM_PROVIDER", "openai"),  # openai or gemini
+        "llm_provider": os.getenv("LLM_PROVIDER", "openai"),  # openai, gemini or mock (offline)
         "openai_api_key": os.getenv("OPENAI_API_KEY", ""),
         "openai_model": os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
         "gemini_api_key": os.getenv("GEMINI_API_KEY", ""),
         "gemini_model": os.getenv("GEMINI_MODEL", "gemini-pro"),
         "temperature": float(os.getenv("LLM_TEMPERATURE", "0.2")),
+        # Deterministic offline provider (LLM_PROVIDER=mock)
+        "mock_model": os.getenv("MOCK_MODEL", "mock"),
+        "mock_seed": int(os.getenv("MOCK_SEED", "0")),
+        "mock_latency_ms": float(os.getenv("MOCK_LATENCY_MS", "0")),  # mean time to first token
+        "mock_latency_dist": os.getenv("MOCK_LATENCY_DIST", "lognormal"),  # fixed, exponential or lognormal
+        "mock_tokens_per_s": float(os.getenv("MOCK_TOKENS_PER_S", "0")),  # 0 = instant generation
+        "mock_error_rate": float(os.getenv("MOCK_ERROR_RATE", "0")),
+        "mock_error_kind": os.getenv("MOCK_ERROR_KIND", "throttle"),  # throttle or timeout
+        "mock_output_scale": float(os.getenv("MOCK_OUTPUT_SCALE", "1")),  # >1 = larger responses
+        "llm_max_concurrency": int(os.getenv("LLM_MAX_CONCURRENCY", "4")),  # max in-flight LLM calls per document
+        "llm_streaming": os.getenv("LLM_STREAMING", "false").lower() == "true",  # stream + parse extraction incrementally
+        "openai_base_url": os.getenv("OPENAI_BASE_URL", ""),  # e.g. a local OpenAI-compatible server
+        # Rate limiting / retries (shared per provider+model)
+        "llm_rpm": float(os.getenv("LLM_RPM", "0")),  # requests per minute, 0 = unlimited
+        "llm_tpm": float(os.getenv("LLM_TPM", "0")),  # tokens per minute, 0 = unlimited
+        "llm_max_inflight": int(os.getenv("LLM_MAX_INFLIGHT", "16")),  # ceiling for adaptive concurrency
+        "llm_adaptive_concurrency": os.getenv("LLM_ADAPTIVE_CONCURRENCY", "true").lower() == "true",
+        "llm_max_retries": int(os.getenv("LLM_MAX_RETRIES", "5")),
+        "llm_retry_base_delay": float(os.getenv("LLM_RETRY_BASE_DELAY", "1.0")),
+        "llm_retry_max_delay": float(os.getenv("LLM_RETRY_MAX_DELAY", "60")),
+        "llm_timeout_s": float(os.getenv("LLM_TIMEOUT_S", "120")),
+        "tracing_enabled": os.getenv("TRACING_ENABLED", "true").lower() == "true",  # per-stage / per-call spans
+        # Session logs: streamed to rotating JSONL files, only the last few kept in memory
+        "session_log_compression": os.getenv("SESSION_LOG_COMPRESSION", "none"),  # none, gzip or zstd
+        "session_log_max_mb": float(os.getenv("SESSION_LOG_MAX_MB", "64")),  # start a new file beyond this
+        "session_log_tail": int(os.getenv("SESSION_LOG_TAIL", "100")),  # entries kept in memory
+        "kg_store_path": os.getenv("KG_STORE_PATH", ""),  # SQLite global graph; empty = disabled
+        "graph_format": os.getenv("GRAPH_FORMAT", "graphml"),  # graphml or npz
+        "graph_html": os.getenv("GRAPH_HTML", "true").lower() == "true",  # HTML preview next to each graph file
+        "graph_backend": os.getenv("GRAPH_BACKEND", "networkx"),  # networkx or compact (corpus graph)
+        "corpus_workers": int(os.getenv("CORPUS_WORKERS", "4")),  # documents in flight in --mode corpus
+        # Segment packing for KG extraction
+        "segment_max_tokens": int(os.getenv("SEGMENT_MAX_TOKENS", "800")),  # 0 = one segment per line
+        "segment_overlap_sentences": int(os.getenv("SEGMENT_OVERLAP_SENTENCES", "0")),
+        # On-disk LLM response cache
+        "llm_cache_enabled": os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true",
+        "llm_cache_dir": os.getenv("LLM_CACHE_DIR", os.path.join(".cache", "llm")),
+        "llm_cache_max_mb": float(os.getenv("LLM_CACHE_MAX_MB", "512")),
+        "llm_cache_max_age_days": float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "0")),  # 0 = no expiry
         "out_dir": os.getenv("OUT_DIR", "c:\\Assigment\\outputs"),
         # DagsHub configuration
         "dagshub_enabled": os.getenv("DAGSHUB_ENABLED", "false").lower() == "true",
         "dagshub_repo": os.getenv("DAGSHUB_REPO", ""),  # username/repo-name
         "dagshub_token": os.getenv("DAGSHUB_TOKEN", ""),
         "mlflow_tracking_uri": os.getenv("MLFLOW_TRACKING_URI", ""),
+        "mlflow_batch_size": int(os.getenv("MLFLOW_BATCH_SIZE", "1000")),  # entities per log_batch call (max 1000)
+        "mlflow_flush_interval_s": float(os.getenv("MLFLOW_FLUSH_INTERVAL_S", "5")),  # max delay before queued values are sent
         
         # DagsHub Storage Bucket Configuration
         "dagshub_bucket_name": os.getenv("DAGSHUB_BUCKET_NAME", ""),
         "dagshub_endpoint_url": os.getenv("DAGSHUB_ENDPOINT_URL", ""),
         "dagshub_access_key_id": os.getenv("DAGSHUB_ACCESS_KEY_ID", ""),
+        "dagshub_secret_access_key": os.getenv("DAGSHUB_SECRET_ACCESS_KEY", ""),  # key id/secret default to the token
         "dagshub_region": os.getenv("DAGSHUB_REGION", "us-east-1"),
+        "storage_workers": int(os.getenv("STORAGE_WORKERS", "8")),  # files transferred in parallel
+        "storage_multipart_threshold_mb": float(os.getenv("STORAGE_MULTIPART_THRESHOLD_MB", "16")),
+        "storage_multipart_chunk_mb": float(os.getenv("STORAGE_MULTIPART_CHUNK_MB", "8")),
+        "storage_multipart_concurrency": int(os.getenv("STORAGE_MULTIPART_CONCURRENCY", "4")),  # parts in flight per file
+        # Experiment artifact sync (content-hash manifest, resumable)
+        "artifact_sync_dir": os.getenv("ARTIFACT_SYNC_DIR", ""),  # local/mounted destination instead of MLflow
+        "artifact_sync_workers": int(os.getenv("ARTIFACT_SYNC_WORKERS", "8")),
     }
\ No newline at end of file
@@ -2,101 +2,198 @@
 DagsHub Storage utilities for uploading and downloading artifacts
 """
 import os
-import subprocess
+import threading
 import logging
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from .config import load_config
 
 logger = logging.getLogger(__name__)
 
+DAGSHUB_S3_API = "https://dagshub.com/api/v1/repo-buckets/s3"
+
 class DagsHubStorage:
-    """Utility class for interacting with DagsHub storage bucket"""
-    
+    """In-process client for the DagsHub storage bucket (or any S3-compatible endpoint).
+
+    One boto3 client is shared by every call, so HTTP connections are pooled and reused.
+    Files above STORAGE_MULTIPART_THRESHOLD_MB are sent as concurrent multipart transfers, and
+    upload_many / download_many move many files through a bounded worker pool.
+    """
+
     def __init__(self):
         self.config = load_config()
         self.bucket_name = self.config.get("dagshub_bucket_name", "")
         self.repo = self.config.get("dagshub_repo", "")
-        
+        self.endpoint_url = self._endpoint(self.config.get("dagshub_endpoint_url", ""))
+        self.workers = self.config["storage_workers"]
+        self._client = None
+        self._transfer_config = None
+        self._lock = threading.Lock()
+
+    def _endpoint(self, url: str) -> str:
+        """DagsHub's S3 API lives under /api/v1/repo-buckets/s3/<owner>; empty or plain https://dagshub.com is expanded."""
+        if url.rstrip("/") in ("", "https://dagshub.com") and self.repo:
+            return f"{DAGSHUB_S3_API}/{self.repo.split('/')[0]}"
+        return url
+
+    @property
+    def client(self):
+        """Shared boto3 S3 client (created on first use; boto3 clients are thread-safe)."""
+        with self._lock:
+            if self._client is None:
+                import boto3
+                from botocore.config import Config
+                key_id = self.config["dagshub_access_key_id"] or self.config["dagshub_token"]
+                secret = self.config["dagshub_secret_access_key"] or self.config["dagshub_token"]
+                max_conns = self.workers * self.config["storage_multipart_concurrency"]
+                self._client = boto3.client(
+                    "s3",
+                    endpoint_url=self.endpoint_url or None,
+                    aws_access_key_id=key_id or None,
+                    aws_secret_access_key=secret or None,
+                    region_name=self.config["dagshub_region"],
+                    config=Config(max_pool_connections=max(10, max_conns), retries={"max_attempts": 5, "mode": "standard"}),
+                )
+            return self._client
+
+    @property
+    def transfer_config(self):
+        if self._transfer_config is None:
+            from boto3.s3.transfer import TransferConfig
+            mb = 1024 * 1024
+            self._transfer_config = TransferConfig(
+                multipart_threshold=int(self.config["storage_multipart_threshold_mb"] * mb),
+                multipart_chunksize=int(self.config["storage_multipart_chunk_mb"] * mb),
+                max_concurrency=self.config["storage_multipart_concurrency"],
+            )
+        return self._transfer_config
+
+    def _put(self, local_path: str, key: str):
+        self.client.upload_file(local_path, self.bucket_name, key, Config=self.transfer_config)
+
+    def _get(self, key: str, local_path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(local_path)), exist_ok=True)
+        self.client.download_file(self.bucket_name, key, local_path, Config=self.transfer_config)
+
+    def _run_many(self, fn, items: List[Tuple[str, str]], label: str, workers: Optional[int]) -> Dict[str, int]:
+        stats = {"ok": 0, "failed": 0}
+        if not items:
+            return stats
+        lock = threading.Lock()
+
+        def run(item):
+            try:
+                fn(*item)
+                ok = True
+            except Exception as e:
+                logger.error(f"Failed to {label} {item[0]}: {e}")
+                ok = False
+            with lock:
+                stats["ok" if ok else "failed"] += 1
+
+        with ThreadPoolExecutor(max_workers=max(1, min(workers or self.workers, len(items)))) as pool:
+            list(pool.map(run, items))
+        return stats
+
+    def upload_many(self, items: List[Tuple[str, str]], workers: Optional[int] = None) -> Dict[str, int]:
+        """Upload (local_path, bucket_key) pairs concurrently; returns {"ok": n, "failed": n}."""
+        return self._run_many(self._put, items, "upload", workers)
+
+    def download_many(self, items: List[Tuple[str, str]], workers: Optional[int] = None) -> Dict[str, int]:
+        """Download (bucket_key, local_path) pairs concurrently; returns {"ok": n, "failed": n}."""
+        return self._run_many(self._get, items, "download", workers)
+
+    def list_keys(self, prefix: str = "") -> List[str]:
+        keys = []
+        for page in self.client.get_paginator("list_objects_v2").paginate(Bucket=self.bucket_name, Prefix=prefix):
+            keys.extend(obj["Key"] for obj in page.get("Contents", []))
+        return keys
+
     def upload_file(self, local_path: str, bucket_path: Optional[str] = None) -> bool:
         """
         Upload a file to DagsHub storage bucket
-        
+
         Args:
             local_path: Path to local file/directory
             bucket_path: Target path in bucket (optional)
-            
+
         Returns:
             bool: True if upload successful, False otherwise
         """
-        if not self.bucket_name or not self.repo:
+        if not self.is_configured():
             logger.warning("DagsHub bucket configuration not found")
             return False
-            
+
         try:
-            cmd = ["dagshub", "upload", "--bucket", f"{self.repo.split('/')[0]}/{self.bucket_name}", local_path]
-            if bucket_path:
-                cmd.append(bucket_path)
-                
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            if os.path.isdir(local_path):
+                prefix = (bucket_path or os.path.basename(os.path.normpath(local_path))).strip("/")
+                items = []
+                for root, _, files in os.walk(local_path):
+                    for name in files:
+                        path = os.path.join(root, name)
+                        rel = os.path.relpath(path, local_path).replace(os.sep, "/")
+                        items.append((path, f"{prefix}/{rel}" if prefix else rel))
+                stats = self.upload_many(items)
+                if stats["failed"]:
+                    logger.error(f"Failed to upload {stats['failed']} of {len(items)} files from {local_path}")
+                    return False
+            else:
+                self._put(local_path, bucket_path or os.path.basename(local_path))
             logger.info(f"Successfully uploaded {local_path} to DagsHub bucket")
             return True
-            
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to upload {local_path}: {e.stderr}")
-            return False
+
         except Exception as e:
             logger.error(f"Upload error: {str(e)}")
             return False
-    
+
     def download_file(self, bucket_path: str, local_path: Optional[str] = None) -> bool:
         """
         Download a file from DagsHub storage bucket
-        
+
         Args:
             bucket_path: Path in bucket
             local_path: Target local path (optional)
-            
+
         Returns:
             bool: True if download successful, False otherwise
         """
-        if not self.bucket_name or not self.repo:
+        if not self.is_configured():
             logger.warning("DagsHub bucket configuration not found")
             return False
-            
+
         try:
-            cmd = ["dagshub", "download", "--bucket", f"{self.repo.split('/')[0]}/{self.bucket_name}", bucket_path]
-            if local_path:
-                cmd.append(local_path)
-                
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            self._get(bucket_path, local_path or os.path.basename(bucket_path))
             logger.info(f"Successfully downloaded {bucket_path} from DagsHub bucket")
             return True
-            
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to download {bucket_path}: {e.stderr}")
-            return False
+
         except Exception as e:
             logger.error(f"Download error: {str(e)}")
             return False
-    
+
     def upload_experiment_artifacts(self, experiment_dir: str, experiment_name: str) -> bool:
         """
         Upload all experiment artifacts to DagsHub bucket
-        
+
         Args:
             experiment_dir: Local experiment directory
             experiment_name: Name for the experiment in bucket
-            
+
         Returns:
             bool: True if upload successful, False otherwise
         """
         if not os.path.exists(experiment_dir):
             logger.error(f"Experiment directory not found: {experiment_dir}")
             return False
-            
+
         bucket_path = f"experiments/{experiment_name}"
         return self.upload_file(experiment_dir, bucket_path)
-    
+
+    def sync_backend(self, root: str = ""):
+        """This bucket as an ArtifactSync destination, sharing the pooled client."""
+        from .artifact_sync import S3Backend
+        return S3Backend(self.bucket_name, root, endpoint_url=self.endpoint_url, client=self.client,
+                         transfer_config=self.transfer_config)
+
     def is_configured(self) -> bool:
         """Check if DagsHub storage is properly configured"""
-        return bool(self.bucket_name and self.repo)
\ No newline at end of file
+        return bool(self.bucket_name and (self.repo or self.endpoint_url))
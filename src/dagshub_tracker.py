@@ -6,6 +6,8 @@ import dagshub
 import mlflow
 from .config import load_config
 from .dagshub_storage import DagsHubStorage
+from .mlflow_batch import MlflowBatchLogger
+from .artifact_sync import ArtifactSync, LocalBackend, MlflowBackend
 
 class DagsHubTracker:
     def __init__(self):
@@ -13,6 +15,7 @@ class DagsHubTracker:
         self.enabled = self.cfg["dagshub_enabled"]
         self.experiment_name = None
         self.run_id = None
+        self.batch = None  # MlflowBatchLogger of the active run
         self.storage = DagsHubStorage()
         
         if self.enabled:
@@ -53,32 +56,39 @@ class DagsHubTracker:
             
             mlflow.start_run(run_name=run_name)
             self.run_id = mlflow.active_run().info.run_id
+            self.batch = MlflowBatchLogger(
+                self.run_id,
+                batch_size=self.cfg["mlflow_batch_size"],
+                flush_interval_s=self.cfg["mlflow_flush_interval_s"],
+            )
             
             print(f"🚀 Started experiment: {experiment_name}, run: {run_name}")
         except Exception as e:
             print(f"⚠️ Failed to start experiment: {e}")
     
     def log_params(self, params: Dict[str, Any]):
-        """Log parameters to MLflow"""
-        if not self.enabled or not mlflow.active_run():
+        """Queue parameters for the next MLflow batch"""
+        if not self.enabled or self.batch is None:
             return
-        
-        try:
-            for key, value in params.items():
-                mlflow.log_param(key, value)
-        except Exception as e:
-            print(f"⚠️ Failed to log params: {e}")
+        self.batch.log_params(params)
     
     def log_metrics(self, metrics: Dict[str, float], step: Optional[int] = None):
-        """Log metrics to MLflow"""
-        if not self.enabled or not mlflow.active_run():
+        """Queue metrics for the next MLflow batch"""
+        if not self.enabled or self.batch is None:
             return
-        
-        try:
-            for key, value in metrics.items():
-                mlflow.log_metric(key, value, step=step)
-        except Exception as e:
-            print(f"⚠️ Failed to log metrics: {e}")
+        self.batch.log_metrics(metrics, step)
+    
+    def set_tags(self, tags: Dict[str, Any]):
+        """Queue run tags for the next MLflow batch"""
+        if not self.enabled or self.batch is None:
+            return
+        self.batch.set_tags(tags)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued param/metric/tag has been sent"""
+        if self.batch is None:
+            return True
+        return self.batch.flush(timeout)
     
     def log_artifact(self, file_path: str, artifact_path: Optional[str] = None):
         """Log artifact (file) to MLflow"""
@@ -126,11 +136,11 @@ class DagsHubTracker:
         try:
             # Log stage start time
             current_time = time.time()
-            mlflow.log_metric(f"{stage_name}_start_time", current_time)
+            self.log_metrics({f"{stage_name}_start_time": current_time})
             
             # Log stage description as parameter
             if description:
-                mlflow.log_param(f"{stage_name}_description", description)
+                self.log_params({f"{stage_name}_description": description})
             
             print(f"🔄 Pipeline stage: {stage_name} - {description}")
         except Exception as e:
@@ -142,15 +152,16 @@ class DagsHubTracker:
             return
         
         try:
-            # Log stage completion
-            mlflow.log_metric(f"{stage_name}_completed", 1)
-            
-            # Log stage-specific metrics
+            # Log stage completion and stage-specific metrics
+            metrics = {f"{stage_name}_completed": 1}
+            params = {}
             for key, value in stage_metrics.items():
                 if isinstance(value, (int, float)):
-                    mlflow.log_metric(f"{stage_name}_{key}", value)
+                    metrics[f"{stage_name}_{key}"] = value
                 else:
-                    mlflow.log_param(f"{stage_name}_{key}", str(value))
+                    params[f"{stage_name}_{key}"] = str(value)
+            self.log_metrics(metrics)
+            self.log_params(params)
             
             print(f"📊 Logged pipeline stage: {stage_name}")
         except Exception as e:
@@ -172,8 +183,9 @@ class DagsHubTracker:
             return False
             
         try:
-            # This would integrate with DagsHub's storage API
-            # For now, we'll use MLflow artifact logging as fallback
+            # Storage bucket when configured, MLflow artifact logging as fallback
+            if os.path.exists(local_path) and self.storage.is_configured():
+                return self.storage.upload_file(local_path, bucket_path)
             if os.path.exists(local_path):
                 if os.path.isfile(local_path):
                     self.log_artifact(local_path, bucket_path)
@@ -188,27 +200,40 @@ class DagsHubTracker:
             print(f"⚠️ Failed to upload to storage: {e}")
             return False
     
+    def _sync_backend(self):
+        """Destination for experiment syncs: ARTIFACT_SYNC_DIR, else the storage bucket, else the MLflow run."""
+        if self.cfg["artifact_sync_dir"]:
+            return LocalBackend(self.cfg["artifact_sync_dir"])
+        if self.storage.is_configured():
+            return self.storage.sync_backend()
+        if self.enabled and self.run_id:
+            return MlflowBackend(self.run_id)
+        return None
+
     def upload_experiment_to_storage(self, experiment_dir: str, experiment_name: str) -> bool:
         """
-        Upload entire experiment directory to storage bucket
+        Sync entire experiment directory to storage, uploading only new or changed files
         
         Args:
             experiment_dir: Local experiment directory
             experiment_name: Name for experiment in bucket
             
         Returns:
-            bool: True if upload successful
+            bool: True if every file is in storage
         """
-        if not self.enabled:
+        backend = self._sync_backend()
+        if backend is None:
             print("⚠️ DagsHub storage not configured")
             return False
             
         try:
             if os.path.exists(experiment_dir):
                 bucket_path = f"experiments/{experiment_name}"
-                self.log_artifacts_dir(experiment_dir, bucket_path)
-                print(f"✅ Uploaded experiment to storage: {experiment_name}")
-                return True
+                stats = ArtifactSync(backend, workers=self.cfg["artifact_sync_workers"]).sync(experiment_dir, bucket_path)
+                print(f"✅ Synced experiment to storage: {experiment_name} ({stats['uploaded']} uploaded, "
+                      f"{stats['skipped']} unchanged, {stats['bytes_uploaded'] / 1e6:.1f} MB in {stats['elapsed_s']:.1f}s)")
+                self.log_metrics({f"sync_{k}": v for k, v in stats.items() if k != "resumed"})
+                return stats["failed"] == 0
             else:
                 print(f"⚠️ Experiment directory not found: {experiment_dir}")
                 return False
@@ -222,6 +247,13 @@ class DagsHubTracker:
             return
         
         try:
+            if self.batch is not None:
+                self.batch.close()
+                counts = self.batch.counts
+                print(f"📤 MLflow: {counts['metrics']} metrics, {counts['params']} params, {counts['tags']} tags "
+                      f"in {counts['batches']} batch(es)"
+                      + (f", {counts['failed_batches']} failed" if counts["failed_batches"] else ""))
+                self.batch = None
             mlflow.end_run()
             print(f"✅ Experiment ended: {self.experiment_name}")
         except Exception as e:
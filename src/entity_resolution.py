@@ -0,0 +1,137 @@
+"""
+Cross-segment entity resolution: blocking keys + union-find over entity mentions
+"""
+import re
+from typing import Dict, List, Tuple
+from .models import Entity
+from .normalization import canon_name
+
+TITLES = {"mr", "mrs", "ms", "dr", "prof", "professor", "sir"}
+
+_PUNCT = re.compile(r"[^\w\s]")
+
+
+class UnionFind:
+    def __init__(self):
+        self.parent: Dict[str, str] = {}
+
+    def add(self, x: str):
+        self.parent.setdefault(x, x)
+
+    def find(self, x: str) -> str:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]  # path halving
+            x = parent[x]
+        return x
+
+    def union(self, a: str, b: str):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[rb] = ra
+
+
+def name_tokens(key: str) -> List[str]:
+    """Lowercase tokens without punctuation or leading titles ("dr. e. carter" -> ["e", "carter"])."""
+    tokens = _PUNCT.sub(" ", key).split()
+    while len(tokens) > 1 and tokens[0] in TITLES:
+        tokens = tokens[1:]
+    return tokens
+
+
+def _org_key(tokens: List[str]) -> str:
+    if len(tokens) > 1 and tokens[0] == "the":
+        tokens = tokens[1:]
+    return " ".join(tokens)
+
+
+def resolve_entities(entities: List[Entity]) -> Tuple[List[Entity], Dict[str, str]]:
+    """Cluster entity mentions that refer to the same thing.
+
+    Mentions are first collapsed by canon_name. Persons are blocked by surname: mentions
+    with the same given name merge directly, while surname-only ("Dr. Carter") or
+    initial-only ("E. Carter") mentions merge only when exactly one compatible full name
+    exists in the block. Other entities merge on punctuation-free tokens without a leading
+    "the". Returns one representative Entity per cluster (the mention with the most name tokens)
+    and an alias table mapping every canon_name(mention) to its cluster's node id.
+    """
+    first: Dict[str, Entity] = {}
+    is_person: Dict[str, bool] = {}
+    for e in entities:
+        key = canon_name(e.name)
+        if not key:
+            continue
+        first.setdefault(key, e)
+        is_person[key] = is_person.get(key, False) or e.type == "Person"
+
+    uf = UnionFind()
+    person_blocks: Dict[str, List[Tuple[str, List[str]]]] = {}
+    other_blocks: Dict[str, str] = {}
+    for key in first:
+        uf.add(key)
+        tokens = name_tokens(key)
+        if not tokens:
+            continue
+        if is_person[key]:
+            person_blocks.setdefault(tokens[-1], []).append((key, tokens[:-1]))
+        else:
+            okey = _org_key(tokens)
+            if okey in other_blocks:
+                uf.union(other_blocks[okey], key)
+            else:
+                other_blocks[okey] = key
+
+    for block in person_blocks.values():
+        if len(block) < 2:
+            continue
+        by_given: Dict[str, str] = {}
+        partial = []
+        for key, given in block:
+            if given and len(given[0]) > 1:
+                g = given[0]
+                if g in by_given:
+                    uf.union(by_given[g], key)
+                else:
+                    by_given[g] = key
+            else:
+                partial.append((key, given[0] if given else ""))
+        roots_by_initial: Dict[str, set] = {"": set()}
+        for g, k in by_given.items():
+            root = uf.find(k)
+            roots_by_initial.setdefault(g[0], set()).add(root)
+            roots_by_initial[""].add(root)
+        for key, initial in partial:
+            roots = roots_by_initial.get(initial, set())
+            if len(roots) == 1:
+                uf.union(next(iter(roots)), key)
+        # partial mentions with no (or several) full-name matches still merge with identical partials
+        seen: Dict[str, str] = {}
+        for key, initial in partial:
+            if uf.find(key) != key:
+                continue
+            sig = " ".join(name_tokens(key))
+            if sig in seen:
+                uf.union(seen[sig], key)
+            else:
+                seen[sig] = key
+
+    clusters: Dict[str, List[str]] = {}
+    for key in first:
+        clusters.setdefault(uf.find(key), []).append(key)
+
+    resolved, aliases = [], {}
+    for members in clusters.values():
+        # members keep first-appearance order, so max() breaks ties by first occurrence
+        rep_key = max(members, key=lambda k: (len(_org_key(name_tokens(k)).split()), -k.startswith("the "), len(k)))
+        rep = first[rep_key]
+        resolved.append(Entity(
+            id=rep_key,
+            name=rep.name,
+            type=rep.type,
+            canonical_name=rep.name,
+            attributes=rep.attributes,
+            meta={"aliases": "|".join(first[k].name for k in members)} if len(members) > 1 else {},
+        ))
+        for k in members:
+            aliases[k] = rep_key
+    return resolved, aliases
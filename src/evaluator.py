@@ -1,5 +1,5 @@
-from typing import Dict, Tuple, Set
-from .models import ExtractionResult, PersonalityResult
+from typing import Dict, List, Tuple, Set
+from .models import ExtractionResult, PersonalityResult, TRAITS
 
 def normalize_entity_name(name: str) -> str:
     """Normalize entity names to handle variations like 'Dr. Carter' vs 'Dr. Emily Carter'"""
@@ -87,18 +87,40 @@ def evaluate_extraction(pred: ExtractionResult, gold: ExtractionResult):
         target_name = getattr(r, "meta", {}).get("target_name", r.target_id)
         gold_relations.append((source_name, r.type, target_name))
     
-    # Fuzzy matching for relations
+    # Fuzzy matching for relations: index gold relations by (relation_type, name_variant)
+    # for source and target once, so each prediction is resolved with hash lookups.
+    # A prediction matches the first gold relation (lowest index) sharing its type and a
+    # name variant on both ends, same as comparing against every gold relation in order.
+    variants_cache = {}
+    def variants(name):
+        v = variants_cache.get(name)
+        if v is None:
+            v = variants_cache[name] = create_name_variants(name)
+        return v
+
+    gold_by_src, gold_by_tgt = {}, {}
+    for j, (gold_src, gold_rel, gold_tgt) in enumerate(gold_relations):
+        for v in variants(gold_src):
+            gold_by_src.setdefault((gold_rel, v), set()).add(j)
+        for v in variants(gold_tgt):
+            gold_by_tgt.setdefault((gold_rel, v), set()).add(j)
+
     matched_pred = set()
     matched_gold = set()
-    
+
     for i, (pred_src, pred_rel, pred_tgt) in enumerate(pred_relations):
-        for j, (gold_src, gold_rel, gold_tgt) in enumerate(gold_relations):
-            if (pred_rel == gold_rel and 
-                names_match(pred_src, gold_src) and 
-                names_match(pred_tgt, gold_tgt)):
-                matched_pred.add(i)
-                matched_gold.add(j)
-                break
+        src_hits = set()
+        for v in variants(pred_src):
+            src_hits |= gold_by_src.get((pred_rel, v), set())
+        if not src_hits:
+            continue
+        tgt_hits = set()
+        for v in variants(pred_tgt):
+            tgt_hits |= gold_by_tgt.get((pred_rel, v), set())
+        hits = src_hits & tgt_hits
+        if hits:
+            matched_pred.add(i)
+            matched_gold.add(min(hits))
     
     tp = len(matched_pred)
     fp = len(pred_relations) - tp
@@ -127,4 +149,80 @@ def evaluate_personality(pred: PersonalityResult, gold: PersonalityResult):
             mses.append((pv - gv) ** 2)
     mae = sum(maes) / len(maes)
     mse = sum(mses) / len(mses)
-    return {"mae": mae, "mse": mse}
\ No newline at end of file
+    return {"mae": mae, "mse": mse}
+
+def stack_personality(pairs: List[Tuple[PersonalityResult, PersonalityResult]]):
+    """Stack every person present in both pred and gold into (N, 5) pred/gold arrays.
+
+    Missing traits default to 0.5, as in evaluate_personality.
+    """
+    import numpy as np
+    pred_rows, gold_rows = [], []
+    for pred, gold in pairs:
+        for p in sorted(set(pred.traits.keys()) & set(gold.traits.keys())):
+            pred_rows.append([float(pred.traits[p].get(t, 0.5)) for t in TRAITS])
+            gold_rows.append([float(gold.traits[p].get(t, 0.5)) for t in TRAITS])
+    shape = (len(pred_rows), len(TRAITS))
+    return (np.asarray(pred_rows, dtype=np.float64).reshape(shape),
+            np.asarray(gold_rows, dtype=np.float64).reshape(shape))
+
+def evaluate_personality_corpus(pairs: List[Tuple[PersonalityResult, PersonalityResult]],
+                                n_bootstrap: int = 1000, confidence: float = 0.95, seed: int = 0):
+    """Corpus-level personality metrics: per-trait MAE/MSE/Pearson r plus bootstrap CIs.
+
+    Persons are resampled with replacement as count vectors, drawn in chunks so memory stays
+    bounded for large N.
+    """
+    import numpy as np
+    P, G = stack_personality(pairs)
+    n = P.shape[0]
+    if n == 0:
+        return {"n_persons": 0, "mae": None, "mse": None, "traits": {}}
+
+    err = P - G
+    abs_err, sq_err = np.abs(err), err ** 2
+    pc, gc = P - P.mean(axis=0), G - G.mean(axis=0)
+    denom = np.sqrt((pc ** 2).sum(axis=0) * (gc ** 2).sum(axis=0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = np.where(denom > 0, (pc * gc).sum(axis=0) / denom, np.nan)
+
+    # bootstrap: resample counts per person, then one matmul gives per-sample, per-trait means
+    stacked = np.hstack([abs_err, sq_err])
+    boot = np.empty((n_bootstrap, stacked.shape[1]))
+    rng = np.random.default_rng(seed)
+    chunk = max(1, 4_000_000 // n)
+    for start in range(0, n_bootstrap, chunk):
+        rows = min(n_bootstrap, start + chunk) - start
+        idx = rng.integers(0, n, size=(rows, n)) + (np.arange(rows) * n)[:, None]
+        counts = np.bincount(idx.ravel(), minlength=rows * n).reshape(rows, n)
+        boot[start:start + rows] = counts @ stacked / n
+    boot_abs, boot_sq = boot[:, :len(TRAITS)], boot[:, len(TRAITS):]
+    q = [(1 - confidence) / 2 * 100, (1 + confidence) / 2 * 100]
+
+    def ci(samples):
+        lo, hi = np.percentile(samples, q, axis=0)
+        return lo, hi
+
+    mae_lo, mae_hi = ci(boot_abs)
+    mse_lo, mse_hi = ci(boot_sq)
+    overall_mae_ci = ci(boot_abs.mean(axis=1))
+    overall_mse_ci = ci(boot_sq.mean(axis=1))
+
+    traits = {}
+    for k, t in enumerate(TRAITS):
+        traits[t] = {
+            "mae": float(abs_err[:, k].mean()),
+            "mse": float(sq_err[:, k].mean()),
+            "corr": None if np.isnan(corr[k]) else float(corr[k]),
+            "mae_ci": [float(mae_lo[k]), float(mae_hi[k])],
+            "mse_ci": [float(mse_lo[k]), float(mse_hi[k])],
+        }
+    return {
+        "n_persons": n,
+        "mae": float(abs_err.mean()),
+        "mse": float(sq_err.mean()),
+        "mae_ci": [float(v) for v in overall_mae_ci],
+        "mse_ci": [float(v) for v in overall_mse_ci],
+        "confidence": confidence,
+        "traits": traits,
+    }
@@ -0,0 +1,310 @@
+"""
+Sharded neighborhood tiles: a static, lazily loading viewer for graphs too large for one page
+"""
+import json
+import os
+from typing import Dict, List
+import numpy as np
+from .compact_graph import CompactGraph
+from .models import TRAITS
+from .visualization import COLOR_MAP, VIS_CSS, VIS_JS, node_label
+
+
+def label_propagation(n: int, src: np.ndarray, dst: np.ndarray, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Community labels by (semi-synchronous) label propagation over the undirected edge list.
+
+    Each round, a random half of the nodes adopts the most frequent label among its
+    neighbours (random tie-break); counting is done with one lexsort per round.
+    """
+    labels = np.arange(n)
+    if n == 0 or len(src) == 0:
+        return labels
+    rng = np.random.default_rng(seed)
+    u = np.concatenate([src, dst]).astype(np.int64)
+    v = np.concatenate([dst, src]).astype(np.int64)
+    for _ in range(iterations):
+        nl = labels[v]
+        order = np.lexsort((nl, u))
+        us, ls = u[order], nl[order]
+        start = np.ones(len(us), dtype=bool)
+        start[1:] = (us[1:] != us[:-1]) | (ls[1:] != ls[:-1])
+        run_idx = np.flatnonzero(start)
+        counts = np.diff(np.append(run_idx, len(us)))
+        run_u, run_l = us[run_idx], ls[run_idx]
+        best = np.lexsort((rng.random(len(run_u)), -counts, run_u))
+        first = np.ones(len(best), dtype=bool)
+        first[1:] = run_u[best][1:] != run_u[best][:-1]
+        winners_u, winners_l = run_u[best][first], run_l[best][first]
+        update = rng.random(len(winners_u)) < 0.5
+        new = labels.copy()
+        new[winners_u[update]] = winners_l[update]
+        if np.array_equal(new, labels):
+            break
+        labels = new
+    return labels
+
+
+def hub_groups(n: int, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """Assign every node to its highest-degree neighbour (or itself, if it is the larger hub)."""
+    degree = np.bincount(src, minlength=n) + np.bincount(dst, minlength=n)
+    u = np.concatenate([src, dst, np.arange(n)]).astype(np.int64)
+    v = np.concatenate([dst, src, np.arange(n)]).astype(np.int64)
+    order = np.lexsort((v, -degree[v], u))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = u[order][1:] != u[order][:-1]
+    hub = np.empty(n, dtype=np.int64)
+    hub[u[order][first]] = v[order][first]
+    return hub
+
+
+def pack_shards(groups: np.ndarray, shard_size: int) -> np.ndarray:
+    """Pack groups (largest first) into shards of at most shard_size nodes; big groups are split."""
+    shard = np.empty(len(groups), dtype=np.int64)
+    order = np.argsort(groups, kind="stable")
+    labels, starts, sizes = np.unique(groups[order], return_index=True, return_counts=True)
+    current, filled = 0, 0
+    for g in np.argsort(-sizes, kind="stable"):
+        members = order[starts[g]:starts[g] + sizes[g]]
+        for chunk_start in range(0, len(members), shard_size):
+            chunk = members[chunk_start:chunk_start + shard_size]
+            if filled and filled + len(chunk) > shard_size:
+                current, filled = current + 1, 0
+            shard[chunk] = current
+            filled += len(chunk)
+    return shard
+
+
+def _write_js(path: str, target: str, payload):
+    """Write payload as a script that assigns it to a global (loadable from file:// via <script>)."""
+    import orjson
+    with open(path, "wb") as f:
+        f.write(f"{target} = ".encode("utf-8"))
+        f.write(orjson.dumps(payload))
+        f.write(b";\n")
+
+
+def _search_key(name: str) -> str:
+    """Search files are split by 2-character prefix (the viewer asks for at least 2 characters)."""
+    return name.strip().lower()[:2] or "_"
+
+
+def write_tiles(cg: CompactGraph, out_dir: str, partition: str = "community",
+                shard_size: int = 500, initial_nodes: int = 50) -> str:
+    """Write index.html plus lazily loaded shards/shard_<k>.js and search/<prefix>.js files.
+
+    Each shard holds its nodes, every edge touching them (edges crossing shards are stored in
+    both) and stub labels for the external endpoints, so expanding a node needs only its shard.
+    """
+    cg.finalize()
+    n = cg.num_nodes
+    src, dst = cg.src.astype(np.int64), cg.dst.astype(np.int64)
+    groups = hub_groups(n, src, dst) if partition == "hub" else label_propagation(n, src, dst)
+    shard = pack_shards(groups, shard_size)
+    n_shards = int(shard.max()) + 1 if n else 0
+
+    types = cg.node_types.tolist()
+    traits = cg.traits.tolist()
+    keys, rels = cg.node_keys, cg.rel_names
+
+    def node_record(i: int) -> Dict:
+        data = {"name": cg.names[i], "type": cg.type_names[types[i]]}
+        data.update({t: traits[i][k] for k, t in enumerate(TRAITS) if traits[i][k] == traits[i][k]})
+        label, tip = node_label(keys[i], data)
+        return {"id": keys[i], "label": label, "title": tip, "group": data["type"],
+                "color": COLOR_MAP.get(data["type"], "#888"), "shard": shard_of[i]}
+
+    os.makedirs(os.path.join(out_dir, "shards"), exist_ok=True)
+    os.makedirs(os.path.join(out_dir, "search"), exist_ok=True)
+
+    # edges grouped by the shard of each endpoint
+    by_src = np.argsort(shard[src], kind="stable")
+    by_dst = np.argsort(shard[dst], kind="stable")
+    src_bounds = np.searchsorted(shard[src][by_src], np.arange(n_shards + 1))
+    dst_bounds = np.searchsorted(shard[dst][by_dst], np.arange(n_shards + 1))
+    node_order = np.argsort(shard, kind="stable")
+    node_bounds = np.searchsorted(shard[node_order], np.arange(n_shards + 1))
+    confidence, rel_ids, shard_of = cg.confidence.tolist(), cg.rel.tolist(), shard.tolist()
+    src_l, dst_l = src.tolist(), dst.tolist()
+
+    for k in range(n_shards):
+        members = node_order[node_bounds[k]:node_bounds[k + 1]].tolist()
+        edge_ids = np.union1d(by_src[src_bounds[k]:src_bounds[k + 1]], by_dst[dst_bounds[k]:dst_bounds[k + 1]])
+        edges, adj, ext = [], {}, {}
+        for e in edge_ids.tolist():
+            s, t = src_l[e], dst_l[e]
+            rel, conf, evid = rels[rel_ids[e]], confidence[e], cg.evidence[e]
+            tip = f"{rel} | conf={conf:.2f}" + (f" | evidence: {evid}" if evid else "")
+            edges.append({"id": f"{keys[s]}|{rel}|{keys[t]}", "from": keys[s], "to": keys[t], "label": rel,
+                          "title": tip, "confidence": conf, "width": 1 + 4 * conf})
+            for a, b in ((s, t), (t, s)):
+                if shard_of[a] == k:
+                    adj.setdefault(keys[a], []).append(len(edges) - 1)
+                    if shard_of[b] != k and keys[b] not in ext:
+                        ext[keys[b]] = node_record(b)
+        payload = {"nodes": {keys[i]: node_record(i) for i in members}, "ext": ext, "edges": edges, "adj": adj}
+        _write_js(os.path.join(out_dir, "shards", f"shard_{k}.js"), f"KG_SHARDS[{k}]", payload)
+
+    search: Dict[str, List] = {}
+    for i in range(n):
+        search.setdefault(_search_key(cg.names[i]), []).append([keys[i], cg.names[i], shard_of[i]])
+    for prefix, entries in search.items():
+        fname = prefix.encode("utf-8").hex()
+        _write_js(os.path.join(out_dir, "search", f"{fname}.js"), f"KG_SEARCH[{json.dumps(prefix)}]", entries)
+
+    hubs = [node_record(i) for i in cg.top_nodes(initial_nodes).tolist()]
+    edge_types = sorted(set(rels))
+    meta = {"hubs": hubs, "edgeTypes": edge_types, "shards": n_shards,
+            "nodes": n, "edges": len(src), "partition": partition}
+    _write_js(os.path.join(out_dir, "index.data.js"), "window.KG_INDEX", meta)
+
+    html_path = os.path.join(out_dir, "index.html")
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write(VIEWER_HTML.replace("{VIS_CSS}", VIS_CSS).replace("{VIS_JS}", VIS_JS).replace(
+            "{LEGEND}", " ".join(f'<span style="background:{c}">{t}</span>' for t, c in COLOR_MAP.items())))
+    return html_path
+
+
+VIEWER_HTML = """<!DOCTYPE html><html><head><meta charset='utf-8'><title>KG Explorer</title>
+<link rel="stylesheet" href="{VIS_CSS}">
+<script src="{VIS_JS}"></script>
+<style>
+body { margin:0; font-family: Arial, sans-serif; }
+#toolbar { padding:10px; border-bottom:1px solid #ddd; display:flex; gap:12px; align-items:center; flex-wrap:wrap; }
+#legend span { display:inline-block; padding:4px 8px; border-radius:4px; margin-right:6px; color:#fff; font-size:12px; }
+#results { position:absolute; background:#fff; border:1px solid #ddd; max-height:300px; overflow:auto; z-index:10; }
+#results div { padding:4px 8px; cursor:pointer; }
+#results div:hover { background:#eef; }
+#mynetwork { height: calc(100vh - 54px); }
+</style></head><body>
+<div id="toolbar">
+  <div><strong>Search:</strong> <input id="search" placeholder="type 2+ characters to search..." style="width:220px;"><div id="results"></div></div>
+  <div><strong>Min confidence:</strong> <input id="conf" type="range" min="0" max="1" step="0.05" value="0"><span id="confv">0.00</span></div>
+  <div id="filters"><strong>Edge types:</strong> </div>
+  <div id="legend"><strong>Legend:</strong> {LEGEND}</div>
+  <div><em id="status"></em></div>
+</div>
+<div id='mynetwork'></div>
+<script src="index.data.js"></script>
+<script>
+// shard data is loaded on demand via injected script tags (works from file://) and evicted LRU
+var MAX_SHARDS = 8, MAX_VISIBLE = 3000;
+window.KG_SHARDS = {}; window.KG_SEARCH = {};
+var shardLRU = [];
+function loadScript(src) {
+  return new Promise(function(resolve, reject) {
+    var s = document.createElement('script');
+    s.src = src; s.onload = function() { s.remove(); resolve(); }; s.onerror = reject;
+    document.head.appendChild(s);
+  });
+}
+async function getShard(k) {
+  if (!(k in KG_SHARDS)) { await loadScript('shards/shard_' + k + '.js'); }
+  shardLRU = shardLRU.filter(x => x !== k); shardLRU.push(k);
+  while (shardLRU.length > MAX_SHARDS) { delete KG_SHARDS[shardLRU.shift()]; }
+  return KG_SHARDS[k];
+}
+
+var idx = window.KG_INDEX;
+var filters = document.getElementById('filters');
+idx.edgeTypes.forEach(function(et) {
+  var l = document.createElement('label');
+  l.innerHTML = '<input class="etype" type="checkbox" checked> ' + et;
+  l.firstChild.value = et;
+  filters.appendChild(l);
+});
+var nodesDS = new vis.DataSet(), edgesDS = new vis.DataSet();
+var minConf = 0, selected = new Set(idx.edgeTypes), expanded = new Set(), order = [];
+var edgesView = new vis.DataView(edgesDS, { filter: function(e) { return e.confidence >= minConf && selected.has(e.label); } });
+var options = {
+  nodes: { shape:'dot', size:16 },
+  edges: { arrows: {to:{enabled:true, scaleFactor:0.7}}, smooth: false },
+  physics: { enabled: false },
+  layout: { improvedLayout: false },
+  interaction: { hideEdgesOnDrag: true }
+};
+var network = new vis.Network(document.getElementById('mynetwork'), {nodes:nodesDS, edges:edgesView}, options);
+
+function status() {
+  document.getElementById('status').innerText = nodesDS.length + ' shown of ' + idx.nodes + ' nodes, ' +
+    idx.shards + ' shards (' + shardLRU.length + ' loaded). Double-click a node to expand.';
+}
+function addNode(rec, x, y) {
+  if (nodesDS.get(rec.id)) return;
+  nodesDS.add(Object.assign({}, rec, {x: x, y: y}));
+  order.push(rec.id);
+  while (order.length > MAX_VISIBLE) {
+    var old = order.shift();
+    edgesDS.remove(edgesDS.getIds({ filter: e => e.from === old || e.to === old }));
+    nodesDS.remove(old); expanded.delete(old);
+  }
+}
+async function expand(id) {
+  var node = nodesDS.get(id);
+  if (!node || expanded.has(id)) return;
+  var sh = await getShard(node.shard);
+  var pos = network.getPositions([id])[id] || {x: 0, y: 0};
+  var eids = sh.adj[id] || [];
+  eids.forEach(function(ei, j) {
+    var e = sh.edges[ei];
+    var other = e.from === id ? e.to : e.from;
+    var rec = sh.nodes[other] || sh.ext[other];
+    var a = 2 * Math.PI * j / Math.max(eids.length, 1), r = 150 + 4 * eids.length;
+    if (rec) addNode(rec, pos.x + r * Math.cos(a), pos.y + r * Math.sin(a));
+    if (nodesDS.get(e.from) && nodesDS.get(e.to)) edgesDS.update(e);
+  });
+  expanded.add(id);
+  status();
+}
+network.on('doubleClick', function(p) { if (p.nodes.length) expand(p.nodes[0]); });
+
+// initial view: highest-degree hubs on a circle
+idx.hubs.forEach(function(h, i) {
+  var a = 2 * Math.PI * i / idx.hubs.length;
+  addNode(h, 600 * Math.cos(a), 600 * Math.sin(a));
+});
+status();
+
+// filters
+function applyFilters() {
+  minConf = parseFloat(document.getElementById('conf').value);
+  document.getElementById('confv').innerText = minConf.toFixed(2);
+  selected = new Set(Array.from(document.querySelectorAll('.etype:checked')).map(e => e.value));
+  edgesView.refresh();
+}
+document.getElementById('conf').addEventListener('input', applyFilters);
+Array.from(document.querySelectorAll('.etype')).forEach(el => el.addEventListener('change', applyFilters));
+
+// search: prefix files are loaded lazily, matches are added and expanded on click
+function hex(s) { return Array.from(new TextEncoder().encode(s)).map(b => b.toString(16).padStart(2, '0')).join(''); }
+document.getElementById('search').addEventListener('input', async function(ev) {
+  var q = ev.target.value.trim().toLowerCase();
+  var box = document.getElementById('results');
+  box.innerHTML = '';
+  if (!q) return;
+  var hits = nodesDS.get({ filter: n => n.label.toLowerCase().includes(q) }).map(n => n.id);
+  network.selectNodes(hits, false);
+  if (hits.length) { network.focus(hits[0], {scale:1.2}); }
+  // the index is split by 2-character prefix; a 1-character query only finds 1-character names
+  var key = q.slice(0, 2);
+  if (q.length < 2) {
+    var hint = document.createElement('div');
+    hint.innerText = 'type at least 2 characters to search all nodes';
+    hint.style.color = '#888';
+    box.appendChild(hint);
+  }
+  if (!(key in KG_SEARCH)) { try { await loadScript('search/' + hex(key) + '.js'); } catch (e) { KG_SEARCH[key] = []; } }
+  if (ev.target.value.trim().toLowerCase() !== q) return;  // a newer keystroke owns the results box
+  (KG_SEARCH[key] || []).filter(m => m[1].toLowerCase().startsWith(q)).slice(0, 20).forEach(function(m) {
+    var d = document.createElement('div');
+    d.innerText = m[1];
+    d.onclick = async function() {
+      box.innerHTML = '';
+      var sh = await getShard(m[2]);
+      addNode(sh.nodes[m[0]], 0, 0);
+      await expand(m[0]);
+      network.selectNodes([m[0]]); network.focus(m[0], {scale:1.0});
+    };
+    box.appendChild(d);
+  });
+});
+</script></body></html>"""
@@ -0,0 +1,108 @@
+"""
+Incremental JSON scanning: emit the items of a streamed object's top-level arrays as they close
+"""
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+_SPECIAL = re.compile(r'["{}\[\]:]')
+_STRING_END = re.compile(r'["\\]')
+
+
+class JsonItemStream:
+    """Feed response chunks; get back (key, item) for each element of a top-level array.
+
+    For '{"entities": [{...}, {...}], "relations": [...]}' every entity/relation object (or
+    plain string) is returned by the feed() call in which its closing character arrives.
+    Text before the root '{' (e.g. a ```json fence) and after it closes is ignored. Only
+    complete items are ever json-decoded, so a truncated response loses just its last item.
+    Top-level keys are collected in `keys`, those whose value is an array in `list_keys`.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.done = False
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._key: Optional[str] = None
+        self._item_start: Optional[int] = None
+        self._root_start: Optional[int] = None
+        self._root_end: Optional[int] = None
+        self.keys: List[str] = []
+        self.list_keys = set()
+
+    def root_text(self) -> Optional[str]:
+        """The root object's text once it has closed (without any fence around it), else None."""
+        if self._root_end is None:
+            return None
+        return self.text[self._root_start:self._root_end]
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        self.text += chunk
+        if self.done:
+            return []
+        items = []
+        t, i, n, stack = self.text, self._pos, len(self.text), self._stack
+        while i < n:
+            if self._in_string:
+                m = _STRING_END.search(t, i)
+                if m is None:
+                    i = n
+                    break
+                j = m.start()
+                if t[j] == "\\":
+                    if j + 1 >= n:  # escape split across chunks
+                        i = j
+                        break
+                    i = j + 2
+                    continue
+                self._in_string = False
+                i = j + 1
+                if len(stack) == 1:
+                    self._last_string = json.loads(t[self._string_start:i])
+                elif len(stack) == 2 and stack[1] == "[" and self._item_start is None:
+                    items.append((self._key, json.loads(t[self._string_start:i])))
+                continue
+
+            if not stack:
+                j = t.find("{", i)
+                if j < 0:
+                    i = n
+                    break
+            else:
+                m = _SPECIAL.search(t, i)
+                if m is None:
+                    i = n
+                    break
+                j = m.start()
+            c = t[j]
+            if c == '"':
+                self._in_string = True
+                self._string_start = j
+            elif c in "{[":
+                if not stack:
+                    self._root_start = j
+                stack.append(c)
+                if len(stack) == 2 and c == "[":
+                    self.list_keys.add(self._key)
+                if len(stack) == 3 and stack[1] == "[":
+                    self._item_start = j
+            elif c in "}]":
+                stack.pop()
+                if len(stack) == 2 and self._item_start is not None:
+                    items.append((self._key, json.loads(t[self._item_start:j + 1])))
+                    self._item_start = None
+                elif not stack:
+                    self.done = True
+                    self._root_end = j + 1
+                    i = j + 1
+                    break
+            elif c == ":" and len(stack) == 1:
+                self._key = self._last_string
+                self.keys.append(self._key)
+            i = j + 1
+        self._pos = i
+        return items
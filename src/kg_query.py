@@ -0,0 +1,197 @@
+"""
+Secondary indexes and conjunctive queries over a built knowledge graph
+"""
+import bisect
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import networkx as nx
+from .compact_graph import CompactGraph
+from .models import TRAITS
+from .kg_builder import KGBuilder
+from .normalization import canon_name, canon_relation
+
+TraitRange = Tuple[Optional[float], Optional[float]]
+
+
+class KGIndex:
+    """Read-only indexes over a CompactGraph: entity type, relation type, name prefix, trait ranges.
+
+    Everything is built from the graph's arrays with sorts (no per-edge Python loops), and a
+    query intersects the sorted candidate arrays of its filters, smallest first.
+    """
+
+    def __init__(self, cg: CompactGraph):
+        cg.finalize()
+        self.cg = cg
+        n = cg.num_nodes
+        src, dst, rel = cg.src.astype(np.int64), cg.dst.astype(np.int64), cg.rel.astype(np.int64)
+        self._rel_ids = {r: i for i, r in enumerate(cg.rel_names)}
+
+        # entity type -> sorted node indices
+        types = self._types = cg.node_types
+        order = np.argsort(types, kind="stable")
+        bounds = np.searchsorted(types[order], np.arange(len(cg.type_names) + 1))
+        self.by_type = {t: order[bounds[i]:bounds[i + 1]] for i, t in enumerate(cg.type_names)}
+
+        # relation type -> sorted unique sources / targets
+        self.sources_by_rel, self.targets_by_rel = {}, {}
+        for ends, out in ((src, self.sources_by_rel), (dst, self.targets_by_rel)):
+            pairs = np.unique(rel * max(n, 1) + ends)
+            r_of, node_of = pairs // max(n, 1), pairs % max(n, 1)
+            rb = np.searchsorted(r_of, np.arange(len(cg.rel_names) + 1))
+            for i, r in enumerate(cg.rel_names):
+                out[r] = node_of[rb[i]:rb[i + 1]]
+
+        # (target, rel) -> sources and (source, rel) -> targets, as edge orders plus CSR bounds
+        self._in_order = np.lexsort((src, rel, dst))
+        self._in_indptr = np.searchsorted(dst[self._in_order], np.arange(n + 1))
+        self._out_order = np.lexsort((dst, rel, src))
+        self._out_indptr = cg.indptr
+
+        # name prefix: sorted lowercase names
+        lowered = [name.lower() for name in cg.names]
+        name_order = sorted(range(n), key=lowered.__getitem__)
+        self._names_sorted = [lowered[i] for i in name_order]
+        self._name_order = np.asarray(name_order, dtype=np.int64)
+
+        # trait -> (sorted values, node indices), NaNs dropped
+        traits = cg.traits
+        self.by_trait = {}
+        for k, t in enumerate(TRAITS):
+            col = traits[:, k]
+            idx = np.flatnonzero(~np.isnan(col))
+            o = np.argsort(col[idx], kind="stable")
+            self.by_trait[t] = (col[idx][o], idx[o])
+
+    @classmethod
+    def from_builder(cls, kg: KGBuilder) -> "KGIndex":
+        return cls(CompactGraph.from_networkx(kg.graph))
+
+    @classmethod
+    def from_graph(cls, G: nx.MultiDiGraph) -> "KGIndex":
+        return cls(CompactGraph.from_networkx(G))
+
+    @classmethod
+    def load(cls, path: str) -> "KGIndex":
+        """Index a graph file exported as .npz or GraphML."""
+        if path.endswith(".npz"):
+            return cls(CompactGraph.load_npz(path))
+        return cls.from_graph(nx.read_graphml(path))
+
+    # -- single-index lookups ----------------------------------------------------
+
+    def node(self, name: str) -> Optional[int]:
+        """Node index for a node id or a mention (matched via canon_name)."""
+        cg = self.cg
+        i = cg.node_index.get(name)
+        return i if i is not None else cg.node_index.get(canon_name(name))
+
+    def _rel_slice(self, order: np.ndarray, indptr: np.ndarray, ends: np.ndarray, node: int,
+                   rel: Optional[str]) -> np.ndarray:
+        edges = order[indptr[node]:indptr[node + 1]]
+        if rel is not None:
+            r = self._rel_ids.get(rel)
+            if r is None:
+                return np.zeros(0, dtype=np.int64)
+            rels = self.cg.rel[edges]
+            edges = edges[np.searchsorted(rels, r, "left"):np.searchsorted(rels, r, "right")]
+        return np.unique(ends[edges])
+
+    def sources_of(self, target: str, rel: Optional[str] = None) -> np.ndarray:
+        """Nodes with an edge (of type rel) into target."""
+        t = self.node(target)
+        if t is None:
+            return np.zeros(0, dtype=np.int64)
+        return self._rel_slice(self._in_order, self._in_indptr, self.cg.src, t, rel)
+
+    def targets_of(self, source: str, rel: Optional[str] = None) -> np.ndarray:
+        """Nodes that source points to (through edges of type rel)."""
+        s = self.node(source)
+        if s is None:
+            return np.zeros(0, dtype=np.int64)
+        return self._rel_slice(self._out_order, self._out_indptr, self.cg.dst, s, rel)
+
+    def name_prefix(self, prefix: str) -> np.ndarray:
+        p = prefix.lower()
+        lo = bisect.bisect_left(self._names_sorted, p)
+        hi = bisect.bisect_left(self._names_sorted, p + "\U0010ffff")
+        return np.sort(self._name_order[lo:hi])
+
+    def _trait_slice(self, trait: str, lo: Optional[float], hi: Optional[float]) -> Tuple[int, int]:
+        values = self.by_trait[trait][0]
+        a = 0 if lo is None else int(np.searchsorted(values, np.float32(lo), "left"))
+        b = len(values) if hi is None else int(np.searchsorted(values, np.float32(hi), "right"))
+        return a, b
+
+    def trait_range(self, trait: str, lo: Optional[float] = None, hi: Optional[float] = None) -> np.ndarray:
+        """Nodes with lo <= trait <= hi (either bound may be None).
+
+        Traits are stored as float32, so bounds are rounded to float32 before comparing.
+        """
+        a, b = self._trait_slice(trait, lo, hi)
+        return np.sort(self.by_trait[trait][1][a:b])
+
+    # -- conjunctive queries -----------------------------------------------------
+
+    def query(self, type: Optional[str] = None, rel: Optional[str] = None, target: Optional[str] = None,
+              source: Optional[str] = None, name_prefix: Optional[str] = None,
+              traits: Optional[Dict[str, TraitRange]] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Nodes matching every given filter.
+
+        rel + target: nodes with a rel edge into target ("who is AFFILIATED_WITH Stanford");
+        rel + source: nodes source points to with rel; rel alone: nodes with any outgoing rel edge.
+        traits maps a trait name to an inclusive (lo, hi) range, compared in float32.
+        """
+        rel = canon_relation(rel) if rel else None
+        empty = np.zeros(0, dtype=np.int64)
+        sets = []
+        if target is not None:
+            sets.append(self.sources_of(target, rel))
+        if source is not None:
+            sets.append(self.targets_of(source, rel))
+        if rel is not None and target is None and source is None:
+            sets.append(self.sources_by_rel.get(rel, empty))
+        if name_prefix:
+            sets.append(self.name_prefix(name_prefix))
+        # (size, materialize) per filter; the smallest one seeds the result
+        candidates = [(len(x), lambda x=x: x) for x in sets]
+        if type is not None:
+            typed = self.by_type.get(type, empty)
+            candidates.append((len(typed), lambda: typed))
+        for t, (lo, hi) in (traits or {}).items():
+            a, b = self._trait_slice(t, lo, hi)
+            candidates.append((b - a, lambda t=t, lo=lo, hi=hi: self.trait_range(t, lo, hi)))
+
+        if not candidates:
+            hits = np.arange(self.cg.num_nodes)
+        else:
+            candidates.sort(key=lambda c: c[0])
+            hits = candidates[0][1]()
+            # the remaining filters run as vectorized predicates / intersections on the seed
+            if type is not None:
+                hits = hits[self._types[hits] == self.cg.type_names.index(type)] if type in self.by_type else empty
+            for t, (lo, hi) in (traits or {}).items():
+                v = self.cg.traits[hits, TRAITS.index(t)]
+                keep = ~np.isnan(v)
+                if lo is not None:
+                    keep &= v >= np.float32(lo)
+                if hi is not None:
+                    keep &= v <= np.float32(hi)
+                hits = hits[keep]
+            for x in sets:
+                if not len(hits):
+                    break
+                if x is not hits:
+                    hits = np.intersect1d(hits, x, assume_unique=True)
+        if limit:
+            hits = hits[:limit]
+        return [self.describe(int(i)) for i in hits]
+
+    def describe(self, i: int) -> Dict:
+        cg = self.cg
+        row = {"id": cg.node_keys[i], "name": cg.names[i], "type": cg.type_names[self._types[i]]}
+        for k, t in enumerate(TRAITS):
+            v = cg.traits[i, k]
+            if not np.isnan(v):
+                row[t] = round(float(v), 4)
+        return row
@@ -0,0 +1,211 @@
+"""
+Persistent, incrementally updated knowledge graph backed by SQLite
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+import networkx as nx
+from .models import Entity, Relation, PersonalityResult
+from .normalization import canon_relation
+from .kg_builder import KGBuilder
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entities_type ON entities(type);
+CREATE INDEX IF NOT EXISTS idx_entities_name ON entities(name);
+
+CREATE TABLE IF NOT EXISTS relations (
+    source TEXT NOT NULL,
+    type TEXT NOT NULL,
+    target TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (source, type, target)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_relations_target ON relations(target, type);
+CREATE INDEX IF NOT EXISTS idx_relations_type ON relations(type);
+
+CREATE TABLE IF NOT EXISTS relation_evidence (
+    source TEXT NOT NULL,
+    type TEXT NOT NULL,
+    target TEXT NOT NULL,
+    evidence TEXT NOT NULL,
+    PRIMARY KEY (source, type, target, evidence)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS traits (
+    entity_id TEXT NOT NULL,
+    trait TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (entity_id, trait)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_traits_value ON traits(trait, value);
+"""
+
+
+class KGStore:
+    """Global knowledge graph that runs append to instead of rebuilding in memory.
+
+    Upsert semantics: entities keep their latest name/type, relations are keyed by
+    (source, type, target) and keep the max confidence plus every distinct evidence quote,
+    traits keep the latest score. Node ids are the same canon_name keys KGBuilder uses.
+    """
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._depth = 0
+
+    @contextmanager
+    def transaction(self):
+        """Group several add_* calls into one atomic write; nested calls join the outer one."""
+        with self._lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield self
+                finally:
+                    self._depth -= 1
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._depth = 1
+            try:
+                yield self
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            finally:
+                self._depth = 0
+
+    def _write(self, sql: str, rows: List[Tuple]):
+        if rows:
+            with self.transaction():
+                self._conn.executemany(sql, rows)
+
+    # -- KGBuilder-compatible upserts ------------------------------------------
+
+    def add_entities(self, entities: List[Entity], aliases: Optional[Dict[str, str]] = None):
+        now = time.time()
+        rows = [(KGBuilder.node_id(e.name, aliases), e.name, e.type, now) for e in entities]
+        self._write(
+            "INSERT INTO entities(id, name, type, updated) VALUES (?,?,?,?) "
+            "ON CONFLICT(id) DO UPDATE SET name=excluded.name, type=excluded.type, updated=excluded.updated",
+            rows,
+        )
+
+    def add_relations(self, relations: List[Relation], aliases: Optional[Dict[str, str]] = None):
+        now = time.time()
+        rel_rows, ev_rows, node_rows = [], [], []
+        for r in relations:
+            meta = getattr(r, "meta", {}) or {}
+            s = KGBuilder.node_id(meta.get("source_name", r.source_id), aliases)
+            t = KGBuilder.node_id(meta.get("target_name", r.target_id), aliases)
+            rel_type = canon_relation(r.type)
+            rel_rows.append((s, rel_type, t, float(r.confidence), now))
+            node_rows.extend([(s, s, "", now), (t, t, "", now)])
+            if r.evidence:
+                ev_rows.append((s, rel_type, t, r.evidence))
+
+        if not rel_rows:
+            return
+        with self.transaction():
+            # endpoints that were never seen as entities still get a node, like networkx add_edge
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO entities(id, name, type, updated) VALUES (?,?,?,?)", node_rows)
+            self._conn.executemany(
+                "INSERT INTO relations(source, type, target, confidence, updated) VALUES (?,?,?,?,?) "
+                "ON CONFLICT(source, type, target) DO UPDATE SET "
+                "confidence=max(confidence, excluded.confidence), updated=excluded.updated",
+                rel_rows,
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO relation_evidence(source, type, target, evidence) VALUES (?,?,?,?)", ev_rows)
+
+    def add_personality(self, personality: PersonalityResult, aliases: Optional[Dict[str, str]] = None):
+        rows = []
+        for person_name, scores in personality.traits.items():
+            key = KGBuilder.node_id(person_name, aliases)
+            rows.extend((key, trait, float(val)) for trait, val in scores.items())
+        # like KGBuilder, traits only attach to existing nodes
+        self._write(
+            "INSERT INTO traits(entity_id, trait, value) SELECT ?, ?, ? WHERE EXISTS "
+            "(SELECT 1 FROM entities WHERE id=?1) "
+            "ON CONFLICT(entity_id, trait) DO UPDATE SET value=excluded.value",
+            rows,
+        )
+
+    def ingest(self, extraction, personality: PersonalityResult, aliases: Optional[Dict[str, str]] = None):
+        """Append one document's results (as returned by run_on_text) atomically."""
+        with self.transaction():
+            self.add_entities(extraction.entities, aliases)
+            self.add_relations(extraction.relations, aliases)
+            self.add_personality(personality, aliases)
+
+    # -- lookups -----------------------------------------------------------------
+
+    def get_entity(self, node_id: str) -> Optional[Dict]:
+        row = self._conn.execute("SELECT id, name, type FROM entities WHERE id=?", (node_id,)).fetchone()
+        if row is None:
+            return None
+        entity = {"id": row[0], "name": row[1], "type": row[2]}
+        entity.update(self._conn.execute(
+            "SELECT trait, value FROM traits WHERE entity_id=?", (node_id,)).fetchall())
+        return entity
+
+    def relations_from(self, node_id: str, rel_type: Optional[str] = None) -> List[Tuple[str, str, float]]:
+        sql, args = "SELECT type, target, confidence FROM relations WHERE source=?", [node_id]
+        if rel_type:
+            sql, args = sql + " AND type=?", args + [rel_type]
+        return self._conn.execute(sql, args).fetchall()
+
+    def relations_to(self, node_id: str, rel_type: Optional[str] = None) -> List[Tuple[str, str, float]]:
+        sql, args = "SELECT source, type, confidence FROM relations WHERE target=?", [node_id]
+        if rel_type:
+            sql, args = sql + " AND type=?", args + [rel_type]
+        return self._conn.execute(sql, args).fetchall()
+
+    def evidence(self, source: str, rel_type: str, target: str) -> List[str]:
+        rows = self._conn.execute(
+            "SELECT evidence FROM relation_evidence WHERE source=? AND type=? AND target=?",
+            (source, rel_type, target)).fetchall()
+        return [r[0] for r in rows]
+
+    def entities_by_type(self, typ: str) -> Iterator[Tuple[str, str]]:
+        yield from self._conn.execute("SELECT id, name FROM entities WHERE type=?", (typ,))
+
+    def counts(self) -> Dict[str, int]:
+        q = lambda t: self._conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+        return {"entities": q("entities"), "relations": q("relations"), "evidence": q("relation_evidence")}
+
+    def to_networkx(self) -> nx.MultiDiGraph:
+        """Load the whole store into a MultiDiGraph shaped like KGBuilder.graph (evidence joined by ' | ')."""
+        G = nx.MultiDiGraph()
+        for node_id, name, typ in self._conn.execute("SELECT id, name, type FROM entities"):
+            G.add_node(node_id, name=name, type=typ)
+        for node_id, trait, value in self._conn.execute("SELECT entity_id, trait, value FROM traits"):
+            G.nodes[node_id][trait] = value
+        evidence: Dict[Tuple[str, str, str], List[str]] = {}
+        for s, rel, t, ev in self._conn.execute("SELECT source, type, target, evidence FROM relation_evidence"):
+            evidence.setdefault((s, rel, t), []).append(ev)
+        for s, rel, t, conf in self._conn.execute("SELECT source, type, target, confidence FROM relations"):
+            G.add_edge(s, t, key=rel, type=rel, confidence=conf,
+                       evidence=" | ".join(evidence.get((s, rel, t), [])) or None)
+        return G
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,116 @@
+"""
+Persistent, content-addressed cache for LLM responses
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+class LLMCache:
+    """SQLite-backed response cache keyed by a hash of the full request.
+
+    Entries are evicted least-recently-used first once the cache grows past
+    max_bytes, and entries older than max_age_s are never returned. The size is
+    tracked in memory; every SWEEP_EVERY puts expired rows are deleted and the
+    total is recounted (other processes may share the file).
+    """
+
+    SWEEP_EVERY = 256
+
+    def __init__(self, cache_dir: str, max_bytes: int = 512 * 1024 * 1024, max_age_s: Optional[float] = None):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "responses.sqlite")
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, content TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON responses(accessed)")
+        self._puts = 0
+        self._sweep(time.time())
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(provider: str, model: str, temperature: float, system_prompt: str,
+                 user_prompt: str, json_mode: bool) -> str:
+        h = hashlib.sha256()
+        for part in (provider, model, repr(float(temperature)), "json" if json_mode else "text",
+                     system_prompt, user_prompt):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT content, created FROM responses WHERE key=?", (key,)).fetchone()
+            if row is None or (self.max_age_s is not None and now - row[1] > self.max_age_s):
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed=? WHERE key=?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def _size(self, key: str) -> int:
+        row = self._conn.execute("SELECT size FROM responses WHERE key=?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def put(self, key: str, content: str):
+        now = time.time()
+        size = len(content.encode("utf-8"))
+        with self._lock:
+            replaced = self._size(key)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses(key, content, size, created, accessed) VALUES (?,?,?,?,?)",
+                (key, content, size, now, now),
+            )
+            self._total += size - replaced
+            self._puts += 1
+            if self._puts % self.SWEEP_EVERY == 0:
+                self._sweep(now)
+            if self._total > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._total -= self._size(key)
+            self._conn.execute("DELETE FROM responses WHERE key=?", (key,))
+            self._conn.commit()
+
+    def _sweep(self, now: float):
+        if self.max_age_s is not None:
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.max_age_s,))
+        self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def _evict(self):
+        stale = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            stale.append((key,))
+            self._total -= size
+            if self._total <= self.max_bytes:
+                break
+        self._conn.executemany("DELETE FROM responses WHERE key=?", stale)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "cache_hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,23 +1,51 @@
 import json
 import os
+import queue
+import threading
 import time
-from typing import Any, Dict
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from openai import OpenAI
 import google.generativeai as genai
 from .config import load_config
+from .llm_cache import LLMCache
+from .json_stream import JsonItemStream
+from .rate_limiter import backoff_delay, call_with_retries, classify_error, get_limiter, retry_after, THROTTLE
+from .segmentation import estimate_tokens
+from .mock_llm import MockLLM
+from .tracing import get_tracer, NULL_SPAN
+from .session_log import SessionLogWriter
 
 class LLMClient:
-    def __init__(self):
+    def __init__(self, use_cache: Optional[bool] = None):
         cfg = load_config()
         self.provider = cfg["llm_provider"]
         self.temperature = cfg["temperature"]
-        self.session_logs = []  # store prompts/responses
+        self.max_concurrency = cfg["llm_max_concurrency"]
+        # prompts/responses: the last few stay in memory, all of them go to the session log writer
+        self.session_logs = deque(maxlen=cfg["session_log_tail"])
+        self.session_count = 0
+        self.session_writer: Optional[SessionLogWriter] = None
+        self._session_lock = threading.Lock()
+        if use_cache is None:
+            use_cache = cfg["llm_cache_enabled"]
+        self.cache = None
+        if use_cache:
+            max_age_days = cfg["llm_cache_max_age_days"]
+            self.cache = LLMCache(
+                cfg["llm_cache_dir"],
+                max_bytes=int(cfg["llm_cache_max_mb"] * 1024 * 1024),
+                max_age_s=max_age_days * 86400 if max_age_days > 0 else None,
+            )
         
         print(f"🔧 Initializing LLMClient with provider: {self.provider}")
         
         if self.provider == "openai":
             self.model = cfg["openai_model"]
-            self.client = OpenAI(api_key=cfg["openai_api_key"])
+            # retries are handled by our rate limiter, not the SDK
+            self.client = OpenAI(api_key=cfg["openai_api_key"], base_url=cfg["openai_base_url"] or None,
+                                 timeout=cfg["llm_timeout_s"], max_retries=0)
             print(f"✅ OpenAI client initialized with model: {self.model}")
         elif self.provider == "gemini":
             self.model = cfg["gemini_model"]
@@ -43,76 +71,382 @@ class LLMClient:
             
             if self.client is None:
                 raise ValueError("No working Gemini model found")
+        elif self.provider == "mock":
+            self.model = cfg["mock_model"]
+            self.client = MockLLM(
+                seed=cfg["mock_seed"],
+                latency_ms=cfg["mock_latency_ms"],
+                latency_dist=cfg["mock_latency_dist"],
+                tokens_per_s=cfg["mock_tokens_per_s"],
+                error_rate=cfg["mock_error_rate"],
+                error_kind=cfg["mock_error_kind"],
+                output_scale=cfg["mock_output_scale"],
+            )
+            print(f"✅ Mock client initialized (seed={cfg['mock_seed']}, latency={cfg['mock_latency_ms']}ms)")
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
 
-    def complete_json(self, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
+        self.timeout_s = cfg["llm_timeout_s"]
+        self.max_retries = cfg["llm_max_retries"]
+        self.retry_base_delay = cfg["llm_retry_base_delay"]
+        self.retry_max_delay = cfg["llm_retry_max_delay"]
+        self.limiter = get_limiter(
+            self.provider, self.model,
+            rpm=cfg["llm_rpm"], tpm=cfg["llm_tpm"],
+            max_concurrency=cfg["llm_max_inflight"],
+            initial_concurrency=self.max_concurrency,
+            adaptive=cfg["llm_adaptive_concurrency"],
+        )
+
+    def _request(self, system_prompt: str, user_prompt: str, json_mode: bool, span=NULL_SPAN, cache: bool = True) -> str:
+        if self.cache is None or not cache:
+            return self._call_limited(system_prompt, user_prompt, json_mode, span)
+        key = LLMCache.make_key(self.provider, self.model, self.temperature, system_prompt, user_prompt, json_mode)
+        content = self._cache_get(key, json_mode)
+        if content is None:
+            content = self._call_limited(system_prompt, user_prompt, json_mode, span)
+            self._cache_put(key, content, json_mode)
+        else:
+            span.set(cached=1)
+        return content
+
+    @staticmethod
+    def _usable(content: str, json_mode: bool) -> bool:
+        """In JSON mode only replies that parse are cached, so a truncated one is retried next run."""
+        if not json_mode:
+            return True
+        try:
+            json.loads(content)
+            return True
+        except ValueError:
+            return False
+
+    def _cache_get(self, key: str, json_mode: bool) -> Optional[str]:
+        content = self.cache.get(key)
+        if content is not None and not self._usable(content, json_mode):
+            self.cache.delete(key)  # malformed reply stored by an older version
+            return None
+        return content
+
+    def _cache_put(self, key: str, content: str, json_mode: bool):
+        if self._usable(content, json_mode):
+            self.cache.put(key, content)
+
+    def _budget_tokens(self, system_prompt: str, user_prompt: str) -> int:
+        # prompt estimate plus the same again for the response
+        return 2 * estimate_tokens(system_prompt + user_prompt)
+
+    def _note_tokens(self, span, system_prompt: str, user_prompt: str, content: str):
+        """Estimated token counts on the span when the provider did not report usage."""
+        if span.enabled and "prompt_tokens" not in span.attrs:
+            span.set(prompt_tokens=estimate_tokens(system_prompt + user_prompt),
+                     completion_tokens=estimate_tokens(content or ""))
+
+    def _call_limited(self, system_prompt: str, user_prompt: str, json_mode: bool, span=NULL_SPAN) -> str:
+        """_call_provider behind the shared rate limiter, retrying 429s / timeouts with backoff."""
+        def attempt():
+            span.incr("attempts")
+            return self._call_provider(system_prompt, user_prompt, json_mode, span)
+
+        content = call_with_retries(
+            attempt, self.limiter, self._budget_tokens(system_prompt, user_prompt),
+            max_retries=self.max_retries, base_delay=self.retry_base_delay, max_delay=self.retry_max_delay,
+            label=self.provider,
+        )
+        self._note_tokens(span, system_prompt, user_prompt, content)
+        return content
+
+    def _stream_limited(self, system_prompt: str, user_prompt: str, json_mode: bool, span=NULL_SPAN) -> Iterator[str]:
+        """_stream_provider behind the rate limiter; only retried while nothing has been yielded yet."""
+        attempt = 0
+        while True:
+            started = False
+            span.incr("attempts")
+            try:
+                with self.limiter.slot(self._budget_tokens(system_prompt, user_prompt)):
+                    for chunk in self._stream_provider(system_prompt, user_prompt, json_mode):
+                        if not started:
+                            span.mark("first_chunk_s")
+                        started = True
+                        yield chunk
+                return
+            except Exception as e:
+                kind = classify_error(e)
+                if kind is None or started or attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(e, attempt, self.retry_base_delay, self.retry_max_delay)
+                if kind == THROTTLE and retry_after(e) is not None:
+                    self.limiter.pause(delay)
+                self.limiter.note_retry()
+                attempt += 1
+                print(f"⚠️ {self.provider} {kind} ({type(e).__name__}), retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _call_provider(self, system_prompt: str, user_prompt: str, json_mode: bool, span=NULL_SPAN) -> str:
         if self.provider == "openai":
+            kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
             resp = self.client.chat.completions.create(
                 model=self.model,
-                response_format={"type": "json_object"},
                 temperature=self.temperature,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt},
                 ],
+                **kwargs,
             )
-            content = resp.choices[0].message.content
+            if getattr(resp, "usage", None):
+                span.set(prompt_tokens=resp.usage.prompt_tokens, completion_tokens=resp.usage.completion_tokens)
+            return resp.choices[0].message.content
         elif self.provider == "gemini":
-            prompt = f"{system_prompt}\n\n{user_prompt}\n\nPlease respond with valid JSON only."
             resp = self.client.generate_content(
-                prompt,
+                self._gemini_prompt(system_prompt, user_prompt, json_mode),
                 generation_config=genai.types.GenerationConfig(
                     temperature=self.temperature,
-                )
+                ),
+                request_options={"timeout": self.timeout_s},
             )
-            content = resp.text
-        
-        self.session_logs.append({
-            "timestamp": time.time(),
-            "system": system_prompt,
-            "user": user_prompt,
-            "assistant": content,
-        })
-        return json.loads(content)
+            usage = getattr(resp, "usage_metadata", None)
+            if usage:
+                span.set(prompt_tokens=usage.prompt_token_count, completion_tokens=usage.candidates_token_count)
+            return resp.text
+        elif self.provider == "mock":
+            return self.client.complete(system_prompt, user_prompt, json_mode)
 
-    def complete_text(self, system_prompt: str, user_prompt: str) -> str:
+    def _gemini_prompt(self, system_prompt: str, user_prompt: str, json_mode: bool) -> str:
+        prompt = f"{system_prompt}\n\n{user_prompt}"
+        if json_mode:
+            prompt += "\n\nPlease respond with valid JSON only."
+        return prompt
+
+    def _stream_provider(self, system_prompt: str, user_prompt: str, json_mode: bool) -> Iterator[str]:
+        """Yield response text chunks as the provider produces them."""
         if self.provider == "openai":
-            resp = self.client.chat.completions.create(
+            kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
+            stream = self.client.chat.completions.create(
                 model=self.model,
                 temperature=self.temperature,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt},
                 ],
+                stream=True,
+                **kwargs,
             )
-            content = resp.choices[0].message.content
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
         elif self.provider == "gemini":
-            prompt = f"{system_prompt}\n\n{user_prompt}"
             resp = self.client.generate_content(
-                prompt,
+                self._gemini_prompt(system_prompt, user_prompt, json_mode),
                 generation_config=genai.types.GenerationConfig(
                     temperature=self.temperature,
-                )
+                ),
+                stream=True,
+                request_options={"timeout": self.timeout_s},
             )
-            content = resp.text
-        
-        self.session_logs.append({
+            for chunk in resp:
+                yield chunk.text
+        elif self.provider == "mock":
+            yield from self.client.stream(system_prompt, user_prompt, json_mode)
+        else:
+            yield self._call_provider(system_prompt, user_prompt, json_mode)
+
+    def _stream_request(self, system_prompt: str, user_prompt: str, json_mode: bool, span=NULL_SPAN) -> Iterator[str]:
+        """Cache-aware streaming: a hit is replayed as one chunk, a miss is stored once complete."""
+        key = None
+        if self.cache is not None:
+            key = LLMCache.make_key(self.provider, self.model, self.temperature, system_prompt, user_prompt, json_mode)
+            content = self._cache_get(key, json_mode)
+            if content is not None:
+                span.set(cached=1)
+                yield content
+                return
+        chunks = []
+        for chunk in self._stream_limited(system_prompt, user_prompt, json_mode, span):
+            chunks.append(chunk)
+            yield chunk
+        content = "".join(chunks)
+        self._note_tokens(span, system_prompt, user_prompt, content)
+        if key is not None:
+            self._cache_put(key, content, json_mode)
+
+    def _log_entry(self, system_prompt: str, user_prompt: str, content: str, span=NULL_SPAN) -> Dict[str, Any]:
+        """Session log record; with tracing on it also carries latency, token counts and attempts."""
+        return {
             "timestamp": time.time(),
             "system": system_prompt,
             "user": user_prompt,
             "assistant": content,
-        })
+            **span.fields(),
+        }
+
+    def complete_json(self, system_prompt: str, user_prompt: str, cache: bool = True) -> Dict[str, Any]:
+        """cache=False always calls the provider, e.g. for generation where repeats should differ."""
+        with get_tracer().span("llm.call") as span:
+            content = self._request(system_prompt, user_prompt, True, span, cache)
+        self._record([self._log_entry(system_prompt, user_prompt, content, span)])
+        return json.loads(content)
+
+    def complete_json_many(
+        self,
+        system_prompt: str,
+        user_prompts: List[str],
+        max_concurrency: Optional[int] = None,
+        on_done: Optional[Callable[[], None]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Run complete_json over many prompts with at most max_concurrency calls in flight.
+
+        Longest prompts are submitted first so the slowest calls start early. Results are
+        returned in input order; each exchange is recorded in the session log as it completes.
+        """
+        workers = max(1, max_concurrency or self.max_concurrency)
+        contents: List[Optional[str]] = [None] * len(user_prompts)
+
+        tracer = get_tracer()
+
+        def run(i: int):
+            with tracer.span("llm.call") as span:
+                content = self._request(system_prompt, user_prompts[i], True, span)
+            self._record([self._log_entry(system_prompt, user_prompts[i], content, span)])
+            contents[i] = content
+            if on_done:
+                on_done()
+
+        order = sorted(range(len(user_prompts)), key=lambda i: len(user_prompts[i]), reverse=True)
+        if workers == 1 or len(user_prompts) <= 1:
+            for i in order:
+                run(i)
+        else:
+            with ThreadPoolExecutor(max_workers=min(workers, len(user_prompts))) as pool:
+                for fut in [pool.submit(run, i) for i in order]:
+                    fut.result()
+
+        return [json.loads(c) for c in contents]
+
+    def _stream_items(self, system_prompt: str, user_prompt: str, span=NULL_SPAN) -> Iterator[Tuple[str, Any]]:
+        """Yield (key, item) per top-level array element as it closes; returns the full response text.
+
+        If some top-level value was not a list (e.g. a dict of entities), its items are emitted
+        from the parsed root object once it closes, so nothing parse_extraction_json would see is
+        lost. Like JsonItemStream, this tolerates a ```json fence and a truncated reply: items
+        already yielded are kept.
+        """
+        parser = JsonItemStream()
+        for chunk in self._stream_request(system_prompt, user_prompt, True, span):
+            yield from parser.feed(chunk)
+        other_keys = [k for k in parser.keys if k not in parser.list_keys]
+        root = parser.root_text()
+        if other_keys and root is not None:
+            try:
+                data = json.loads(root)
+            except ValueError:
+                data = {}
+            for key in other_keys:
+                value = data.get(key)
+                if isinstance(value, dict):
+                    for item in value.values():
+                        yield key, item
+        return parser.text
+
+    def stream_json(self, system_prompt: str, user_prompt: str) -> Iterator[Tuple[str, Any]]:
+        """Streaming complete_json: yields ("entities", {...}), ("relations", {...}), ... as they arrive."""
+        with get_tracer().span("llm.stream") as span:
+            content = yield from self._stream_items(system_prompt, user_prompt, span)
+        self._record([self._log_entry(system_prompt, user_prompt, content, span)])
+
+    def stream_json_many(
+        self,
+        system_prompt: str,
+        user_prompts: List[str],
+        max_concurrency: Optional[int] = None,
+        on_done: Optional[Callable[[], None]] = None,
+    ) -> Iterator[Tuple[int, str, Any]]:
+        """Concurrent stream_json: yields (prompt index, key, item) in arrival order.
+
+        Items of one prompt keep their order; each exchange is recorded in the session log as
+        its stream finishes. The first worker error is re-raised here.
+        """
+        workers = max(1, min(max_concurrency or self.max_concurrency, len(user_prompts)))
+        out: "queue.Queue" = queue.Queue()  # unbounded, so workers never block on a consumer that stopped early
+        finished = object()
+        tracer = get_tracer()
+
+        def run(i: int):
+            try:
+                with tracer.span("llm.stream") as span:
+                    content = yield_to_queue(i, self._stream_items(system_prompt, user_prompts[i], span))
+                self._record([self._log_entry(system_prompt, user_prompts[i], content, span)])
+                if on_done:
+                    on_done()
+            except BaseException as e:
+                out.put((i, finished, e))
+                return
+            out.put((i, finished, None))
+
+        def yield_to_queue(i: int, items) -> str:
+            while True:
+                try:
+                    key, item = next(items)
+                except StopIteration as stop:
+                    return stop.value
+                out.put((i, key, item))
+
+        order = sorted(range(len(user_prompts)), key=lambda i: len(user_prompts[i]), reverse=True)
+        if not order:
+            return
+        error = None
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for i in order:
+                pool.submit(run, i)
+            remaining = len(order)
+            while remaining:
+                i, key, item = out.get()
+                if key is finished:
+                    remaining -= 1
+                    error = error or item
+                elif error is None:
+                    yield i, key, item
+        if error is not None:
+            raise error
+
+    def complete_text(self, system_prompt: str, user_prompt: str) -> str:
+        with get_tracer().span("llm.call") as span:
+            content = self._request(system_prompt, user_prompt, False, span)
+        self._record([self._log_entry(system_prompt, user_prompt, content, span)])
         return content
     
-    def save_session(self, filepath: str):
-        """Save session logs to file"""
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(self.session_logs, f, ensure_ascii=False, indent=2)
+    def rate_stats(self) -> Dict[str, Any]:
+        """Limiter counters (shared by every client of this provider/model), prefixed for logging."""
+        return {f"rate_{k}": v for k, v in self.limiter.stats().items()}
+
+    def cache_stats(self) -> Dict[str, Any]:
+        if self.cache is None:
+            return {"cache_enabled": False}
+        return {"cache_enabled": True, **self.cache.stats()}
+
+    def start_session_log(self, out_dir: str) -> SessionLogWriter:
+        """Stream every following exchange to rotating JSONL files in out_dir as it completes."""
+        cfg = load_config()
+        with self._session_lock:
+            if self.session_writer is None:
+                self.session_writer = SessionLogWriter(
+                    out_dir,
+                    compression=cfg["session_log_compression"],
+                    max_bytes=int(cfg["session_log_max_mb"] * 1024 * 1024),
+                    tail=0,
+                )
+                self.session_writer.write_many(self.session_logs)  # exchanges made before the log was opened
+        return self.session_writer
+
+    def _record(self, entries: List[Dict[str, Any]]):
+        with self._session_lock:
+            self.session_logs.extend(entries)
+            self.session_count += len(entries)
+            if self.session_writer is not None:
+                self.session_writer.write_many(entries)
 
     def save_session(self, out_dir: str) -> str:
-        os.makedirs(out_dir, exist_ok=True)
-        path = os.path.join(out_dir, f"session-{int(time.time())}.json")
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(self.session_logs, f, ensure_ascii=False, indent=2)
-        return path
\ No newline at end of file
+        """Close the session log (opening it first if it was never started); returns its first file."""
+        writer = self.start_session_log(out_dir)
+        writer.close()
+        return writer.paths[0] if writer.paths else out_dir
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""
+Non-blocking MLflow logging: params / metrics / tags are queued and sent from a background
+thread as MlflowClient.log_batch calls
+"""
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from mlflow.entities import Metric, Param, RunTag
+from mlflow.tracking import MlflowClient
+
+# MLflow's limits for one log_batch request
+MAX_METRICS, MAX_PARAMS, MAX_TAGS, MAX_ENTITIES = 1000, 100, 100, 1000
+MAX_PARAM_VALUE = 6000
+_FLUSH, _STOP = "flush", "stop"
+
+
+class MlflowBatchLogger:
+    """Coalesces logging calls for one run into log_batch requests.
+
+    log_* only enqueue, so they never wait on the tracking server. A batch is sent once
+    `batch_size` entities are pending or `flush_interval_s` after the oldest pending one was
+    queued; flush() and close() send everything and wait for it. Params are immutable in
+    MLflow, so a param is sent once and a later different value for it is dropped with a
+    warning instead of failing the whole batch.
+    """
+
+    def __init__(self, run_id: str, client: Optional[MlflowClient] = None, batch_size: int = MAX_ENTITIES,
+                 flush_interval_s: float = 5.0, max_attempts: int = 3):
+        self.run_id = run_id
+        self.client = client or MlflowClient()
+        self.batch_size = max(1, min(batch_size, MAX_ENTITIES))
+        self.flush_interval_s = flush_interval_s
+        self.max_attempts = max(1, max_attempts)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._sent_params: Dict[str, str] = {}
+        self._closed = False
+        self.counts = {"batches": 0, "metrics": 0, "params": 0, "tags": 0, "failed_batches": 0, "dropped_params": 0}
+        self._thread = threading.Thread(target=self._run, name="mlflow-batch", daemon=True)
+        self._thread.start()
+
+    def log_params(self, params: Dict[str, Any]):
+        if params and not self._closed:
+            self._queue.put(("params", [(k, str(v)[:MAX_PARAM_VALUE]) for k, v in params.items()]))
+
+    def log_metrics(self, metrics: Dict[str, Any], step: Optional[int] = None):
+        if not metrics or self._closed:
+            return
+        ts = int(time.time() * 1000)
+        batch = []
+        for k, v in metrics.items():
+            try:
+                batch.append(Metric(k, float(v), ts, step or 0))
+            except (TypeError, ValueError):
+                print(f"⚠️ Skipping non-numeric metric {k}={v!r}")
+        if batch:
+            self._queue.put(("metrics", batch))
+
+    def set_tags(self, tags: Dict[str, Any]):
+        if tags and not self._closed:
+            self._queue.put(("tags", [(k, str(v)) for k, v in tags.items()]))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Send everything queued so far; False if that did not finish within timeout."""
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 60.0):
+        """Flush and stop the background thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put((_STOP, None))
+        self._thread.join(timeout)
+
+    def _run(self):
+        pending: List = []
+        size, deadline = 0, 0.0
+        while True:
+            try:
+                timeout = max(0.0, deadline - time.monotonic()) if pending else None
+                kind, payload = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                kind, payload = None, None
+            if kind in ("params", "metrics", "tags"):
+                if not pending:
+                    deadline = time.monotonic() + self.flush_interval_s
+                pending.append((kind, payload))
+                size += len(payload)
+                if size < self.batch_size:
+                    continue
+            elif kind == _FLUSH:
+                self._send(pending)
+                pending, size = [], 0
+                payload.set()
+                continue
+            elif kind == _STOP:
+                self._send(pending)
+                return
+            self._send(pending)
+            pending, size = [], 0
+
+    def _send(self, pending: List):
+        metrics: List[Metric] = []
+        params: Dict[str, str] = {}
+        tags: Dict[str, str] = {}
+        for kind, payload in pending:
+            if kind == "metrics":
+                metrics.extend(payload)
+            elif kind == "tags":
+                tags.update(payload)
+            else:
+                for k, v in payload:
+                    prev = self._sent_params.get(k, params.get(k))
+                    if prev is None:
+                        params[k] = v
+                    elif prev != v:
+                        self.counts["dropped_params"] += 1
+                        print(f"⚠️ MLflow param {k} already logged as {prev!r}, dropping {v!r}")
+        param_items = [Param(k, v) for k, v in params.items()]
+        tag_items = [RunTag(k, v) for k, v in tags.items()]
+        while metrics or param_items or tag_items:
+            p, param_items = param_items[:MAX_PARAMS], param_items[MAX_PARAMS:]
+            t, tag_items = tag_items[:MAX_TAGS], tag_items[MAX_TAGS:]
+            n_metrics = min(MAX_METRICS, self.batch_size - len(p) - len(t)) if (p or t) else self.batch_size
+            m, metrics = metrics[:max(0, n_metrics)], metrics[max(0, n_metrics):]
+            if self._log_batch(m, p, t):
+                self._sent_params.update((x.key, x.value) for x in p)
+
+    def _log_batch(self, metrics: List[Metric], params: List[Param], tags: List[RunTag]) -> bool:
+        for attempt in range(self.max_attempts):
+            try:
+                self.client.log_batch(self.run_id, metrics=metrics, params=params, tags=tags)
+                self.counts["batches"] += 1
+                self.counts["metrics"] += len(metrics)
+                self.counts["params"] += len(params)
+                self.counts["tags"] += len(tags)
+                return True
+            except Exception as e:
+                if attempt + 1 >= self.max_attempts:
+                    self.counts["failed_batches"] += 1
+                    print(f"⚠️ Failed to log MLflow batch ({len(metrics)} metrics, {len(params)} params, "
+                          f"{len(tags)} tags): {e}")
+                    return False
+                time.sleep(2 ** attempt)
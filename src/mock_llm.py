@@ -0,0 +1,238 @@
+"""
+Deterministic offline LLM (LLM_PROVIDER=mock) for load testing without network or API costs
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from typing import Dict, Iterator, List, Tuple
+from .models import TRAITS
+from .prompts import KG_EXTRACT_SYSTEM, PERSONALITY_SYSTEM, SYNTHETIC_DATA_SYSTEM
+
+TITLES = ("Dr.", "Prof.", "Professor", "Mr.", "Mrs.", "Ms.")
+ORG_WORDS = {"University", "Institute", "Lab", "Laboratory", "Labs", "College", "Society", "Association",
+             "Academy", "Foundation", "Center", "Centre", "Journal", "Review", "Letters", "Nature", "Science"}
+EVENT_WORDS = {"Conference", "Symposium", "Summit", "Workshop", "Congress", "Meeting"}
+CONCEPT_WORDS = {"Prize", "Award", "Medal", "Learning", "Computing", "Physics", "Biology", "Chemistry",
+                 "Genomics", "Materials", "Networks", "Theory", "Vision", "Energy", "Catalysis"}
+STOPWORDS = {"The", "A", "An", "In", "On", "At", "She", "He", "They", "Their", "His", "Her", "It", "This",
+             "That", "After", "Later", "Together", "Meanwhile", "Both", "Its", "With", "During", "As"}
+# cue phrases in the text between two mentions -> relation label (first match wins)
+REL_CUES = [
+    (re.compile(r"study on|research on|works on|studies|researches"), "RESEARCHES"),
+    (re.compile(r"affiliated|works at|working at|joined|\bfrom\b"), "AFFILIATED_WITH"),
+    (re.compile(r"published"), "PUBLISHED_IN"),
+    (re.compile(r"awarded|received|\bwon\b"), "AWARDED"),
+    (re.compile(r"advised|mentored|supervised"), "ADVISED"),
+    (re.compile(r"collaborated|worked with|together with"), "COLLABORATES_WITH"),
+    (re.compile(r"discovered"), "DISCOVERED"),
+    (re.compile(r"invented|developed"), "INVENTED"),
+    (re.compile(r"member of"), "MEMBER_OF"),
+    (re.compile(r"\bleads\b|directs|heads"), "LEADS"),
+    (re.compile(r"founded"), "FOUNDED"),
+    (re.compile(r"attended|presented at|spoke at"), "ATTENDED"),
+    (re.compile(r"\bin\b|based in|located in"), "LOCATED_IN"),
+]
+_MENTION = re.compile(r"(?:(?:Dr|Prof|Mr|Mrs|Ms)\.\s+|Professor\s+)?[A-Z][a-zA-Z'-]+(?:\s+(?:of\s+)?[A-Z][a-zA-Z'-]+)*")
+_SENTENCE = re.compile(r"[^.!?]+(?:[.!?](?=\s|$)|$)")
+
+FIRST = ["Emily", "Rahul", "Mei", "Lucas", "Amara", "Jonas", "Sofia", "Kenji", "Leila", "Mateo", "Nadia", "Owen"]
+LAST = ["Carter", "Menon", "Zhang", "Moreau", "Okafor", "Lindqvist", "Rossi", "Tanaka", "Haddad", "Silva", "Petrov", "Walsh"]
+ORGS = ["Stanford University", "Kyoto Institute", "Helix Laboratory", "Nordic Academy", "Cairo University", "Andes Institute"]
+JOURNALS = ["Nature", "Journal of Catalysis", "Physical Review Letters", "Genomics Review"]
+AWARDS = ["Turing Award", "Kavli Prize", "Wolf Prize", "Copley Medal"]
+CITIES = ["Boston", "Kyoto", "Lyon", "Lagos", "Uppsala", "Milan", "Lima"]
+CONCEPTS = ["Quantum Computing", "Protein Folding", "Graph Networks", "Solar Catalysis", "Machine Learning"]
+EVENTS = ["NeurIPS Conference", "Gordon Symposium", "Lindau Meeting"]
+
+
+class MockRateLimitError(Exception):
+    """Injected failure that the rate limiter classifies like a provider 429."""
+    status_code = 429
+
+
+def _rng(*parts) -> random.Random:
+    digest = hashlib.sha256("\x1f".join(map(str, parts)).encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def trait_profile(name: str, seed: int = 0) -> Dict[str, float]:
+    """Stable Big Five scores for a name (the same person always gets the same profile)."""
+    rng = _rng(seed, "traits", name)
+    return {t: round(rng.uniform(0.1, 0.9), 2) for t in TRAITS}
+
+
+def mention_type(mention: str, before: str) -> str:
+    tokens = mention.split()
+    if tokens[0] in TITLES:
+        return "Person"
+    words = set(tokens)
+    if words & ORG_WORDS:
+        return "Organization"
+    if words & EVENT_WORDS:
+        return "Event"
+    if words & CONCEPT_WORDS:
+        return "Concept"
+    if len(tokens) == 1 and re.search(r"\b(in|at|to)\s*$", before):
+        return "Location"
+    if 2 <= len(tokens) <= 3:
+        return "Person"
+    return "Concept"
+
+
+def extract(text: str, seed: int = 0, output_scale: float = 1.0) -> Dict:
+    """Rule-based extraction: capitalized mentions typed by keywords, relations from cue phrases
+    between consecutive mentions of a sentence. output_scale > 1 adds MENTIONS edges between
+    further pairs (up to output_scale relations per sentence) to inflate the response."""
+    entities: Dict[str, str] = {}
+    relations: List[Dict] = []
+    for sent in _SENTENCE.findall(text):
+        mentions: List[Tuple[str, int, int]] = []
+        for m in _MENTION.finditer(sent):
+            name = m.group(0)
+            first, _, rest = name.partition(" ")
+            if first in STOPWORDS:
+                if not rest:
+                    continue
+                name = rest
+            mentions.append((name, m.end() - len(name), m.end()))
+            entities.setdefault(name, mention_type(name, sent[:m.end() - len(name)]))
+        evidence = sent.strip()[:160]
+        budget = max(1, int(round(output_scale * max(len(mentions) - 1, 1))))
+        rng = _rng(seed, "conf", evidence)
+        made = 0
+        for (a, _, a_end), (b, b_start, _) in zip(mentions, mentions[1:]):
+            between = sent[a_end:b_start].lower()
+            label = next((lab for rx, lab in REL_CUES if rx.search(between)), None)
+            if label and made < budget:
+                relations.append({"source_name": a, "relation_type": label, "target_name": b,
+                                  "confidence": round(rng.uniform(0.7, 1.0), 2), "evidence": evidence})
+                made += 1
+        for i in range(len(mentions)):
+            for j in range(i + 2, len(mentions)):
+                if made >= budget or output_scale <= 1:
+                    break
+                relations.append({"source_name": mentions[i][0], "relation_type": "MENTIONS",
+                                  "target_name": mentions[j][0], "confidence": 0.5, "evidence": evidence})
+                made += 1
+    return {"entities": [{"name": n, "type": t} for n, t in entities.items()], "relations": relations}
+
+
+def personality(user_prompt: str, seed: int = 0) -> Dict:
+    names = [n.strip() for n in user_prompt.split(":", 1)[-1].split(",") if n.strip()]
+    return {"traits": {n: trait_profile(n, seed) for n in names},
+            "evidence": {n: "mock: deterministic profile" for n in names}}
+
+
+def synthetic(user_prompt: str, seed: int = 0, output_scale: float = 1.0) -> Dict:
+    """A narrative built from templates, with the ground truth the templates encode."""
+    rng = _rng(seed, "synthetic", user_prompt)
+    people = [f"{f} {l}" for f, l in zip(rng.sample(FIRST, 4), rng.sample(LAST, 4))]
+    rels: List[Tuple[str, str, str, str]] = []
+    ents: Dict[str, str] = {p: "Person" for p in people}
+    paragraphs = []
+    for _ in range(max(1, int(round(3 * output_scale)))):
+        a, b, c = rng.sample(people, 3)
+        org, city, journal = rng.choice(ORGS), rng.choice(CITIES), rng.choice(JOURNALS)
+        award, concept, event = rng.choice(AWARDS), rng.choice(CONCEPTS), rng.choice(EVENTS)
+        ents.update({org: "Organization", city: "Location", journal: "Organization",
+                     award: "Concept", concept: "Concept", event: "Event"})
+        sentences = [
+            (f"Dr. {a} is affiliated with {org} in {city}.", [(a, "AFFILIATED_WITH", org), (org, "LOCATED_IN", city)]),
+            (f"{a} published a study on {concept} in {journal}.", [(a, "RESEARCHES", concept), (a, "PUBLISHED_IN", journal)]),
+            (f"Dr. {a} collaborated with Dr. {b}.", [(a, "COLLABORATES_WITH", b)]),
+            (f"Professor {c} advised {b}.", [(c, "ADVISED", b)]),
+            (f"{b} was awarded the {award}.", [(b, "AWARDED", award)]),
+            (f"{c} presented at the {event}.", [(c, "ATTENDED", event)]),
+        ]
+        rng.shuffle(sentences)
+        paragraphs.append(" ".join(s for s, _ in sentences))
+        for s, triples in sentences:
+            rels.extend((src, lab, dst, s) for src, lab, dst in triples)
+    noise = lambda: rng.uniform(-0.1, 0.1)
+    traits = {p: {t: round(min(1.0, max(0.0, v + noise())), 2) for t, v in trait_profile(p, seed).items()}
+              for p in people}
+    return {
+        "text": "\n\n".join(paragraphs),
+        "ground_truth": {
+            "entities": [{"name": n, "type": t} for n, t in ents.items()],
+            "relations": [{"source_name": s, "relation_type": lab, "target_name": d, "confidence": 1.0, "evidence": ev}
+                          for s, lab, d, ev in rels],
+        },
+        "ground_personality": {"traits": traits, "evidence": {p: "mock ground truth" for p in people}},
+    }
+
+
+class MockLLM:
+    """Schema-valid responses derived only from (seed, prompts), with simulated latency and failures.
+
+    latency_ms is the mean time to first token, drawn from a fixed / exponential / lognormal
+    distribution; tokens_per_s > 0 adds generation time proportional to response length.
+    error_rate injects MockRateLimitError (kind="throttle") or TimeoutError (kind="timeout");
+    the n-th attempt of a prompt always fails or succeeds the same way, so runs are reproducible.
+    """
+
+    def __init__(self, seed: int = 0, latency_ms: float = 0.0, latency_dist: str = "lognormal",
+                 tokens_per_s: float = 0.0, error_rate: float = 0.0, error_kind: str = "throttle",
+                 output_scale: float = 1.0):
+        self.seed, self.latency_ms, self.latency_dist = seed, latency_ms, latency_dist
+        self.tokens_per_s, self.error_rate, self.error_kind = tokens_per_s, error_rate, error_kind
+        self.output_scale = output_scale
+        self._attempts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def respond(self, system_prompt: str, user_prompt: str, json_mode: bool) -> str:
+        if system_prompt == KG_EXTRACT_SYSTEM:
+            return json.dumps(extract(user_prompt, self.seed, self.output_scale), ensure_ascii=False)
+        if system_prompt == PERSONALITY_SYSTEM:
+            return json.dumps(personality(user_prompt, self.seed), ensure_ascii=False)
+        if system_prompt == SYNTHETIC_DATA_SYSTEM:
+            return json.dumps(synthetic(user_prompt, self.seed, self.output_scale), ensure_ascii=False)
+        if json_mode:
+            return json.dumps({"echo": user_prompt[:200]})
+        return f"mock response to: {user_prompt[:200]}"
+
+    def _attempt(self, system_prompt: str, user_prompt: str) -> random.Random:
+        key = hashlib.sha256(f"{system_prompt}\x1f{user_prompt}".encode("utf-8")).hexdigest()
+        with self._lock:
+            n = self._attempts.get(key, 0)
+            self._attempts[key] = n + 1
+        rng = _rng(self.seed, "attempt", key, n)
+        if self.error_rate and rng.random() < self.error_rate:
+            self._sleep(rng)
+            if self.error_kind == "timeout":
+                raise TimeoutError("mock timeout")
+            raise MockRateLimitError("mock rate limit")
+        return rng
+
+    def _sleep(self, rng: random.Random):
+        mean = self.latency_ms / 1000.0
+        if mean <= 0:
+            return
+        if self.latency_dist == "fixed":
+            delay = mean
+        elif self.latency_dist == "exponential":
+            delay = rng.expovariate(1.0 / mean)
+        else:  # lognormal with the requested mean, sigma 0.5
+            delay = rng.lognormvariate(0.0, 0.5) * mean / 1.1331
+        time.sleep(delay)
+
+    def complete(self, system_prompt: str, user_prompt: str, json_mode: bool) -> str:
+        rng = self._attempt(system_prompt, user_prompt)
+        content = self.respond(system_prompt, user_prompt, json_mode)
+        self._sleep(rng)
+        if self.tokens_per_s > 0:
+            time.sleep(len(content) / 4 / self.tokens_per_s)
+        return content
+
+    def stream(self, system_prompt: str, user_prompt: str, json_mode: bool, chunk_chars: int = 16) -> Iterator[str]:
+        rng = self._attempt(system_prompt, user_prompt)
+        content = self.respond(system_prompt, user_prompt, json_mode)
+        self._sleep(rng)
+        per_chunk = chunk_chars / 4 / self.tokens_per_s if self.tokens_per_s > 0 else 0.0
+        for i in range(0, len(content), chunk_chars):
+            if per_chunk:
+                time.sleep(per_chunk)
+            yield content[i:i + chunk_chars]
@@ -1,6 +1,9 @@
 from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
+# Big Five trait names, in the column order used by trait vectors and matrices
+TRAITS = ["openness", "conscientiousness", "extraversion", "agreeableness", "neuroticism"]
+
 class Entity(BaseModel):
     id: str
     name: str
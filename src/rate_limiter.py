@@ -0,0 +1,197 @@
+"""
+Provider-aware rate limiting: token buckets, AIMD adaptive concurrency and jittered retries
+"""
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+THROTTLE, TRANSIENT = "throttle", "transient"
+_TRANSIENT_NAMES = {
+    "APITimeoutError", "APIConnectionError", "InternalServerError", "Timeout", "ReadTimeout",
+    "ConnectTimeout", "DeadlineExceeded", "ServiceUnavailable",
+}
+
+
+def classify_error(exc: BaseException) -> Optional[str]:
+    """THROTTLE for 429s, TRANSIENT for timeouts / connection errors / 5xx, None if not retryable."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        code = getattr(exc, "code", None)
+        status = code if isinstance(code, int) else None
+    name = type(exc).__name__
+    if status == 429 or name in ("RateLimitError", "ResourceExhausted", "TooManyRequests"):
+        return THROTTLE
+    if isinstance(exc, (TimeoutError, ConnectionError)) or name in _TRANSIENT_NAMES or status in (500, 502, 503, 504):
+        return TRANSIENT
+    return None
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds from a Retry-After header on the error's HTTP response, if the server sent one."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    try:
+        return float(headers.get("retry-after")) if headers and headers.get("retry-after") else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Refills at per_minute/60 units per second and holds up to `burst_s` seconds of capacity.
+
+    A request larger than the capacity is let through once the bucket is full and drives it
+    negative, so oversized prompts are delayed rather than blocked forever.
+    """
+
+    def __init__(self, per_minute: float, burst_s: float = 10.0):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_s)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, n: float = 1.0) -> float:
+        """Take n units; returns how long the caller must wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            need = min(n, self.capacity)
+            wait = 0.0 if self.tokens >= need else (need - self.tokens) / self.rate
+            self.tokens -= n
+            return wait
+
+
+class RateLimiter:
+    """Per provider/model limiter shared by every thread of a run.
+
+    Requests wait for a request-per-minute and a token-per-minute bucket (0 = unlimited) and
+    for an adaptive concurrency slot. The concurrency limit follows AIMD: +1 per `limit`
+    successful calls up to max_concurrency, halved on a 429 at most once per round trip
+    (a moving average of call latency), since one burst over the limit yields several 429s.
+    A Retry-After hint pauses every caller until it has passed.
+    """
+
+    def __init__(self, rpm: float = 0, tpm: float = 0, max_concurrency: int = 16,
+                 initial_concurrency: Optional[int] = None, adaptive: bool = True,
+                 min_concurrency: int = 1):
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.adaptive = adaptive
+        self.limit = float(min(initial_concurrency or self.max_concurrency, self.max_concurrency))
+        self.latency_s = 0.0
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        self.stats_counts = {"calls": 0, "throttled": 0, "transient_errors": 0, "retries": 0, "wait_s": 0.0}
+
+    def acquire(self, tokens: float = 0):
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                pause = self.paused_until - time.monotonic()
+                if pause > 0:
+                    self._cond.wait(pause)
+                elif self.in_flight >= int(self.limit):
+                    self._cond.wait()
+                else:
+                    break
+            self.in_flight += 1
+        wait = max(self.requests.reserve(1) if self.requests else 0.0,
+                   self.tokens.reserve(tokens) if self.tokens and tokens else 0.0)
+        if wait > 0:
+            time.sleep(wait)
+        with self._cond:
+            self.stats_counts["wait_s"] += time.monotonic() - start
+
+    def release(self, outcome: Optional[str] = None, duration_s: Optional[float] = None):
+        """outcome: None for success, THROTTLE / TRANSIENT / anything else for failures."""
+        with self._cond:
+            self.in_flight -= 1
+            self.stats_counts["calls"] += 1
+            if duration_s is not None:
+                self.latency_s = duration_s if not self.latency_s else 0.8 * self.latency_s + 0.2 * duration_s
+            if outcome is None:
+                if self.adaptive:
+                    self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+            elif outcome == THROTTLE:
+                self.stats_counts["throttled"] += 1
+                now = time.monotonic()
+                if self.adaptive and now - self._last_decrease >= self.latency_s:
+                    self.limit = max(float(self.min_concurrency), self.limit / 2)
+                    self._last_decrease = now
+            elif outcome == TRANSIENT:
+                self.stats_counts["transient_errors"] += 1
+            self._cond.notify_all()
+
+    def note_retry(self):
+        with self._cond:
+            self.stats_counts["retries"] += 1
+
+    def pause(self, seconds: float):
+        with self._cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    @contextmanager
+    def slot(self, tokens: float = 0):
+        """Hold one concurrency slot for the duration of a call, recording how it ended."""
+        self.acquire(tokens)
+        outcome, start = None, time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            outcome = classify_error(e) or "error"
+            raise
+        finally:
+            self.release(outcome, time.monotonic() - start)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {**self.stats_counts, "wait_s": round(self.stats_counts["wait_s"], 3),
+                    "concurrency_limit": round(self.limit, 2)}
+
+
+def backoff_delay(exc: BaseException, attempt: int, base_delay: float, max_delay: float) -> float:
+    """Server Retry-After if given, else full-jitter exponential backoff."""
+    hinted = retry_after(exc)
+    if hinted is not None:
+        return min(hinted, max_delay)
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def call_with_retries(fn: Callable[[], Any], limiter: RateLimiter, tokens: float = 0, max_retries: int = 5,
+                      base_delay: float = 1.0, max_delay: float = 60.0, label: str = "LLM") -> Any:
+    """Run fn inside a limiter slot, retrying throttles and transient errors with jittered backoff."""
+    attempt = 0
+    while True:
+        try:
+            with limiter.slot(tokens):
+                return fn()
+        except Exception as e:
+            kind = classify_error(e)
+            if kind is None or attempt >= max_retries:
+                raise
+            delay = backoff_delay(e, attempt, base_delay, max_delay)
+            if kind == THROTTLE and retry_after(e) is not None:
+                limiter.pause(delay)
+            limiter.note_retry()
+            attempt += 1
+            print(f"⚠️ {label} {kind} ({type(e).__name__}), retry {attempt}/{max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str, model: str, **kwargs) -> RateLimiter:
+    """The shared limiter for a provider/model; kwargs only apply when it is first created."""
+    with _limiters_lock:
+        key = (provider, model)
+        if key not in _limiters:
+            _limiters[key] = RateLimiter(**kwargs)
+        return _limiters[key]
@@ -0,0 +1,68 @@
+import re
+from typing import Dict, List, Tuple
+
+# rough chars-per-token ratio for English text; avoids a tokenizer dependency
+CHARS_PER_TOKEN = 4
+DEFAULT_MAX_TOKENS = 800
+
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+
+def estimate_tokens(text: str) -> int:
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+def split_sentences(text: str) -> List[str]:
+    return [s for s in _SENTENCE_SPLIT.split(text.strip()) if s]
+
+def _split_long_paragraph(para: str, max_tokens: int) -> List[str]:
+    """Break a paragraph that exceeds the budget into sentence groups that fit."""
+    pieces, current = [], []
+    for sent in split_sentences(para):
+        if current and estimate_tokens(" ".join(current + [sent])) > max_tokens:
+            pieces.append(" ".join(current))
+            current = []
+        current.append(sent)
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+def pack_segments(text: str, max_tokens: int = DEFAULT_MAX_TOKENS, overlap_sentences: int = 0,
+                  system_prompt_tokens: int = 0) -> Tuple[List[str], Dict]:
+    """Pack consecutive paragraphs into chunks of at most max_tokens (estimated).
+
+    With overlap_sentences > 0 each chunk starts with the last sentences of the previous
+    one, so relations spanning a chunk boundary can still be extracted. max_tokens <= 0
+    keeps the legacy one-segment-per-line behaviour.
+    Returns the chunks and stats on how many LLM calls (and system-prompt tokens) were saved.
+    """
+    paragraphs = [p.strip() for p in text.split("\n") if p.strip()]
+    if max_tokens <= 0:
+        chunks = paragraphs
+    else:
+        chunks = []
+        current: List[str] = []
+        current_tokens = 0
+        for para in paragraphs:
+            pieces = [para] if estimate_tokens(para) <= max_tokens else _split_long_paragraph(para, max_tokens)
+            for piece in pieces:
+                t = estimate_tokens(piece)
+                if current and current_tokens + t > max_tokens:
+                    chunks.append("\n".join(current))
+                    carry = " ".join(split_sentences(current[-1])[-overlap_sentences:]) if overlap_sentences > 0 else ""
+                    current, current_tokens = [], 0
+                    if carry and estimate_tokens(carry) + t <= max_tokens:
+                        current, current_tokens = [carry], estimate_tokens(carry)
+                current.append(piece)
+                current_tokens += t
+        if current:
+            chunks.append("\n".join(current))
+
+    legacy_tokens = sum(estimate_tokens(p) for p in paragraphs) + len(paragraphs) * system_prompt_tokens
+    packed_tokens = sum(estimate_tokens(c) for c in chunks) + len(chunks) * system_prompt_tokens
+    stats = {
+        "paragraphs": len(paragraphs),
+        "segments": len(chunks),
+        "calls_saved": len(paragraphs) - len(chunks),
+        "prompt_tokens": packed_tokens,
+        "prompt_tokens_saved": legacy_tokens - packed_tokens,
+    }
+    return chunks, stats
@@ -0,0 +1,204 @@
+"""
+Streaming session logs: each LLM exchange is appended to rotating JSONL files (optionally gzip
+or zstd compressed) as it completes, instead of being held in memory until the end of a run
+"""
+import gzip
+import io
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+EXTENSIONS = {"none": ".jsonl", "gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+
+def _zstd():
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+
+class SessionLogWriter:
+    """Appends entries as JSON lines to <out_dir>/session-<ts>-NNN.jsonl[.gz|.zst].
+
+    A new part is started once the current one holds max_bytes (compressed size when
+    compressing). Every write is flushed, so a crash loses at most the entry being written;
+    readers skip a torn last line. The last `tail` entries are also kept in memory.
+    """
+
+    def __init__(self, out_dir: str, compression: str = "none", max_bytes: int = 64 * 1024 * 1024,
+                 tail: int = 100, name: Optional[str] = None):
+        if compression not in EXTENSIONS:
+            raise ValueError(f"Unsupported session log compression: {compression}")
+        if compression == "zstd" and _zstd() is None:
+            print("⚠️ zstandard is not installed, writing gzip session logs instead")
+            compression = "gzip"
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir, self.compression, self.max_bytes = out_dir, compression, max(1, max_bytes)
+        self.name = name or f"session-{int(time.time())}"
+        self.tail = deque(maxlen=max(0, tail))
+        self.count = 0
+        self.paths: List[str] = []
+        self._raw = None
+        self._stream = None
+        self._lock = threading.Lock()
+
+    def _open_part(self):
+        path = os.path.join(self.out_dir, f"{self.name}-{len(self.paths):03d}{EXTENSIONS[self.compression]}")
+        self._raw = open(path, "wb")
+        if self.compression == "gzip":
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        elif self.compression == "zstd":
+            self._stream = _zstd().ZstdCompressor().stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = self._raw
+        self.paths.append(path)
+
+    def _close_part(self):
+        if self._stream is not None:
+            if self._stream is not self._raw:
+                self._stream.close()
+            self._raw.close()
+            self._stream = self._raw = None
+
+    def write_many(self, entries: Iterable[Dict[str, Any]]):
+        import orjson
+        entries = list(entries)
+        lines = [orjson.dumps(e, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY) for e in entries]
+        if not lines:
+            return
+        with self._lock:
+            if self._stream is None:
+                self._open_part()
+            for entry, line in zip(entries, lines):
+                self._stream.write(line)
+                self.tail.append(entry)
+            self.count += len(lines)
+            if self.compression == "zstd":
+                self._stream.flush(_zstd().FLUSH_BLOCK)
+            else:
+                self._stream.flush()
+            if self._raw.tell() >= self.max_bytes:
+                self._close_part()
+
+    def write(self, entry: Dict[str, Any]):
+        self.write_many([entry])
+
+    def close(self):
+        with self._lock:
+            self._close_part()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def _open_text(path: str) -> io.TextIOBase:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.endswith(".zst"):
+        zstd = _zstd()
+        if zstd is None:
+            raise ImportError(f"zstandard is required to read {path}")
+        return io.TextIOWrapper(zstd.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True), encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def _iter_json_array(f, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """Elements of a top-level JSON array, decoded one at a time from chunked reads."""
+    decoder = json.JSONDecoder()
+    buf, pos, started, eof, want = "", 0, False, False, chunk_size
+    while True:
+        while pos < len(buf) and (buf[pos].isspace() or buf[pos] == ","):
+            pos += 1
+        if pos < len(buf):
+            if not started:
+                if buf[pos] != "[":  # a single legacy entry object
+                    yield json.loads(buf[pos:] + f.read())
+                    return
+                started, pos = True, pos + 1
+                continue
+            if buf[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+                complete = end < len(buf) or eof
+            except ValueError:
+                complete = False
+            if complete:
+                yield item
+                pos, want = end, chunk_size
+                continue
+            want *= 2  # element spans chunks: read more at once to avoid re-decoding it many times
+        if eof:
+            return  # end of file, or a truncated last element
+        chunk = f.read(want)
+        eof = not chunk
+        buf, pos = buf[pos:] + chunk, 0
+
+
+def iter_session_file(path: str) -> Iterator[Dict[str, Any]]:
+    """Lazily yield the entries of one session file: a legacy session-*.json list or a
+    (compressed) JSONL part. Neither is read into memory whole; unreadable lines, e.g. the
+    torn last line after a crash, are skipped.
+    """
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            yield from _iter_json_array(f)
+        return
+    with _open_text(path) as f:
+        try:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+        except (EOFError, OSError):
+            return  # compressed stream cut off mid-block by a crash
+
+
+def session_files(sessions_dir: str) -> List[str]:
+    """Legacy session-*.json and JSONL parts in write order."""
+    if not os.path.isdir(sessions_dir):
+        return []
+    names = [n for n in os.listdir(sessions_dir)
+             if n.startswith("session-") and (n.endswith(".json") or any(n.endswith(e) for e in EXTENSIONS.values()))]
+    return [os.path.join(sessions_dir, n) for n in sorted(names)]
+
+
+def _iter_file_safe(path: str) -> Iterator[Dict[str, Any]]:
+    try:
+        yield from iter_session_file(path)
+    except Exception as e:
+        print(f"⚠️ Skipping unreadable session log {os.path.basename(path)}: {e}")
+
+
+def iter_sessions(sessions_dir: str) -> Iterator[Dict[str, Any]]:
+    """Every entry of a run's session logs, in write order, read one at a time."""
+    return chain.from_iterable(_iter_file_safe(p) for p in session_files(sessions_dir))
+
+
+def reservoir_sample(items: Iterable[Any], k: int, seed: Optional[int] = None) -> List[Any]:
+    """Uniform sample of k items from a stream of unknown length in O(k) memory (Algorithm R),
+    returned in stream order."""
+    rng = random.Random(seed)
+    reservoir: List[tuple] = []
+    for i, item in enumerate(items):
+        if i < k:
+            reservoir.append((i, item))
+        else:
+            j = rng.randint(0, i)
+            if j < k:
+                reservoir[j] = (i, item)
+    return [item for _, item in sorted(reservoir, key=lambda r: r[0])]
@@ -0,0 +1,181 @@
+"""
+Lightweight in-process tracing: spans for LLM calls and pipeline stages, aggregated into
+per-span latency percentiles / histograms at the end of a run
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from .rate_limiter import classify_error
+
+# histogram bucket upper bounds in milliseconds (the last bucket is open-ended)
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 60000, 120000, 300000]
+PERCENTILES = (50, 95, 99)
+
+
+class _NullSpan:
+    """Returned by a disabled tracer: every operation is a no-op, so call sites need no checks."""
+    enabled = False
+    attrs: Dict[str, Any] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+    def incr(self, key: str, n: int = 1):
+        pass
+
+    def mark(self, key: str):
+        pass
+
+    def fields(self) -> Dict[str, Any]:
+        return {}
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """One timed operation; numeric attrs (tokens, attempts, ...) are summed per span name."""
+    enabled = True
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict[str, Any]):
+        self.tracer, self.name, self.attrs = tracer, name, attrs
+        self.outcome = "ok"
+        self.duration_s = None
+        self.start = time.perf_counter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if isinstance(exc, GeneratorExit):
+            self.outcome = "cancelled"  # a streaming consumer stopped early
+        elif exc is not None:
+            self.outcome = classify_error(exc) or "error"
+        self.duration_s = time.perf_counter() - self.start
+        self.tracer._record(self)
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def incr(self, key: str, n: int = 1):
+        self.attrs[key] = self.attrs.get(key, 0) + n
+
+    def mark(self, key: str):
+        """Record seconds since the span started under `key` (first one wins), e.g. time to first chunk."""
+        self.attrs.setdefault(key, time.perf_counter() - self.start)
+
+    def fields(self) -> Dict[str, Any]:
+        """Span timing and attrs, rounded for session logs."""
+        out = {k: round(v, 4) if isinstance(v, float) else v for k, v in self.attrs.items()}
+        if self.duration_s is not None:
+            out["latency_s"] = round(self.duration_s, 4)
+        return out
+
+
+class _SpanStats:
+    def __init__(self):
+        self.durations: List[float] = []
+        self.outcomes: Dict[str, int] = {}
+        self.totals: Dict[str, float] = {}
+        self.timings: Dict[str, List[float]] = {}  # attrs ending in _s, e.g. first_chunk_s
+
+
+class Tracer:
+    """Collects finished spans per name. A disabled tracer hands out NULL_SPAN and records nothing."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._stats: Dict[str, _SpanStats] = {}
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def span(self, name: str, **attrs) -> Any:
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, attrs)
+
+    def _record(self, span: Span):
+        with self._lock:
+            stats = self._stats.get(span.name)
+            if stats is None:
+                stats = self._stats[span.name] = _SpanStats()
+            stats.durations.append(span.duration_s)
+            stats.outcomes[span.outcome] = stats.outcomes.get(span.outcome, 0) + 1
+            for k, v in span.attrs.items():
+                if isinstance(v, bool) or not isinstance(v, (int, float)):
+                    continue
+                if k.endswith("_s"):
+                    stats.timings.setdefault(k, []).append(v)
+                else:
+                    stats.totals[k] = stats.totals.get(k, 0) + v
+
+    def summary(self) -> Dict[str, Any]:
+        """{span name: count, outcomes, total/mean/max and p50/p95/p99 in ms, histogram, attr totals}."""
+        import numpy as np
+        with self._lock:
+            items = [(name, s.durations[:], dict(s.outcomes), dict(s.totals), {k: v[:] for k, v in s.timings.items()})
+                     for name, s in self._stats.items()]
+        spans = {}
+        for name, durations, outcomes, totals, timings in sorted(items):
+            ms = np.asarray(durations) * 1000.0
+            entry = {
+                "count": int(ms.size),
+                "errors": sum(c for o, c in outcomes.items() if o != "ok"),
+                "outcomes": outcomes,
+                "total_s": round(float(ms.sum()) / 1000.0, 4),
+                "mean_ms": round(float(ms.mean()), 3),
+                "max_ms": round(float(ms.max()), 3),
+                **{f"p{p}_ms": round(float(v), 3) for p, v in zip(PERCENTILES, np.percentile(ms, PERCENTILES))},
+                "histogram": {
+                    "le_ms": BUCKETS_MS + ["inf"],
+                    "counts": np.bincount(np.searchsorted(BUCKETS_MS, ms), minlength=len(BUCKETS_MS) + 1).tolist(),
+                },
+            }
+            if totals:
+                entry["totals"] = {k: round(v, 4) if isinstance(v, float) else v for k, v in totals.items()}
+            for key, values in timings.items():
+                vms = np.asarray(values) * 1000.0
+                entry[key[:-2]] = {f"p{p}_ms": round(float(v), 3)
+                                   for p, v in zip(PERCENTILES, np.percentile(vms, PERCENTILES))}
+            spans[name] = entry
+        return {"started": self.started, "wall_s": round(time.time() - self.started, 3), "spans": spans}
+
+    def metrics(self, summary: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
+        """Flat trace.<span>.<stat> metrics for MLflow."""
+        summary = summary or self.summary()
+        out = {}
+        for name, s in summary["spans"].items():
+            prefix = f"trace.{name}"
+            for k in ("count", "errors", "total_s", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"):
+                out[f"{prefix}.{k}"] = s[k]
+            for k, v in s.get("totals", {}).items():
+                out[f"{prefix}.{k}"] = v
+        return out
+
+    def write_json(self, path: str, summary: Optional[Dict[str, Any]] = None) -> str:
+        import orjson
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(summary or self.summary(), option=orjson.OPT_INDENT_2))
+        return path
+
+
+_tracer = Tracer(enabled=False)
+
+
+def get_tracer() -> Tracer:
+    """The process-wide tracer (disabled until configure_tracing is called)."""
+    return _tracer
+
+
+def configure_tracing(enabled: bool = True) -> Tracer:
+    """Replace the process-wide tracer with a fresh one and return it."""
+    global _tracer
+    _tracer = Tracer(enabled=enabled)
+    return _tracer
@@ -0,0 +1,189 @@
+"""
+Nearest-neighbor search over Big Five trait vectors
+"""
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from .compact_graph import CompactGraph
+from .kg_query import KGIndex
+from .normalization import canon_relation
+
+TREE_MIN_ROWS = 50_000
+
+
+class TraitIndex:
+    """Person trait vectors packed into one contiguous (N, 5) float32 matrix.
+
+    Only persons with all five scores are indexed. Queries are exact: brute force in row
+    blocks, or a KD-tree (scipy.spatial.cKDTree, when installed) for large N. Both accept a
+    batch of query vectors and an optional candidate set (graph neighborhood / relation filter),
+    which is searched exhaustively since it is usually small.
+    """
+
+    def __init__(self, graph: Union[CompactGraph, KGIndex], use_tree: Optional[bool] = None):
+        self.graph = graph if isinstance(graph, KGIndex) else KGIndex(graph)
+        cg = self.graph.cg
+        types = cg.node_types
+        person = cg.type_names.index("Person") if "Person" in cg.type_names else -1
+        traits = cg.traits
+        rows = np.flatnonzero((types == person) & ~np.isnan(traits).any(axis=1))
+        self.nodes = rows                                   # matrix row -> node index
+        self.matrix = np.ascontiguousarray(traits[rows], dtype=np.float32)
+        self.sq_norms = (self.matrix ** 2).sum(axis=1)
+        self._row_of = np.full(cg.num_nodes, -1, dtype=np.int64)
+        self._row_of[rows] = np.arange(len(rows))
+        if use_tree is None:
+            use_tree = len(rows) >= TREE_MIN_ROWS
+        self.tree = self._build_tree() if use_tree else None
+
+    def _build_tree(self):
+        try:
+            from scipy.spatial import cKDTree
+        except ImportError:
+            print("⚠️ scipy not installed, trait index falls back to exact brute-force search")
+            return None
+        return cKDTree(self.matrix)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def vector(self, key: str) -> Optional[np.ndarray]:
+        i = self.graph.node(key)
+        if i is None or self._row_of[i] < 0:
+            return None
+        return self.matrix[self._row_of[i]]
+
+    # -- candidate filters -------------------------------------------------------
+
+    def neighborhood(self, key: str, hops: int = 1) -> np.ndarray:
+        """Node indices within `hops` edges of key, ignoring direction (key excluded)."""
+        g, cg = self.graph, self.graph.cg
+        start = g.node(key)
+        if start is None:
+            return np.zeros(0, dtype=np.int64)
+        seen = np.zeros(cg.num_nodes, dtype=bool)
+        seen[start] = True
+        frontier = np.array([start])
+        for _ in range(hops):
+            out = [cg.dst[cg.indptr[u]:cg.indptr[u + 1]] for u in frontier]
+            inc = [cg.src[g._in_order[g._in_indptr[u]:g._in_indptr[u + 1]]] for u in frontier]
+            nxt = np.unique(np.concatenate(out + inc)) if len(frontier) else frontier
+            frontier = nxt[~seen[nxt]]
+            seen[frontier] = True
+        seen[start] = False
+        return np.flatnonzero(seen)
+
+    def colleagues(self, key: str, rel: str = "WORKS_AT") -> np.ndarray:
+        """Nodes sharing a `rel` target with key (e.g. everyone WORKS_AT the same organization)."""
+        g, cg = self.graph, self.graph.cg
+        rel = canon_relation(rel)
+        found = [g.sources_of(cg.node_keys[t], rel) for t in g.targets_of(key, rel)]
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        out = np.unique(np.concatenate(found))
+        return out[out != g.node(key)]
+
+    # -- queries -----------------------------------------------------------------
+
+    def _rows(self, candidates: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        if candidates is None:
+            return None
+        rows = self._row_of[np.asarray(candidates, dtype=np.int64)]
+        return rows[rows >= 0]
+
+    def _sq_dists(self, q: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        X = self.matrix if rows is None else self.matrix[rows]
+        norms = self.sq_norms if rows is None else self.sq_norms[rows]
+        d = (q ** 2).sum(axis=1)[:, None] + norms[None, :] - 2.0 * (q @ X.T)
+        return np.maximum(d, 0.0, out=d)
+
+    def knn(self, queries: np.ndarray, k: int = 10, candidates: Optional[np.ndarray] = None,
+            exclude: Optional[np.ndarray] = None, block: int = 1024) -> Tuple[np.ndarray, np.ndarray]:
+        """Batched exact k-NN. Returns (node indices, euclidean distances), both (Q, k'), nearest first.
+
+        exclude holds one node index per query to drop from its own results (e.g. the query person);
+        rows left short by it are padded with -1 / inf.
+        """
+        q = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        rows = self._rows(candidates)
+        n = len(self.nodes) if rows is None else len(rows)
+        extra = 0 if exclude is None else 1
+        kk = min(k + extra, n)
+        if kk == 0:
+            return np.zeros((len(q), 0), dtype=np.int64), np.zeros((len(q), 0), dtype=np.float32)
+
+        if self.tree is not None and rows is None:
+            dist, idx = self.tree.query(q, k=kk)
+            idx, dist = np.asarray(idx).reshape(len(q), kk), np.asarray(dist, dtype=np.float32).reshape(len(q), kk)
+            nodes = self.nodes[idx]
+        else:
+            nodes = np.empty((len(q), kk), dtype=np.int64)
+            dist = np.empty((len(q), kk), dtype=np.float32)
+            for start in range(0, len(q), block):
+                d = self._sq_dists(q[start:start + block], rows)
+                part = np.argpartition(d, kk - 1, axis=1)[:, :kk] if kk < n else np.tile(np.arange(n), (len(d), 1))
+                pd = np.take_along_axis(d, part, axis=1)
+                order = np.argsort(pd, axis=1, kind="stable")
+                best = np.take_along_axis(part, order, axis=1)
+                cols = best if rows is None else rows[best]
+                nodes[start:start + block] = self.nodes[cols]
+                dist[start:start + block] = np.sqrt(np.take_along_axis(pd, order, axis=1))
+
+        if exclude is not None:
+            # move each row's excluded hit to the end (as -1 / inf); when we over-fetched and it
+            # was not returned, the extra farthest hit goes instead
+            hit = nodes == np.asarray(exclude, dtype=np.int64)[:, None]
+            if kk > k:
+                hit[~hit.any(axis=1), -1] = True
+            nodes, dist = np.where(hit, -1, nodes), np.where(hit, np.float32(np.inf), dist)
+            order = np.argsort(hit, axis=1, kind="stable")
+            nodes, dist = np.take_along_axis(nodes, order, axis=1), np.take_along_axis(dist, order, axis=1)
+            if hit.any(axis=1).all():
+                nodes, dist = nodes[:, :-1], dist[:, :-1]
+        return nodes[:, :k], dist[:, :k]
+
+    def radius(self, queries: np.ndarray, r: float, candidates: Optional[np.ndarray] = None) -> List[np.ndarray]:
+        """Node indices within euclidean distance r of each query (one sorted-by-distance array per query)."""
+        q = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        rows = self._rows(candidates)
+        out = []
+        if self.tree is not None and rows is None:
+            for hits in self.tree.query_ball_point(q, r):
+                hits = np.asarray(hits, dtype=np.int64)
+                d = ((self.matrix[hits] - q[len(out)]) ** 2).sum(axis=1)
+                out.append(self.nodes[hits[np.argsort(d, kind="stable")]])
+            return out
+        d = self._sq_dists(q, rows)
+        for row in d:
+            hits = np.flatnonzero(row <= r * r)
+            hits = hits[np.argsort(row[hits], kind="stable")]
+            out.append(self.nodes[hits if rows is None else rows[hits]])
+        return out
+
+    def similar(self, key: str, k: int = 10, rel: Optional[str] = None, hops: Optional[int] = None) -> List[Dict]:
+        """People with the closest trait vectors to key, optionally only among its rel colleagues
+        (shared rel target) or within `hops` of it in the graph."""
+        v = self.vector(key)
+        if v is None:
+            return []
+        if rel:
+            candidates = self.colleagues(key, rel)
+        elif hops:
+            candidates = self.neighborhood(key, hops)
+        else:
+            candidates = None
+        me = self.graph.node(key)
+        nodes, dist = self.knn(v[None, :], k, candidates, exclude=np.array([me]))
+        return [dict(self.graph.describe(int(i)), distance=round(float(d), 4))
+                for i, d in zip(nodes[0], dist[0]) if i >= 0]
+
+    def similar_many(self, keys: Sequence[str], k: int = 10) -> Dict[str, List[Tuple[str, float]]]:
+        """Batched unfiltered lookups: key -> [(node id, distance), ...]."""
+        known = [key for key in keys if self.vector(key) is not None]
+        if not known:
+            return {}
+        q = np.stack([self.vector(key) for key in known])
+        me = np.array([self.graph.node(key) for key in known])
+        nodes, dist = self.knn(q, k, exclude=me)
+        node_keys = self.graph.cg.node_keys
+        return {key: [(node_keys[i], round(float(d), 4)) for i, d in zip(nodes[j], dist[j]) if i >= 0]
+                for j, key in enumerate(known)}
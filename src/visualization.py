@@ -0,0 +1,274 @@
+"""
+Shared HTML renderer for knowledge graphs: layout is computed in Python, the browser only draws
+"""
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import networkx as nx
+from .models import TRAITS
+
+COLOR_MAP = {
+    "Person": "#1f77b4", "Organization": "#ff7f0e", "Event": "#2ca02c",
+    "Location": "#d62728", "Concept": "#9467bd",
+}
+VIS_CSS = "c:/Assigment/lib/vis-9.1.2/vis-network.css"
+VIS_JS = "c:/Assigment/lib/vis-9.1.2/vis-network.min.js"
+DEFAULT_MAX_NODES = 2000
+DENSE_SPECTRAL_MAX = 1000  # spectral_layout switches to a sparse eigensolver above this
+
+
+def node_label(n, data: Dict) -> Tuple[str, str]:
+    """Label and tooltip for a node: 'Name (Type) [ope=0.80, ...]' / 'type=Type | ope=0.80, ...'."""
+    name = data.get("name", n); typ = data.get("type", "")
+    traits = []
+    for t in TRAITS:
+        v = data.get(t)
+        if v is not None:
+            traits.append(f"{t[:3]}={float(v):.2f}")
+    label = f"{name} ({typ})" + (" [" + ", ".join(traits) + "]" if traits else "")
+    title = f"type={typ}" + ((" | " + ", ".join(traits)) if traits else "")
+    return label, title
+
+
+# -- sampling ---------------------------------------------------------------
+
+def _edge_index(G: nx.MultiDiGraph, nodes: List) -> np.ndarray:
+    index = {n: i for i, n in enumerate(nodes)}
+    pairs = [(index[s], index[t]) for s, t in G.edges()]
+    return np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+
+
+def pagerank(n: int, edges: np.ndarray, damping: float = 0.85, iterations: int = 30) -> np.ndarray:
+    """Power-iteration PageRank over an (E, 2) index array (no scipy needed)."""
+    if n == 0:
+        return np.zeros(0)
+    src, dst = edges[:, 0], edges[:, 1]
+    out_deg = np.bincount(src, minlength=n).astype(np.float64)
+    pr = np.full(n, 1.0 / n)
+    for _ in range(iterations):
+        share = np.divide(pr, out_deg, out=np.zeros(n), where=out_deg > 0)
+        dangling = pr[out_deg == 0].sum()
+        pr = (1 - damping) / n + damping * (np.bincount(dst, weights=share[src], minlength=n) + dangling / n)
+    return pr
+
+
+def select_subgraph(G: nx.MultiDiGraph, max_nodes: Optional[int] = DEFAULT_MAX_NODES, rank_by: str = "degree",
+                    ego: Optional[str] = None, radius: int = 1) -> nx.MultiDiGraph:
+    """Cap a graph for display: the ego-neighborhood of a node, and/or the top max_nodes by degree or pagerank."""
+    if ego is not None:
+        if ego not in G:
+            raise KeyError(f"Node not found: {ego}")
+        # BFS over both edge directions (nx.ego_graph(undirected=True) would copy the whole graph)
+        seen, frontier = {ego}, [ego]
+        for _ in range(radius):
+            nxt = []
+            for u in frontier:
+                for v in list(G.successors(u)) + list(G.predecessors(u)):
+                    if v not in seen:
+                        seen.add(v)
+                        nxt.append(v)
+            frontier = nxt
+        G = G.subgraph(seen)
+    if not max_nodes or G.number_of_nodes() <= max_nodes:
+        return G
+    nodes = list(G.nodes)
+    if rank_by == "pagerank":
+        score = pagerank(len(nodes), _edge_index(G, nodes))
+    else:
+        score = np.fromiter((d for _, d in G.degree(nodes)), dtype=np.float64, count=len(nodes))
+    keep = np.argsort(-score, kind="stable")[:max_nodes]
+    keep_nodes = [nodes[i] for i in keep]
+    if ego is not None and ego not in keep_nodes:
+        keep_nodes[-1] = ego
+    return G.subgraph(keep_nodes)
+
+
+# -- layout -----------------------------------------------------------------
+
+def force_layout(n: int, edges: np.ndarray, iterations: int = 50, seed: int = 0) -> np.ndarray:
+    """Vectorized Fruchterman-Reingold; repulsion is computed in float32 row blocks to bound memory."""
+    rng = np.random.default_rng(seed)
+    pos = rng.random((n, 2)).astype(np.float32)
+    if n <= 1:
+        return pos
+    k2 = np.float32(1.0 / n)
+    temp = 0.1
+    cool = temp / (iterations + 1)
+    block = max(1, 4_000_000 // n)
+    src, dst = (edges[:, 0], edges[:, 1]) if len(edges) else (np.zeros(0, int), np.zeros(0, int))
+    disp = np.empty((n, 2), dtype=np.float32)
+    for _ in range(iterations):
+        x, y = pos[:, 0], pos[:, 1]
+        for start in range(0, n, block):
+            stop = min(n, start + block)
+            dx = x[start:stop, None] - x[None, :]
+            dy = y[start:stop, None] - y[None, :]
+            inv = dx * dx
+            inv += dy * dy
+            np.maximum(inv, 1e-9, out=inv)
+            np.divide(k2, inv, out=inv)
+            disp[start:stop, 0] = np.einsum("ij,ij->i", dx, inv)
+            disp[start:stop, 1] = np.einsum("ij,ij->i", dy, inv)
+        delta = pos[src] - pos[dst]
+        force = delta * (np.sqrt((delta ** 2).sum(axis=1)) * np.float32(np.sqrt(n)))[:, None]
+        for axis in range(2):
+            disp[:, axis] -= np.bincount(src, weights=force[:, axis], minlength=n).astype(np.float32)
+            disp[:, axis] += np.bincount(dst, weights=force[:, axis], minlength=n).astype(np.float32)
+        length = np.maximum(np.sqrt((disp ** 2).sum(axis=1)), 1e-9)
+        pos += disp * (np.minimum(length, temp) / length)[:, None]
+        temp -= cool
+    return pos
+
+
+def spectral_layout(n: int, edges: np.ndarray, seed: int = 0) -> np.ndarray:
+    """Coordinates from the 2nd/3rd eigenvectors of the symmetric graph Laplacian.
+
+    Up to DENSE_SPECTRAL_MAX nodes the dense Laplacian is solved exactly; larger graphs use a
+    sparse Laplacian and scipy's eigsh for the three smallest eigenpairs, falling
+    back to force_layout when scipy is missing or ARPACK does not converge.
+    """
+    if n <= 2:
+        return np.random.default_rng(0).random((n, 2))
+    if n <= DENSE_SPECTRAL_MAX:
+        A = np.zeros((n, n))
+        if len(edges):
+            np.add.at(A, (edges[:, 0], edges[:, 1]), 1.0)
+        A = A + A.T
+        L = np.diag(A.sum(axis=1)) - A
+        _, vecs = np.linalg.eigh(L)
+        return vecs[:, 1:3]
+    try:
+        from scipy.sparse import coo_matrix, diags, identity
+        from scipy.sparse.linalg import eigsh
+    except ImportError:
+        print("⚠️ scipy not installed, using the force layout for large graphs")
+        return force_layout(n, edges, seed=seed)
+    src, dst = (edges[:, 0], edges[:, 1]) if len(edges) else (np.zeros(0, int), np.zeros(0, int))
+    A = coo_matrix((np.ones(len(src)), (src, dst)), shape=(n, n)).tocsr()
+    A = A + A.T
+    L = (diags(np.asarray(A.sum(axis=1)).ravel()) - A).tocsr()
+    # the smallest eigenpairs of L are the largest of c*I - L (c >= lambda_max by Gershgorin);
+    # "LA" needs only matrix-vector products, no factorization that fills in on large graphs
+    c = 2.0 * L.diagonal().max() + 1.0
+    try:
+        vals, vecs = eigsh(c * identity(n, format="csr") - L, k=3, which="LA", tol=1e-4, maxiter=2000,
+                           v0=np.random.default_rng(seed).random(n))
+    except Exception as e:
+        print(f"⚠️ Sparse spectral layout failed ({e}), using the force layout")
+        return force_layout(n, edges, seed=seed)
+    vals = c - vals
+    return vecs[:, np.argsort(vals)[1:3]]
+
+
+def compute_layout(G: nx.MultiDiGraph, method: str = "force", scale: float = 1000.0,
+                   iterations: int = 50, seed: int = 0) -> Dict:
+    """Node -> (x, y) in pixels, centred on the origin."""
+    nodes = list(G.nodes)
+    edges = _edge_index(G, nodes)
+    pos = spectral_layout(len(nodes), edges, seed) if method == "spectral" else force_layout(len(nodes), edges, iterations, seed)
+    if len(nodes):
+        pos = pos - pos.mean(axis=0)
+        span = np.abs(pos).max()
+        if span > 0:
+            pos = pos / span * scale * np.sqrt(len(nodes) / 100 + 1)
+    return {n: (float(x), float(y)) for n, (x, y) in zip(nodes, pos)}
+
+
+# -- rendering ----------------------------------------------------------------
+
+def render_html(G: nx.MultiDiGraph, out_html: str, title: str = "KG Preview",
+                max_nodes: Optional[int] = DEFAULT_MAX_NODES, rank_by: str = "degree",
+                ego: Optional[str] = None, radius: int = 1, layout: str = "force",
+                totals: Optional[Tuple[int, int]] = None) -> str:
+    """Write a static vis-network page with precomputed positions and browser physics off.
+
+    Node/edge data goes to a sidecar '<name>.data.js' loaded by a script tag (works from file://).
+    """
+    # totals: (nodes, edges) of the full graph when G is already a selection of it
+    total_nodes, total_edges = totals or (G.number_of_nodes(), G.number_of_edges())
+    H = select_subgraph(G, max_nodes, rank_by, ego, radius)
+    pos = compute_layout(H, layout)
+
+    nodes, edges, edge_types = [], [], set()
+    for n, data in H.nodes(data=True):
+        label, tip = node_label(n, data)
+        typ = data.get("type", "")
+        x, y = pos[n]
+        nodes.append({"id": n, "label": label, "group": typ, "color": COLOR_MAP.get(typ, "#888"),
+                      "title": tip, "x": round(x, 1), "y": round(y, 1)})
+    for s, t, data in H.edges(data=True):
+        rel = data.get("type", ""); conf = float(data.get("confidence", 0.5)); evid = data.get("evidence", "")
+        tip = f"{rel} | conf={conf:.2f}" + (f" | evidence: {evid}" if evid else "")
+        edges.append({"from": s, "to": t, "label": rel, "title": tip, "confidence": conf, "width": 1 + 4 * conf})
+        edge_types.add(rel)
+
+    base = os.path.splitext(out_html)[0]
+    data_js = base + ".data.js"
+    with open(data_js, "w", encoding="utf-8") as f:
+        f.write("window.KG_DATA = ")
+        json.dump({"nodes": nodes, "edges": edges, "edgeTypes": sorted(edge_types)}, f, ensure_ascii=False)
+        f.write(";\n")
+
+    shown = f"showing {len(nodes)} of {total_nodes} nodes, {len(edges)} of {total_edges} edges"
+    html = f"""<!DOCTYPE html><html><head><meta charset='utf-8'><title>{title}</title>
+<link rel="stylesheet" href="{VIS_CSS}">
+<script src="{VIS_JS}"></script>
+<style>
+body {{ margin:0; font-family: Arial, sans-serif; }}
+#toolbar {{ padding:10px; border-bottom:1px solid #ddd; display:flex; gap:12px; align-items:center; flex-wrap:wrap; }}
+#legend span {{ display:inline-block; padding:4px 8px; border-radius:4px; margin-right:6px; color:#fff; font-size:12px; }}
+#mynetwork {{ height: calc(100vh - 54px); }}
+</style></head><body>
+<div id="toolbar">
+  <div><strong>Search:</strong> <input id="search" placeholder="type to search..." style="width:220px;"></div>
+  <div><strong>Min confidence:</strong> <input id="conf" type="range" min="0" max="1" step="0.05" value="0"><span id="confv">0.00</span></div>
+  <div id="filters"><strong>Edge types:</strong> </div>
+  <div id="legend"><strong>Legend:</strong> {" ".join([f'<span style="background:{COLOR_MAP[t]}">{t}</span>' for t in COLOR_MAP])}</div>
+  <div><em>{shown}</em></div>
+</div>
+<div id='mynetwork'></div>
+<script src="{os.path.basename(data_js)}"></script>
+<script>
+var data = window.KG_DATA;
+var filters = document.getElementById('filters');
+data.edgeTypes.forEach(function(et) {{
+  var l = document.createElement('label');
+  l.innerHTML = '<input class="etype" type="checkbox" checked> ' + et;
+  l.firstChild.value = et;
+  filters.appendChild(l);
+}});
+var nodesDS = new vis.DataSet(data.nodes);
+var edgesDS = new vis.DataSet(data.edges);
+var minConf = 0, selected = new Set(data.edgeTypes);
+var edgesView = new vis.DataView(edgesDS, {{ filter: function(e) {{ return e.confidence >= minConf && selected.has(e.label); }} }});
+var options = {{
+  nodes: {{ shape:'dot', size:16 }},
+  edges: {{ arrows: {{to:{{enabled:true, scaleFactor:0.7}}}}, smooth: false }},
+  physics: {{ enabled: false }},
+  layout: {{ improvedLayout: false }},
+  interaction: {{ hideEdgesOnDrag: true, hideEdgesOnZoom: true }}
+}};
+var network = new vis.Network(document.getElementById('mynetwork'), {{nodes:nodesDS, edges:edgesView}}, options);
+
+// filters
+function applyFilters() {{
+  minConf = parseFloat(document.getElementById('conf').value);
+  document.getElementById('confv').innerText = minConf.toFixed(2);
+  selected = new Set(Array.from(document.querySelectorAll('.etype:checked')).map(e => e.value));
+  edgesView.refresh();
+}}
+document.getElementById('conf').addEventListener('input', applyFilters);
+Array.from(document.querySelectorAll('.etype')).forEach(el => el.addEventListener('change', applyFilters));
+
+// search
+document.getElementById('search').addEventListener('input', function(ev) {{
+  var q = ev.target.value.toLowerCase();
+  var hits = data.nodes.filter(n => n.label.toLowerCase().includes(q)).map(n => n.id);
+  network.selectNodes(hits, false);
+  if (hits.length) {{ network.focus(hits[0], {{scale:1.2}}); }}
+}});
+</script></body></html>"""
+    with open(out_html, "w", encoding="utf-8") as f:
+        f.write(html)
+    return out_html
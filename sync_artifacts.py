@@ -0,0 +1,25 @@
+import argparse
+from src.artifact_sync import ArtifactSync, backend_from_uri
+
+
+def main():
+    p = argparse.ArgumentParser(description="Upload new/changed files of a directory; re-run to resume")
+    p.add_argument("source", help="local directory, e.g. outputs/runs/20251022-093045")
+    p.add_argument("--dest", required=True, help="directory, s3://bucket[/root] or mlflow://<run_id>")
+    p.add_argument("--prefix", default="", help="path under the destination, e.g. experiments/synthetic_1")
+    p.add_argument("--workers", type=int, default=8)
+    p.add_argument("--verify", action="store_true", help="re-hash every file instead of trusting size+mtime")
+    p.add_argument("--endpoint-url", default=None, help="S3-compatible endpoint (MinIO, DagsHub, ...)")
+    args = p.parse_args()
+
+    kwargs = {"endpoint_url": args.endpoint_url} if args.dest.startswith("s3://") else {}
+    backend = backend_from_uri(args.dest, **kwargs)
+    stats = ArtifactSync(backend, workers=args.workers, verify=args.verify).sync(args.source, args.prefix)
+    print(f"{'Resumed' if stats['resumed'] else 'Synced'} {args.source} -> {backend.describe()}/{args.prefix}: "
+          f"{stats['uploaded']} uploaded ({stats['bytes_uploaded'] / 1e6:.1f} MB), {stats['skipped']} unchanged, "
+          f"{stats['failed']} failed in {stats['elapsed_s']:.1f}s")
+    if stats["failed"]:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()